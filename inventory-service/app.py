@@ -5,27 +5,41 @@ collections.Iterable = collections.abc.Iterable
 import os
 from flask import Flask, request, jsonify
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
 import requests
-from datetime import datetime
+from datetime import datetime, timedelta
 from decimal import Decimal
 import json
+import hashlib
+import threading
+import time
 import graphene
 from graphene_sqlalchemy import SQLAlchemyObjectType
 from graphene import ObjectType
-from flask_graphql import GraphQLView
 # from config import Config
 from flask_cors import CORS
+from service_client import client as service_client
+from sse import ChangeStream, requested_last_event_id
+from graphql_cache import CachedGraphQLView, DocumentCacheBackend, ResponseCache, batch_pool_from_env
+from graphql_pagination import CountableConnection, connection_field, keyset_connection
+from db_engine import database_uri, engine_options, install_sqlite_pragmas
+from migration_runner import run_migrations
+from migrations import MIGRATIONS
 
 app = Flask(__name__)
 CORS(app)
 
 # Tentukan folder instance dan pastikan file db berada di dalamnya
 db_path = os.path.join(app.instance_path, 'inventory-service.db')
-# Gunakan os.path.abspath() untuk mendapatkan path absolut yang valid
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.abspath(db_path)}"
+# Gunakan os.path.abspath() untuk mendapatkan path absolut yang valid.
+# DATABASE_URL (mis. PostgreSQL) menggantikan SQLite default.
+app.config['SQLALCHEMY_DATABASE_URI'] = database_uri(f"sqlite:///{os.path.abspath(db_path)}")
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-# Inisialisasi db
+# Inisialisasi db (WAL dan PRAGMA lain untuk setiap koneksi SQLite)
+install_sqlite_pragmas()
 db = SQLAlchemy(app)
 
 # Pastikan folder instance ada
@@ -38,17 +52,21 @@ ORDER_SERVICE_URL = os.getenv('ORDER_SERVICE_URL', 'http://localhost:5002')
 # Model Item
 class Item(db.Model):
     __tablename__ = 'items'
+    # Urutan keyset lowStockItemsConnection (stock_quantity, id)
+    __table_args__ = (
+        db.Index('ix_items_stock_quantity_id', 'stock_quantity', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     item_code = db.Column(db.String(50), unique=True, nullable=False, index=True)
     name = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
-    category = db.Column(db.String(100))
+    category = db.Column(db.String(100), index=True)
     unit = db.Column(db.String(20), nullable=False, default="pcs")
     unit_price = db.Column(db.Numeric(10, 2), default=0.00)
     stock_quantity = db.Column(db.Integer, default=0)
     reserved_quantity = db.Column(db.Integer, default=0)  # Tambahan untuk stock yang direserve
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp(), nullable=False)
-    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp(), nullable=False)
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp(), nullable=False, index=True)
 
     def __repr__(self):
         return f'<Item {self.item_code}: {self.name}>'
@@ -78,15 +96,20 @@ class Item(db.Model):
 
 class QCLog(db.Model):
     __tablename__ = 'qc_logs'
+    # Urutan keyset qcLogsConnection (sent_to_qc_at desc, id desc), dengan dan tanpa filter status
+    __table_args__ = (
+        db.Index('ix_qc_logs_sent_to_qc_at_id', 'sent_to_qc_at', 'id'),
+        db.Index('ix_qc_logs_status_sent_to_qc_at_id', 'qc_status', 'sent_to_qc_at', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, nullable=False)  
+    order_id = db.Column(db.Integer, nullable=False, index=True)
     order_number = db.Column(db.String(50), nullable=False)  # Tambahan order number untuk referensi
     restaurant_name = db.Column(db.String(200), nullable=False)  # Tambahan nama restaurant
     item_code = db.Column(db.String(50), nullable=False)
     item_name = db.Column(db.String(200), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
     sent_to_qc_at = db.Column(db.DateTime, default=datetime.utcnow)
-    qc_status = db.Column(db.String(20), default="PENDING")  # PENDING, PASSED, FAILED
+    qc_status = db.Column(db.String(20), default="PENDING", index=True)  # PENDING, PASSED, FAILED
     qc_notes = db.Column(db.Text)  # Catatan QC
     processed_by = db.Column(db.String(100))  # Staff yang memproses
 
@@ -108,17 +131,443 @@ class QCLog(db.Model):
             'processed_by': self.processed_by
         }
 
-# Helper Functions untuk komunikasi dengan Order Service
-def get_approved_orders():
-    """Helper function untuk mengambil approved orders dari order service"""
+class StockReservation(db.Model):
+    """Ledger reservasi stock per order, satu baris per item"""
+    __tablename__ = 'stock_reservations'
+    # Unique index (order_id, item_code) juga dipakai untuk lookup berdasarkan order_id
+    __table_args__ = (
+        db.UniqueConstraint('order_id', 'item_code', name='uq_stock_reservations_order_item'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, nullable=False)
+    item_code = db.Column(db.String(50), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="RESERVED")  # RESERVED, RELEASED, CONSUMED
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<StockReservation Order #{self.order_id}: {self.item_code}, Qty: {self.quantity} ({self.status})>"
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'order_id': self.order_id,
+            'item_code': self.item_code,
+            'quantity': self.quantity,
+            'status': self.status,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
+
+class CatalogChange(db.Model):
+    """Log perubahan katalog; version (auto increment) adalah versi katalog setelah perubahan"""
+    __tablename__ = 'catalog_changes'
+    version = db.Column(db.Integer, primary_key=True)
+    item_id = db.Column(db.Integer, nullable=False)
+    item_code = db.Column(db.String(50), nullable=False)
+    operation = db.Column(db.String(10), nullable=False)  # INSERT, UPDATE, DELETE
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+class ApprovedOrdersChange(db.Model):
+    """Log event webhook yang mengubah daftar approved orders; MAX(id) adalah penanda versi
+    cache approved orders yang dipakai bersama oleh semua worker process"""
+    __tablename__ = 'approved_orders_changes'
+    id = db.Column(db.Integer, primary_key=True)
+    received_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+def record_catalog_change(connection, item_id, item_code, operation):
+    """Menaikkan versi katalog dengan mencatat perubahan item di koneksi/transaksi yang sama"""
+    connection.execute(CatalogChange.__table__.insert().values(
+        item_id=item_id, item_code=item_code, operation=operation, changed_at=datetime.utcnow()
+    ))
+
+def get_catalog_version():
+    """Versi katalog saat ini (MAX pada primary key, tidak scan tabel)"""
+    return db.session.query(db.func.max(CatalogChange.version)).scalar() or 0
+
+# SQLite menserialkan writer, jadi versi selalu commit berurutan. Di PostgreSQL versi
+# (SERIAL) bisa commit tidak berurutan: versi kecil terlihat setelah versi yang lebih besar.
+# Pembaca delta hanya melihat perubahan yang lebih tua dari jendela ini agar tidak terlewat.
+CATALOG_SETTLE_SECONDS = float(os.getenv(
+    'CATALOG_SETTLE_SECONDS', 0 if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite') else 2
+))
+
+def _catalog_settle_cutoff():
+    return datetime.utcnow() - timedelta(seconds=CATALOG_SETTLE_SECONDS)
+
+def get_settled_catalog_version():
+    """Versi katalog terbaru yang aman dipakai sebagai posisi delta feed"""
+    if not CATALOG_SETTLE_SECONDS:
+        return get_catalog_version()
+    return (db.session.query(CatalogChange.version)
+            .filter(CatalogChange.changed_at <= _catalog_settle_cutoff())
+            .order_by(CatalogChange.version.desc())
+            .limit(1)
+            .scalar()) or 0
+
+def get_catalog_etag_version():
+    """Penanda versi untuk ETag; ikut berubah saat versi lama commit terlambat di dalam jendela settle"""
+    if not CATALOG_SETTLE_SECONDS:
+        return str(get_catalog_version())
+    settled = get_settled_catalog_version()
+    unsettled = db.session.query(db.func.count(CatalogChange.version)).filter(CatalogChange.version > settled).scalar()
+    return f"{settled}.{unsettled}"
+
+# Perubahan lewat ORM dicatat otomatis; UPDATE Core (reservasi) memanggil record_catalog_change sendiri
+@event.listens_for(Item, 'after_insert')
+def _item_inserted(mapper, connection, target):
+    record_catalog_change(connection, target.id, target.item_code, 'INSERT')
+
+@event.listens_for(Item, 'after_update')
+def _item_updated(mapper, connection, target):
+    record_catalog_change(connection, target.id, target.item_code, 'UPDATE')
+
+@event.listens_for(Item, 'after_delete')
+def _item_deleted(mapper, connection, target):
+    record_catalog_change(connection, target.id, target.item_code, 'DELETE')
+
+# Batas jumlah parameter dalam satu klausa IN (SQLite lama membatasi 999 variabel)
+IN_CLAUSE_CHUNK_SIZE = 500
+
+def get_items_by_codes(item_codes):
+    """Mengambil banyak item sekaligus dengan query IN, dikembalikan sebagai dict item_code -> Item"""
+    unique_codes = list(dict.fromkeys(item_codes))
+    items_by_code = {}
+    for start in range(0, len(unique_codes), IN_CLAUSE_CHUNK_SIZE):
+        chunk = unique_codes[start:start + IN_CLAUSE_CHUNK_SIZE]
+        for item in Item.query.filter(Item.item_code.in_(chunk)).all():
+            items_by_code[item.item_code] = item
+    return items_by_code
+
+def get_orders_sent_to_qc(order_ids):
+    """Mengembalikan set order_id yang sudah punya QC log, dengan satu query IN per chunk"""
+    unique_ids = list(dict.fromkeys(order_ids))
+    sent_ids = set()
+    for start in range(0, len(unique_ids), IN_CLAUSE_CHUNK_SIZE):
+        chunk = unique_ids[start:start + IN_CLAUSE_CHUNK_SIZE]
+        rows = db.session.query(QCLog.order_id).filter(QCLog.order_id.in_(chunk)).distinct()
+        sent_ids.update(order_id for order_id, in rows)
+    return sent_ids
+
+def _record_stock_change(item_code):
+    """Mencatat perubahan stock hasil UPDATE Core (tidak memicu event ORM) ke log katalog"""
+    item_id = db.session.query(Item.id).filter(Item.item_code == item_code).scalar()
+    record_catalog_change(db.session.connection(), item_id, item_code, 'UPDATE')
+
+def reserve_items(order_id, lines):
+    """Reserve stock untuk sebuah order secara atomik (semua item berhasil atau tidak sama sekali).
+
+    Setiap baris direserve dengan UPDATE bersyarat
+    ``WHERE stock_quantity - reserved_quantity >= :qty`` sehingga pengecekan dan
+    penambahan reserved_quantity terjadi di database, bukan read-modify-write di Python.
+    Reservasi dicatat di ledger stock_reservations; request ulang dengan order_id yang
+    sama tidak mereserve dua kali. Mengembalikan tuple (success, message, status_code).
+    """
+    if order_id is None:
+        return False, 'order_id is required', 400
+
+    # Gabungkan baris dengan item_code yang sama
+    quantities = {}
+    for line in lines:
+        item_code = line['item_code']
+        quantity = line['quantity']
+        if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+            return False, f'Invalid quantity for {item_code}', 400
+        quantities[item_code] = quantities.get(item_code, 0) + quantity
+
+    items_table = Item.__table__
     try:
-        response = requests.get(f"{ORDER_SERVICE_URL}/api/orders/approved", timeout=10)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return []
-    except requests.RequestException:
+        existing = StockReservation.query.filter_by(order_id=order_id).all()
+        if any(reservation.status != 'RELEASED' for reservation in existing):
+            return True, f'Stock already reserved for order {order_id}', 200
+        # Reservasi yang sudah di-release boleh direserve ulang
+        for reservation in existing:
+            db.session.delete(reservation)
+        db.session.flush()
+
+        # Urutkan item_code agar urutan lock konsisten antar transaksi
+        for item_code in sorted(quantities):
+            quantity = quantities[item_code]
+            result = db.session.execute(
+                items_table.update()
+                .where(items_table.c.item_code == item_code)
+                .where(items_table.c.stock_quantity - items_table.c.reserved_quantity >= quantity)
+                .values(
+                    reserved_quantity=items_table.c.reserved_quantity + quantity,
+                    updated_at=db.func.current_timestamp()
+                )
+            )
+            if result.rowcount != 1:
+                db.session.rollback()
+                if not Item.query.filter_by(item_code=item_code).first():
+                    return False, f'Item {item_code} not found', 404
+                return False, f'Insufficient stock for {item_code}', 400
+            _record_stock_change(item_code)
+
+            db.session.add(StockReservation(order_id=order_id, item_code=item_code, quantity=quantity))
+
+        db.session.commit()
+        return True, 'Stock reserved successfully', 200
+    except IntegrityError:
+        # Request lain dengan order_id yang sama sudah commit lebih dulu
+        db.session.rollback()
+        return True, f'Stock already reserved for order {order_id}', 200
+    except Exception:
+        db.session.rollback()
+        raise
+
+def _close_reservation(order_id, new_status, commit=True):
+    """Memindahkan reservasi RESERVED milik order ke RELEASED atau CONSUMED dan menyesuaikan stock item."""
+    reservations = StockReservation.query.filter_by(order_id=order_id).all()
+    if not reservations:
+        return False, f'No reservation found for order {order_id}', 404
+
+    statuses = {reservation.status for reservation in reservations}
+    if statuses == {new_status}:
+        return True, f'Reservation for order {order_id} already {new_status.lower()}', 200
+    if statuses != {'RESERVED'}:
+        return False, f'Reservation for order {order_id} is {", ".join(sorted(statuses)).lower()}', 409
+
+    ledger_table = StockReservation.__table__
+    items_table = Item.__table__
+    try:
+        # Klaim baris ledger lebih dulu agar release/consume bersamaan tidak diproses dua kali
+        result = db.session.execute(
+            ledger_table.update()
+            .where(ledger_table.c.order_id == order_id)
+            .where(ledger_table.c.status == 'RESERVED')
+            .values(status=new_status, updated_at=datetime.utcnow())
+        )
+        if result.rowcount != len(reservations):
+            db.session.rollback()
+            return False, f'Reservation for order {order_id} was modified concurrently', 409
+
+        for reservation in sorted(reservations, key=lambda r: r.item_code):
+            quantity = reservation.quantity
+            values = {
+                'reserved_quantity': items_table.c.reserved_quantity - quantity,
+                'updated_at': db.func.current_timestamp()
+            }
+            update = (items_table.update()
+                      .where(items_table.c.item_code == reservation.item_code)
+                      .where(items_table.c.reserved_quantity >= quantity))
+            if new_status == 'CONSUMED':
+                # Barang keluar gudang: stock fisik ikut berkurang
+                values['stock_quantity'] = items_table.c.stock_quantity - quantity
+                update = update.where(items_table.c.stock_quantity >= quantity)
+
+            result = db.session.execute(update.values(**values))
+            if result.rowcount != 1:
+                db.session.rollback()
+                return False, f'Stock for {reservation.item_code} is inconsistent with its reservation', 409
+            _record_stock_change(reservation.item_code)
+
+        if commit:
+            db.session.commit()
+        return True, f'Reservation for order {order_id} {new_status.lower()}', 200
+    except Exception:
+        db.session.rollback()
+        raise
+
+def release_reservation(order_id, commit=True):
+    """Melepas reservasi order: reserved_quantity dikembalikan, stock_quantity tetap"""
+    return _close_reservation(order_id, 'RELEASED', commit=commit)
+
+def consume_reservation(order_id, commit=True):
+    """Memakai reservasi order: stock_quantity dan reserved_quantity sama-sama dikurangi"""
+    return _close_reservation(order_id, 'CONSUMED', commit=commit)
+
+# Pagination untuk listing item
+ITEM_LIST_DEFAULT_LIMIT = 100
+ITEM_LIST_MAX_LIMIT = 1000
+# Field yang bisa dipilih lewat parameter fields= (urutan sama dengan Item.to_dict)
+ITEM_FIELDS = ('id', 'item_code', 'name', 'description', 'category', 'unit', 'unit_price',
+               'stock_quantity', 'reserved_quantity', 'available_quantity', 'created_at', 'updated_at')
+
+def _serialize_item_field(row, field):
+    """Serialisasi satu field dari row hasil projection, sama seperti Item.to_dict"""
+    if field == 'available_quantity':
+        return row['stock_quantity'] - row['reserved_quantity']
+    value = row[field]
+    if field == 'unit_price':
+        return float(value) if value else 0.0
+    if field in ('created_at', 'updated_at'):
+        return value.isoformat()
+    return value
+
+def get_items_page(args):
+    """Mengambil satu halaman item dengan keyset pagination pada id.
+
+    Parameter: cursor (id terakhir dari halaman sebelumnya), limit, fields (daftar kolom
+    dipisah koma), category dan updated_since (ISO datetime). Hanya kolom yang diminta
+    yang di-SELECT, tanpa hydrate objek ORM. Raise ValueError untuk parameter tidak valid.
+    """
+    fields = [field.strip() for field in args.get('fields', '').split(',') if field.strip()] or list(ITEM_FIELDS)
+    unknown_fields = [field for field in fields if field not in ITEM_FIELDS]
+    if unknown_fields:
+        raise ValueError(f"Unknown fields: {', '.join(unknown_fields)}")
+
+    # id selalu di-SELECT karena dipakai sebagai cursor
+    column_names = {'id'} | set(fields)
+    if 'available_quantity' in column_names:
+        column_names |= {'stock_quantity', 'reserved_quantity'}
+    column_names.discard('available_quantity')
+    columns = [getattr(Item, name) for name in ITEM_FIELDS if name in column_names]
+
+    limit = min(max(int(args.get('limit', ITEM_LIST_DEFAULT_LIMIT)), 1), ITEM_LIST_MAX_LIMIT)
+    query = db.session.query(*columns)
+
+    cursor = args.get('cursor')
+    if cursor:
+        query = query.filter(Item.id > int(cursor))
+    category = args.get('category')
+    if category:
+        query = query.filter(Item.category == category)
+    updated_since = args.get('updated_since')
+    if updated_since:
+        query = query.filter(Item.updated_at >= datetime.fromisoformat(updated_since.replace('Z', '')))
+
+    # Ambil satu baris lebih untuk mengetahui apakah masih ada halaman berikutnya
+    rows = query.order_by(Item.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        'items': [{field: _serialize_item_field(row._mapping, field) for field in fields} for row in rows],
+        'next_cursor': str(rows[-1].id) if has_more else None,
+        'has_more': has_more
+    }
+
+# Jumlah maksimum perubahan yang dikembalikan satu kali panggilan /api/items/changes
+CATALOG_CHANGES_MAX_LIMIT = 1000
+
+def get_catalog_changes(since, limit=CATALOG_CHANGES_MAX_LIMIT):
+    """Delta katalog setelah versi `since`: item yang berubah (data terbaru) dan item yang dihapus.
+
+    deleted berisi item_code, deleted_ids berisi id. Item yang dihapus lalu dibuat ulang
+    dengan item_code sama muncul di deleted (id lama) sekaligus di changed (id baru), jadi
+    konsumen harus menerapkan penghapusan sebelum perubahan (atau memakai id sebagai key).
+    """
+    changes = (CatalogChange.query
+               .filter(CatalogChange.version > since)
+               .order_by(CatalogChange.version)
+               .limit(limit + 1)
+               .all())
+    if CATALOG_SETTLE_SECONDS:
+        # Berhenti di perubahan pertama yang belum settle agar posisi tidak melompati versi yang belum terlihat
+        cutoff = _catalog_settle_cutoff()
+        settled_count = next((index for index, change in enumerate(changes) if change.changed_at > cutoff), len(changes))
+        changes = changes[:settled_count]
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    # Hanya operasi terakhir per item yang relevan
+    latest_by_item = {}
+    for change in changes:
+        latest_by_item[change.item_id] = change
+
+    changed_ids = [item_id for item_id, change in latest_by_item.items() if change.operation != 'DELETE']
+    changed_items = []
+    for start in range(0, len(changed_ids), IN_CLAUSE_CHUNK_SIZE):
+        chunk = changed_ids[start:start + IN_CLAUSE_CHUNK_SIZE]
+        changed_items.extend(Item.query.filter(Item.id.in_(chunk)).all())
+
+    return {
+        'version': changes[-1].version if changes else since,
+        'has_more': has_more,
+        'changed': [item.to_dict() for item in sorted(changed_items, key=lambda item: item.id)],
+        'deleted': [change.item_code for change in latest_by_item.values() if change.operation == 'DELETE'],
+        'deleted_ids': [item_id for item_id, change in latest_by_item.items() if change.operation == 'DELETE']
+    }
+
+# Stream SSE perubahan item: satu event per batch delta katalog, id event = versi katalog
+ITEM_STREAM_BATCH_SIZE = 200
+
+def _item_stream_events(after):
+    delta = get_catalog_changes(after, limit=ITEM_STREAM_BATCH_SIZE)
+    if delta['version'] == after:
         return []
+    return [(delta['version'], {'version': delta['version'], 'changed': delta['changed'], 'deleted': delta['deleted'],
+                                'deleted_ids': delta['deleted_ids']})]
+
+item_stream = ChangeStream.from_env(app, 'items', get_settled_catalog_version, _item_stream_events)
+
+# Helper Functions untuk komunikasi dengan Order Service
+# Jumlah order per halaman saat membaca feed approved orders
+APPROVED_ORDERS_PAGE_SIZE = 500
+
+# Cache daftar approved orders per worker process. Webhook event status order dari order
+# service (/api/events/orders) hanya diterima satu worker, jadi webhook mencatat perubahan di
+# tabel approved_orders_changes dan setiap baca membandingkan versi cache dengan MAX(id) di
+# database. TTL hanya pengaman jika event tidak sampai.
+APPROVED_ORDERS_CACHE_TTL = float(os.getenv('APPROVED_ORDERS_CACHE_TTL', 30))
+approved_orders_cache = {'orders': None, 'version': None, 'expires_at': 0.0, 'hits': 0, 'misses': 0, 'invalidations': 0}
+approved_orders_cache_lock = threading.Lock()
+
+def get_approved_orders_version():
+    """Versi daftar approved orders (MAX pada primary key, tidak scan tabel)"""
+    return db.session.query(db.func.max(ApprovedOrdersChange.id)).scalar() or 0
+
+def _fetch_approved_orders(filters):
+    """Membaca semua halaman feed approved orders; mengembalikan (orders, lengkap)"""
+    params = {'limit': APPROVED_ORDERS_PAGE_SIZE, **filters}
+    orders = []
+    while True:
+        try:
+            response = service_client.get(f"{ORDER_SERVICE_URL}/api/orders/approved", params=params, name='order.approved_orders')
+            if response.status_code != 200:
+                return orders, False
+            page = response.json()
+        except (requests.RequestException, ValueError):
+            return orders, False
+        
+        orders.extend(page.get('orders', []))
+        if not page.get('next_cursor'):
+            return orders, True
+        params['cursor'] = page['next_cursor']
+
+def get_approved_orders(**filters):
+    """Helper function untuk mengambil approved orders dari order service (semua halaman)"""
+    if filters:
+        return _fetch_approved_orders(filters)[0]
+    
+    # Versi dibaca sebelum fetch: event yang masuk selama fetch menaikkan versi di database,
+    # sehingga hasil fetch ini dianggap basi pada baca berikutnya
+    version = get_approved_orders_version()
+    with approved_orders_cache_lock:
+        if (approved_orders_cache['orders'] is not None and approved_orders_cache['version'] == version
+                and approved_orders_cache['expires_at'] > time.monotonic()):
+            approved_orders_cache['hits'] += 1
+            return approved_orders_cache['orders']
+        approved_orders_cache['misses'] += 1
+    
+    orders, complete = _fetch_approved_orders({})
+    if complete:
+        with approved_orders_cache_lock:
+            approved_orders_cache['orders'] = orders
+            approved_orders_cache['version'] = version
+            approved_orders_cache['expires_at'] = time.monotonic() + APPROVED_ORDERS_CACHE_TTL
+    return orders
+
+def invalidate_approved_orders():
+    """Menandai cache approved orders di semua worker basi (mencatat perubahan di database)"""
+    db.session.add(ApprovedOrdersChange())
+    db.session.commit()
+    with approved_orders_cache_lock:
+        approved_orders_cache['orders'] = None
+        approved_orders_cache['invalidations'] += 1
+
+def get_approved_order(order_id):
+    """Mengambil satu approved order dari order service; None jika tidak ada / tidak approved.
+
+    Error koneksi dibiarkan naik agar pemanggil bisa membedakannya dari order yang tidak ditemukan.
+    """
+    response = service_client.get(f"{ORDER_SERVICE_URL}/api/orders/approved/{order_id}", name='order.approved_order')
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()
 
 # GraphQL schema untuk Item
 class ItemType(SQLAlchemyObjectType):
@@ -144,6 +593,14 @@ class ApprovedOrderType(graphene.ObjectType):
     approved_date = graphene.String()
     items = graphene.List(graphene.String)  # JSON string untuk items
 
+class ItemConnection(CountableConnection):
+    class Meta:
+        node = ItemType
+
+class QCLogConnection(CountableConnection):
+    class Meta:
+        node = QCLogType
+
 # Query untuk mendapatkan semua item dan QC logs
 class Query(graphene.ObjectType):
     items = graphene.List(ItemType)
@@ -151,10 +608,17 @@ class Query(graphene.ObjectType):
     qc_logs = graphene.List(QCLogType, status=graphene.String())
     approved_orders = graphene.List(ApprovedOrderType)  # Orders yang bisa dikirim ke QC
     low_stock_items = graphene.List(ItemType, threshold=graphene.Int(default_value=10))
+    # Versi berhalaman (first/after) dari field list di atas
+    items_connection = connection_field(ItemConnection)
+    qc_logs_connection = connection_field(QCLogConnection, status=graphene.String())
+    low_stock_items_connection = connection_field(ItemConnection, threshold=graphene.Int(default_value=10))
     
     def resolve_items(self, info):
         return Item.query.all()
     
+    def resolve_items_connection(self, info, first=None, after=None):
+        return keyset_connection(ItemConnection, Item.query, [Item.id], first, after)
+    
     def resolve_item_by_code(self, info, item_code):
         return Item.query.filter_by(item_code=item_code).first()
     
@@ -164,15 +628,20 @@ class Query(graphene.ObjectType):
             query = query.filter(QCLog.qc_status == status.upper())
         return query.order_by(QCLog.sent_to_qc_at.desc()).all()
     
+    def resolve_qc_logs_connection(self, info, status=None, first=None, after=None):
+        query = QCLog.query
+        if status:
+            query = query.filter(QCLog.qc_status == status.upper())
+        return keyset_connection(QCLogConnection, query, [QCLog.sent_to_qc_at, QCLog.id], first, after, descending=True)
+    
     def resolve_approved_orders(self, info):
         """Mengambil approved orders dari order service yang belum dikirim ke QC"""
         orders_data = get_approved_orders()
+        sent_ids = get_orders_sent_to_qc([order_data['id'] for order_data in orders_data])
         approved_orders = []
         
         for order_data in orders_data:
-            # Cek apakah order sudah pernah dikirim ke QC
-            existing_qc = QCLog.query.filter_by(order_id=order_data['id']).first()
-            if not existing_qc:  # Hanya tampilkan yang belum dikirim ke QC
+            if order_data['id'] not in sent_ids:  # Hanya tampilkan yang belum dikirim ke QC
                 approved_orders.append(ApprovedOrderType(
                     id=order_data['id'],
                     order_number=order_data['order_number'],
@@ -186,6 +655,11 @@ class Query(graphene.ObjectType):
     def resolve_low_stock_items(self, info, threshold):
         """Mengambil items dengan stock rendah"""
         return Item.query.filter(Item.stock_quantity <= threshold).all()
+    
+    def resolve_low_stock_items_connection(self, info, threshold, first=None, after=None):
+        """Items dengan stock rendah, stock paling sedikit lebih dulu"""
+        query = Item.query.filter(Item.stock_quantity <= threshold)
+        return keyset_connection(ItemConnection, query, [Item.stock_quantity, Item.id], first, after)
 
 # Mutations
 class CreateItem(graphene.Mutation):
@@ -284,14 +758,7 @@ class SendToQC(graphene.Mutation):
     def mutate(self, info, order_id):
         try:
             # Ambil data order dari order service
-            orders_data = get_approved_orders()
-            selected_order = None
-            
-            for order_data in orders_data:
-                if order_data['id'] == order_id:
-                    selected_order = order_data
-                    break
-            
+            selected_order = get_approved_order(order_id)
             if not selected_order:
                 return SendToQC(success=False, message="Order not found or not approved.")
             
@@ -300,7 +767,18 @@ class SendToQC(graphene.Mutation):
             if existing_qc:
                 return SendToQC(success=False, message="Order already sent to QC.")
             
+            # Jika order sudah direserve saat approval, stock diambil dari reservasinya. Jumlah yang
+            # dipakai adalah jumlah reservasi (bisa requested_quantity jika approved_quantity 0),
+            # jadi QC log mencatat jumlah itu, bukan approved_quantity.
+            reserved_quantities = {
+                reservation.item_code: reservation.quantity
+                for reservation in StockReservation.query.filter_by(order_id=order_id, status='RESERVED').all()
+            }
+            has_reservation = bool(reserved_quantities)
+            
             qc_logs_created = []
+            logged_codes = set()
+            items_by_code = get_items_by_codes([item_data['item_code'] for item_data in selected_order['items']])
             
             # Proses setiap item dalam order
             for item_data in selected_order['items']:
@@ -308,16 +786,25 @@ class SendToQC(graphene.Mutation):
                 item_name = item_data['item_name']
                 quantity = item_data['approved_quantity']
                 
-                # Cek ketersediaan stock
-                item = Item.query.filter_by(item_code=item_code).first()
+                item = items_by_code.get(item_code)
                 if not item:
                     return SendToQC(success=False, message=f"Item {item_code} not found in inventory.")
                 
-                if item.available_quantity < quantity:
-                    return SendToQC(success=False, message=f"Insufficient stock for item {item_code}. Available: {item.available_quantity}, Required: {quantity}")
-                
-                # Kurangi stock dan tambah reserved
-                item.stock_quantity -= quantity
+                if has_reservation:
+                    if item_code in logged_codes:
+                        # Baris dengan item_code sama sudah tercatat dengan seluruh jumlah reservasinya
+                        continue
+                    if item_code not in reserved_quantities:
+                        return SendToQC(success=False, message=f"Item {item_code} is not in the reservation for order {order_id}.")
+                    quantity = reserved_quantities.pop(item_code)
+                    logged_codes.add(item_code)
+                else:
+                    # Cek ketersediaan stock
+                    if item.available_quantity < quantity:
+                        return SendToQC(success=False, message=f"Insufficient stock for item {item_code}. Available: {item.available_quantity}, Required: {quantity}")
+                    
+                    # Kurangi stock
+                    item.stock_quantity -= quantity
                 
                 # Buat QC Log
                 qc_log = QCLog(
@@ -332,6 +819,13 @@ class SendToQC(graphene.Mutation):
                 db.session.add(qc_log)
                 qc_logs_created.append(qc_log)
             
+            if has_reservation:
+                if reserved_quantities:
+                    return SendToQC(success=False, message=f"Reservation for order {order_id} has items not in the order: {', '.join(sorted(reserved_quantities))}.")
+                success, message, _ = consume_reservation(order_id, commit=False)
+                if not success:
+                    return SendToQC(success=False, message=message)
+            
             db.session.commit()
             
             return SendToQC(
@@ -385,22 +879,9 @@ class ReserveStock(graphene.Mutation):
 
     def mutate(self, info, order_id, items):
         try:
-            for item_data in items:
-                item_info = json.loads(item_data)
-                item_code = item_info['item_code']
-                quantity = item_info['quantity']
-                
-                item = Item.query.filter_by(item_code=item_code).first()
-                if not item:
-                    return ReserveStock(success=False, message=f"Item {item_code} not found.")
-                
-                if item.available_quantity < quantity:
-                    return ReserveStock(success=False, message=f"Insufficient stock for {item_code}.")
-                
-                item.reserved_quantity += quantity
-            
-            db.session.commit()
-            return ReserveStock(success=True, message="Stock reserved successfully.")
+            lines = [json.loads(item_data) for item_data in items]
+            success, message, _ = reserve_items(order_id, lines)
+            return ReserveStock(success=success, message=message)
             
         except Exception as e:
             db.session.rollback()
@@ -415,19 +896,97 @@ class Mutation(graphene.ObjectType):
     reserve_stock = ReserveStock.Field()
 
 # Menambahkan GraphQL endpoint
-app.add_url_rule('/graphql', view_func=GraphQLView.as_view('graphql', schema=graphene.Schema(query=Query, mutation=Mutation), graphiql=True))
+# Cache hasil query dashboard (aktif jika GRAPHQL_RESPONSE_CACHE_MB di-set). Tag Item dicek
+# terhadap versi katalog, jadi perubahan stock dari REST / worker lain langsung terlihat.
+# approvedOrders juga membaca data order-service; perubahan di sana terlihat setelah TTL.
+graphql_response_cache = ResponseCache.from_env(
+    query_tags={
+        'items': ['Item'],
+        'itemByCode': ['Item'],
+        'lowStockItems': ['Item'],
+        'itemsConnection': ['Item'],
+        'lowStockItemsConnection': ['Item'],
+        'qcLogs': ['QCLog'],
+        'qcLogsConnection': ['QCLog'],
+        'approvedOrders': ['QCLog'],
+    },
+    mutation_tags={
+        'createItem': ['Item'],
+        'updateItem': ['Item'],
+        'deleteItem': ['Item'],
+        'sendToQc': ['Item', 'QCLog'],
+        'updateQcStatus': ['Item', 'QCLog'],
+        'reserveStock': ['Item'],
+    },
+    tag_versions={'Item': get_catalog_etag_version}
+)
+# Dokumen query yang sudah di-parse dan divalidasi di-cache lintas request (juga persisted query)
+graphql_backend = DocumentCacheBackend.from_env(response_cache=graphql_response_cache)
+# batch=True: halaman bisa mengirim beberapa operasi sekaligus dalam satu request
+app.add_url_rule('/graphql', view_func=CachedGraphQLView.as_view('graphql', schema=graphene.Schema(query=Query, mutation=Mutation), graphiql=True, backend=graphql_backend,
+                                                                 batch=True, batch_pool=batch_pool_from_env()))
 
 # REST API endpoints untuk integrasi dengan order service
+def wants_items_page(args):
+    """Halaman keyset hanya jika client meminta limit/cursor; tanpa itu bentuk lama (list semua item)"""
+    return 'limit' in args or 'cursor' in args
+
 @app.route('/', methods=['GET'])
 def list_items():
-    items = Item.query.all()
-    return jsonify([item.to_dict() for item in items])
+    if not wants_items_page(request.args):
+        return jsonify([item.to_dict() for item in Item.query.all()])
+    try:
+        return jsonify(get_items_page(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
 @app.route('/api/items', methods=['GET'])
 def get_all_items():
-    """REST endpoint untuk order service mengambil semua items"""
-    items = Item.query.all()
-    return jsonify([item.to_dict() for item in items])
+    """REST endpoint untuk order service mengambil items.
+
+    Tanpa limit/cursor: list semua item seperti sebelumnya. Dengan limit/cursor: satu halaman
+    {items, next_cursor, has_more, version} (fields, category, updated_since berlaku di mode ini).
+    """
+    # ETag = versi katalog + parameter query; client yang sudah punya halaman ini cukup dapat 304
+    query_key = hashlib.md5(request.query_string).hexdigest()[:12]
+    etag = f"v{get_catalog_etag_version()}-{query_key}"
+    if etag in request.if_none_match:
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+    
+    if not wants_items_page(request.args):
+        response = jsonify([item.to_dict() for item in Item.query.all()])
+        response.set_etag(etag)
+        return response
+    
+    try:
+        # Versi yang sudah settle: delta berikutnya mengirim ulang perubahan yang belum pasti terlihat
+        response = jsonify({**get_items_page(request.args), 'version': get_settled_catalog_version()})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    response.set_etag(etag)
+    return response
+
+@app.route('/api/items/changes', methods=['GET'])
+def get_item_changes():
+    """REST endpoint delta katalog: item yang berubah/dihapus setelah versi `since`"""
+    try:
+        since = int(request.args.get('since', 0))
+        limit = min(max(int(request.args.get('limit', CATALOG_CHANGES_MAX_LIMIT)), 1), CATALOG_CHANGES_MAX_LIMIT)
+    except ValueError:
+        return jsonify({'error': 'since and limit must be integers'}), 400
+    
+    return jsonify(get_catalog_changes(since, limit))
+
+@app.route('/api/items/stream', methods=['GET'])
+def stream_items():
+    """SSE perubahan stock/item sebagai delta; resume lewat Last-Event-ID (versi katalog)"""
+    try:
+        last_event_id = requested_last_event_id()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return item_stream.response(last_event_id)
 
 @app.route('/api/items/<item_code>/stock', methods=['GET'])
 def get_item_stock(item_code):
@@ -453,11 +1012,14 @@ def check_availability():
         availability_details = []
         all_available = True
         
+        # Ambil semua item yang diminta dalam satu query, bukan satu query per baris
+        items_by_code = get_items_by_codes([item_check['item_code'] for item_check in items_to_check])
+        
         for item_check in items_to_check:
             item_code = item_check['item_code']
             requested_quantity = item_check['requested_quantity']
             
-            item = Item.query.filter_by(item_code=item_code).first()
+            item = items_by_code.get(item_code)
             
             if not item:
                 availability_details.append({
@@ -503,24 +1065,13 @@ def reserve_stock_rest():
         order_id = data.get('order_id')
         items = data.get('items', [])
         
-        for item_data in items:
-            item_code = item_data['item_code']
-            quantity = item_data['quantity']
-            
-            item = Item.query.filter_by(item_code=item_code).first()
-            if not item:
-                return jsonify({'success': False, 'message': f'Item {item_code} not found'}), 404
-            
-            if item.available_quantity < quantity:
-                return jsonify({'success': False, 'message': f'Insufficient stock for {item_code}'}), 400
-            
-            item.reserved_quantity += quantity
-        
-        db.session.commit()
+        success, message, status_code = reserve_items(order_id, items)
+        if not success:
+            return jsonify({'success': False, 'message': message}), status_code
         
         return jsonify({
             'success': True,
-            'message': 'Stock reserved successfully',
+            'message': message,
             'order_id': order_id
         })
         
@@ -528,12 +1079,79 @@ def reserve_stock_rest():
         db.session.rollback()
         return jsonify({'success': False, 'message': str(e)}), 400
 
+@app.route('/api/reservations/<int:order_id>', methods=['GET'])
+def get_reservation(order_id):
+    """REST endpoint untuk melihat reservasi stock sebuah order"""
+    reservations = StockReservation.query.filter_by(order_id=order_id).order_by(StockReservation.item_code).all()
+    if not reservations:
+        return jsonify({'success': False, 'message': f'No reservation found for order {order_id}'}), 404
+    
+    return jsonify({
+        'success': True,
+        'order_id': order_id,
+        'items': [reservation.to_dict() for reservation in reservations]
+    })
+
+@app.route('/api/reservations/<int:order_id>/release', methods=['POST'])
+def release_reservation_rest(order_id):
+    """REST endpoint untuk order service melepas reservasi (order ditolak / dibatalkan)"""
+    try:
+        success, message, status_code = release_reservation(order_id)
+        return jsonify({'success': success, 'message': message, 'order_id': order_id}), status_code
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+@app.route('/api/reservations/<int:order_id>/consume', methods=['POST'])
+def consume_reservation_rest(order_id):
+    """REST endpoint untuk memakai reservasi (barang keluar dari gudang)"""
+    try:
+        success, message, status_code = consume_reservation(order_id)
+        return jsonify({'success': success, 'message': message, 'order_id': order_id}), status_code
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+@app.route('/api/events/orders', methods=['POST'])
+def receive_order_events():
+    """Webhook event status order dari outbox order service (at-least-once, boleh terkirim ulang)"""
+    data = request.get_json(silent=True) or {}
+    events = data.get('events')
+    if not isinstance(events, list):
+        return jsonify({'error': 'events must be a list'}), 400
+    
+    approved_changed = any(
+        'APPROVED' in (event.get('payload', {}).get('previous_status'), event.get('payload', {}).get('status'))
+        for event in events
+        if event.get('event_type') == 'order.status_changed'
+    )
+    if approved_changed:
+        invalidate_approved_orders()
+    
+    return jsonify({'received': len(events), 'last_event_id': events[-1].get('id') if events else None})
+
+@app.route('/api/qc-logs/pending-count', methods=['GET'])
+def get_pending_qc_count():
+    """Jumlah item yang sudah dikirim ke QC tapi belum diperiksa (untuk dashboard QC service)"""
+    return jsonify({'pending_qc': QCLog.query.filter_by(qc_status='PENDING').count()})
+
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'healthy', 'service': 'inventory-service'})
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Statistik runtime inventory-service (per worker process)"""
+    return jsonify({
+        'service': 'inventory-service',
+        'approved_orders_cache': {
+            key: value for key, value in approved_orders_cache.items() if key in ('hits', 'misses', 'invalidations')
+        },
+        'item_stream': item_stream.stats(),
+        'graphql_documents': graphql_backend.stats(),
+        'http_client': service_client.stats()
+    })
+
 # Menjalankan aplikasi
 if __name__ == '__main__':
     with app.app_context():
-        db.create_all()  # Membuat semua tabel sebelum aplikasi dijalankan
+        run_migrations(db.engine, MIGRATIONS, db.metadata)  # Hanya migrasi yang belum diterapkan
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""Benchmark POST /api/check-availability untuk jumlah baris yang berbeda.
+
+Menjalankan app inventory in-process (Flask test client, tanpa HTTP) terhadap katalog
+SQLite sementara lalu melaporkan rata-rata latency per ukuran request:
+
+    python bench_check_availability.py --items 1000 --repeat 20
+    python bench_check_availability.py --per-line-lookup
+
+--per-line-lookup mengganti get_items_by_codes dengan satu query per item_code,
+yaitu cara endpoint ini membaca item sebelum lookup IN (...) batch, sebagai pembanding.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark /api/check-availability')
+    parser.add_argument('--items', type=int, default=1000, help='jumlah item di katalog')
+    parser.add_argument('--lines', default='10,100,1000', help='jumlah baris per request, dipisah koma')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--per-line-lookup', action='store_true', help='satu query per item_code (pembanding)')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as inventory_app
+    from app import app, db, Item
+
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            Item(item_code=f'BENCH-{index:05d}', name=f'Bench item {index}', unit='pcs', stock_quantity=100)
+            for index in range(args.items)
+        ])
+        db.session.commit()
+
+    if args.per_line_lookup:
+        def get_items_per_line(item_codes):
+            return {item_code: Item.query.filter_by(item_code=item_code).first() for item_code in item_codes}
+        inventory_app.get_items_by_codes = get_items_per_line
+
+    client = app.test_client()
+    print(f"catalog: {args.items} items, {args.repeat} requests per size"
+          + (', per-line lookup' if args.per_line_lookup else ''))
+    for line_count in [int(value) for value in args.lines.split(',')]:
+        payload = {'items': [{'item_code': f'BENCH-{index % args.items:05d}', 'requested_quantity': 1}
+                             for index in range(line_count)]}
+        response = client.post('/api/check-availability', json=payload)
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            client.post('/api/check-availability', json=payload)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"  {line_count:5d} lines  mean {sum(timings) / len(timings):7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""Benchmark muat halaman inventory: fetch GraphQL berurutan vs satu request batch.
+
+Halaman staff inventory memuat item, QC log dan approved order. Skrip ini menjalankan
+inventory-service dan order-service sungguhan (HTTP lokal, database SQLite sementara
+berisi data contoh) lalu mengukur waktu muat ketiga data itu dengan tiga cara:
+  - sequential: tiga fetch POST /graphql satu per satu (seperti halaman sekarang)
+  - batch:      satu POST /graphql berisi array tiga operasi, dieksekusi berurutan
+  - parallel:   batch yang sama dengan GRAPHQL_BATCH_WORKERS=3
+
+    python bench_graphql_batch.py --loads 100 --rtt-ms 20
+
+--rtt-ms menambahkan jeda per round trip HTTP di sisi klien untuk meniru jaringan
+antara browser dan server. APPROVED_ORDERS_CACHE_TTL=0 agar approvedOrders selalu
+mengambil dari order-service seperti pada muat pertama.
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+SERVICE_DIR = os.path.dirname(os.path.abspath(__file__))
+ORDER_SERVICE_DIR = os.path.join(os.path.dirname(SERVICE_DIR), 'order-service')
+
+PAGE_OPERATIONS = [
+    {'operationName': 'GetItems', 'query': """
+        query GetItems {
+            items { id itemCode name description category unit unitPrice stockQuantity createdAt updatedAt }
+        }
+    """},
+    {'operationName': 'GetQCLogs', 'query': """
+        query GetQCLogs {
+            qcLogs { id orderId orderNumber restaurantName itemCode itemName quantity sentToQcAt qcStatus }
+        }
+    """},
+    {'operationName': 'GetApprovedOrders', 'query': """
+        query GetApprovedOrders {
+            approvedOrders { id orderNumber restaurantName approvedDate items }
+        }
+    """},
+]
+
+# Dijalankan di process service masing-masing (argumen: jumlah data..., port): isi database lalu layani HTTP
+INVENTORY_SERVER = """
+import sys
+from datetime import datetime
+from app import app, db, Item, QCLog, run_migrations, MIGRATIONS
+with app.app_context():
+    run_migrations(db.engine, MIGRATIONS, db.metadata)
+    db.session.add_all([Item(item_code=f'BENCH-{i:04d}', name=f'Bench item {i}', category=f'cat-{i % 10}', unit='pcs',
+                             stock_quantity=1000, unit_price=1500) for i in range(int(sys.argv[1]))])
+    db.session.add_all([QCLog(order_id=100000 + i, order_number=f'QC-{i}', restaurant_name='Bench', item_code='BENCH-0001',
+                              item_name='Bench item 1', quantity=1, sent_to_qc_at=datetime.utcnow()) for i in range(int(sys.argv[2]))])
+    db.session.commit()
+app.run(host='127.0.0.1', port=int(sys.argv[3]), threaded=True)
+"""
+
+ORDER_SERVER = """
+import sys
+from datetime import datetime
+from app import app, db, Order, OrderItem, OrderStatus, run_migrations, MIGRATIONS
+with app.app_context():
+    run_migrations(db.engine, MIGRATIONS, db.metadata)
+    db.session.add_all([Order(order_number=f'BENCH-{i:04d}', restaurant_id='bench', restaurant_name='Bench',
+                              status=OrderStatus.APPROVED, requested_date=datetime.utcnow(), approved_date=datetime.utcnow(),
+                              items=[OrderItem(item_code=f'BENCH-{line:04d}', item_name='Bench', requested_quantity=2,
+                                               approved_quantity=2, unit='pcs') for line in range(3)])
+                        for i in range(int(sys.argv[1]))])
+    db.session.commit()
+app.run(host='127.0.0.1', port=int(sys.argv[2]), threaded=True)
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_service(directory, script, script_args, env):
+    return subprocess.Popen([sys.executable, '-c', script] + [str(arg) for arg in script_args], cwd=directory,
+                            env={**os.environ, **env}, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_ready(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f'{url} did not start')
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def load_sequential(session, url, rtt):
+    for operation in PAGE_OPERATIONS:
+        time.sleep(rtt)
+        response = session.post(url, json=operation)
+        response.raise_for_status()
+        assert 'errors' not in response.json(), response.text
+
+
+def load_batch(session, url, rtt):
+    time.sleep(rtt)
+    response = session.post(url, json=PAGE_OPERATIONS)
+    response.raise_for_status()
+    assert all('errors' not in result for result in response.json()), response.text
+
+
+def measure(load, url, args):
+    session = requests.Session()
+    rtt = args.rtt_ms / 1000
+    for _ in range(5):
+        load(session, url, rtt)
+    timings = []
+    for _ in range(args.loads):
+        start = time.perf_counter()
+        load(session, url, rtt)
+        timings.append((time.perf_counter() - start) * 1000)
+    return percentile(timings, 0.5), percentile(timings, 0.95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='GraphQL page load: sequential fetches vs batch')
+    parser.add_argument('--loads', type=int, default=100)
+    parser.add_argument('--items', type=int, default=200)
+    parser.add_argument('--qc-logs', type=int, default=200)
+    parser.add_argument('--orders', type=int, default=50)
+    parser.add_argument('--rtt-ms', type=float, default=0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    order_port = free_port()
+    processes = [start_service(ORDER_SERVICE_DIR, ORDER_SERVER, [args.orders, order_port], {
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'order.db')}",
+        'OUTBOX_DISPATCHER_ENABLED': 'false'
+    })]
+    inventory_urls = {}
+    for workers in (0, 3):
+        port = free_port()
+        processes.append(start_service(SERVICE_DIR, INVENTORY_SERVER, [args.items, args.qc_logs, port], {
+            'DATABASE_URL': f"sqlite:///{os.path.join(workdir, f'inventory-{workers}.db')}",
+            'ORDER_SERVICE_URL': f'http://127.0.0.1:{order_port}',
+            'APPROVED_ORDERS_CACHE_TTL': '0',
+            'GRAPHQL_BATCH_WORKERS': str(workers)
+        }))
+        inventory_urls[workers] = f'http://127.0.0.1:{port}/graphql'
+
+    try:
+        wait_until_ready(f'http://127.0.0.1:{order_port}/health')
+        for url in inventory_urls.values():
+            wait_until_ready(url.replace('/graphql', '/health'))
+
+        print(f"{args.items} items, {args.qc_logs} QC logs, {args.orders} approved orders, "
+              f"rtt {args.rtt_ms:g} ms, {args.loads} page loads")
+        for name, load, url in (('sequential', load_sequential, inventory_urls[0]),
+                                ('batch', load_batch, inventory_urls[0]),
+                                ('parallel', load_batch, inventory_urls[3])):
+            p50, p95 = measure(load, url, args)
+            print(f"  {name:10s}  p50 {p50:7.1f} ms  p95 {p95:7.1f} ms")
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Microbenchmark CPU per request GraphQL: parse + validasi ulang vs cache dokumen.
+
+Query diambil dari frontend/inventory/manage-inventory.html. Untuk setiap query diukur
+CPU (time.process_time) untuk menyiapkan dokumen dengan cara bawaan graphql-core (parse
++ validate setiap request) dan lewat DocumentCacheBackend, lalu CPU satu request
+POST /graphql penuh (GetItems, 20 item) dengan GraphQLView bawaan vs CachedGraphQLView:
+
+    python bench_graphql_documents.py --repeat 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+QUERIES = {
+    'GetItems': """
+        query GetItems {
+            items { id itemCode name description category unit unitPrice stockQuantity createdAt updatedAt }
+        }
+    """,
+    'UpdateItem': """
+        mutation UpdateItem($itemCode: String!, $name: String, $stockQuantity: Int, $description: String, $unit: String, $category: String, $unitPrice: Float) {
+            updateItem(itemCode: $itemCode, name: $name, stockQuantity: $stockQuantity, description: $description, unit: $unit, category: $category, unitPrice: $unitPrice) {
+                item { id itemCode name description category unit unitPrice stockQuantity }
+            }
+        }
+    """,
+    'CreateItem': """
+        mutation CreateItem($itemCode: String!, $name: String!, $stockQuantity: Int!, $description: String, $unit: String, $category: String, $unitPrice: Float) {
+            createItem(itemCode: $itemCode, name: $name, stockQuantity: $stockQuantity, description: $description, unit: $unit, category: $category, unitPrice: $unitPrice) {
+                item { id itemCode name description category unit unitPrice stockQuantity }
+            }
+        }
+    """,
+    'SendToQC': """
+        mutation SendToQC($orderId: Int!, $itemCode: String!, $itemName: String!, $quantity: Int!) {
+            sendToQc(orderId: $orderId, itemCode: $itemCode, itemName: $itemName, quantity: $quantity) { success message }
+        }
+    """,
+}
+
+
+def cpu_per_call(func, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        func()
+    return (time.process_time() - start) / repeat * 1e6  # mikrodetik
+
+
+def main():
+    parser = argparse.ArgumentParser(description='GraphQL document cache microbenchmark')
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from app import app, db, Item, Query, Mutation, run_migrations, MIGRATIONS  # app dulu: shim collections
+    import graphene
+    from flask_graphql import GraphQLView
+    from graphql import parse, validate
+    from graphql_cache import CachedGraphQLView, DocumentCacheBackend
+
+    schema = graphene.Schema(query=Query, mutation=Mutation)
+    backend = DocumentCacheBackend()
+
+    print(f"{'query':12s} {'parse+validate':>15s} {'cached':>10s}   (CPU us per request)")
+    for name, query in QUERIES.items():
+        uncached = cpu_per_call(lambda: validate(schema, parse(query)), args.repeat)
+        backend.document_from_string(schema, query)
+        cached = cpu_per_call(lambda: backend.document_from_string(schema, query), args.repeat)
+        print(f"{name:12s} {uncached:15.1f} {cached:10.1f}")
+
+    with app.app_context():
+        run_migrations(db.engine, MIGRATIONS, db.metadata)
+        db.session.add_all([Item(item_code=f'BENCH-{index:03d}', name=f'Bench item {index}', unit='pcs',
+                                 stock_quantity=100) for index in range(20)])
+        db.session.commit()
+    app.add_url_rule('/graphql-uncached', view_func=GraphQLView.as_view('graphql_uncached', schema=schema))
+    app.add_url_rule('/graphql-cached', view_func=CachedGraphQLView.as_view(
+        'graphql_cached', schema=schema, backend=DocumentCacheBackend()))
+
+    client = app.test_client()
+    body = {'query': QUERIES['GetItems']}
+    repeat = max(args.repeat // 10, 50)
+    for url in ('/graphql-uncached', '/graphql-cached'):
+        assert 'errors' not in client.post(url, json=body).get_json()
+    uncached = cpu_per_call(lambda: client.post('/graphql-uncached', json=body), repeat)
+    cached = cpu_per_call(lambda: client.post('/graphql-cached', json=body), repeat)
+    print(f"\nPOST /graphql GetItems: GraphQLView {uncached:.0f} us, CachedGraphQLView {cached:.0f} us "
+          f"({(uncached - cached) / uncached * 100:.0f}% less CPU)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark beban campuran baca/tulis pada SQLite, dengan dan tanpa tuning PRAGMA.
+
+Setiap putaran memakai file SQLite baru dan app inventory in-process (tanpa HTTP).
+N client (process terpisah, seperti worker gunicorn) bersamaan menjalankan campuran GET /api/items (halaman), GET stock per item
+dan POST /api/reserve-stock selama beberapa detik. Putaran pertama memakai setting
+bawaan SQLite (SQLITE_TUNING=off), putaran kedua memakai PRAGMA dari db_engine.py:
+
+    python bench_mixed_load.py --clients 16 --duration 10 --write-ratio 0.2
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_pass(args):
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from app import app, db, Item
+
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            Item(item_code=f'BENCH-{index:05d}', name=f'Bench item {index}', category=f'cat-{index % 10}',
+                 unit='pcs', stock_quantity=10 ** 6)
+            for index in range(args.items)
+        ])
+        db.session.commit()
+        pragmas = {name: db.session.execute(db.text(f'PRAGMA {name}')).scalar()
+                   for name in ('journal_mode', 'synchronous', 'busy_timeout')}
+
+    deadline = time.time() + 1 + args.duration  # 1 detik untuk fork semua client
+
+    def client_loop(index, results):
+        # Setiap client adalah process terpisah (seperti worker gunicorn) agar tidak berbagi GIL
+        with app.app_context():
+            db.engine.dispose(close=False)  # jangan pakai koneksi milik parent setelah fork
+        client = app.test_client()
+        rng = random.Random(index)
+        next_order_id = index * 10 ** 7
+        latencies = {'read': [], 'write': []}
+        errors = {'read': 0, 'write': 0}
+        while time.time() < deadline - args.duration:
+            time.sleep(0.01)
+        while time.time() < deadline:
+            if rng.random() < args.write_ratio:
+                kind = 'write'
+                next_order_id += 1
+                items = [{'item_code': f'BENCH-{item:05d}', 'quantity': 1}
+                         for item in rng.sample(range(args.items), 2)]
+                start = time.perf_counter()
+                response = client.post('/api/reserve-stock', json={'order_id': next_order_id, 'items': items})
+            else:
+                kind = 'read'
+                start = time.perf_counter()
+                if rng.random() < 0.5:
+                    response = client.get(f'/api/items?limit=50&cursor={rng.randrange(args.items)}')
+                else:
+                    response = client.get(f'/api/items/BENCH-{rng.randrange(args.items):05d}/stock')
+            latencies[kind].append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                errors[kind] += 1
+        results.put((latencies, errors))
+
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    processes = [context.Process(target=client_loop, args=(index, results)) for index in range(args.clients)]
+    for process in processes:
+        process.start()
+    stats = {'read': [], 'write': []}
+    errors = {'read': 0, 'write': 0}
+    for _ in processes:
+        latencies, client_errors = results.get()
+        for kind in stats:
+            stats[kind].extend(latencies[kind])
+            errors[kind] += client_errors[kind]
+    for process in processes:
+        process.join()
+
+    total = len(stats['read']) + len(stats['write'])
+    print(f"SQLITE_TUNING={os.getenv('SQLITE_TUNING', 'on')} "
+          + ' '.join(f"{name}={value}" for name, value in pragmas.items()))
+    print(f"  total:  {total / args.duration:8.1f} ops/s")
+    for kind in ('read', 'write'):
+        latencies = stats[kind]
+        print(f"  {kind:5s}: {len(latencies) / args.duration:8.1f} ops/s  "
+              f"p50 {percentile(latencies, 0.5):7.1f} ms  p99 {percentile(latencies, 0.99):7.1f} ms  "
+              f"errors {errors[kind]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mixed read/write SQLite benchmark')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--items', type=int, default=2000)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--single-pass', action='store_true', help='satu putaran dengan SQLITE_TUNING saat ini')
+    args = parser.parse_args()
+
+    if args.single_pass:
+        run_pass(args)
+        return
+
+    # Setiap putaran di process terpisah agar hook PRAGMA dan engine tidak terbawa
+    for tuning in ('off', 'on'):
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--single-pass'] + sys.argv[1:],
+                       env={**os.environ, 'SQLITE_TUNING': tuning}, check=True)
+
+
+if __name__ == '__main__':
+    main()
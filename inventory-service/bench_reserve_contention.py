@@ -0,0 +1,94 @@
+"""Stress test reserve-stock pada item yang diperebutkan: tidak boleh ada oversell.
+
+Menjalankan app inventory in-process (Flask test client, tanpa HTTP) dengan N thread
+yang masing-masing mengirim beberapa reservasi dua baris (HOT-A dan HOT-B, 1 unit)
+untuk order berbeda, lalu membandingkan jumlah reservasi yang diterima dengan
+reserved_quantity akhir di database:
+
+    python bench_reserve_contention.py --threads 50 --per-thread 10 --stock 200
+    python bench_reserve_contention.py --read-modify-write
+
+--read-modify-write mengganti reserve_items dengan pola lama (baca item, cek stok di
+Python, tambah reserved_quantity lalu commit) sebagai pembanding.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+HOT_ITEMS = ['HOT-A', 'HOT-B']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stress reserve-stock on contended items')
+    parser.add_argument('--threads', type=int, default=50)
+    parser.add_argument('--per-thread', type=int, default=10, help='reservasi per thread')
+    parser.add_argument('--stock', type=int, default=200, help='stock awal tiap item')
+    parser.add_argument('--read-modify-write', action='store_true', help='pola reserve lama (pembanding)')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as inventory_app
+    from app import app, db, Item
+
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([Item(item_code=item_code, name=item_code, unit='pcs', stock_quantity=args.stock)
+                            for item_code in HOT_ITEMS])
+        db.session.commit()
+
+    if args.read_modify_write:
+        def reserve_read_modify_write(order_id, lines):
+            for line in lines:
+                item = Item.query.filter_by(item_code=line['item_code']).first()
+                if not item:
+                    return False, f"Item {line['item_code']} not found", 404
+                if item.available_quantity < line['quantity']:
+                    return False, f"Insufficient stock for {line['item_code']}", 400
+                item.reserved_quantity += line['quantity']
+            db.session.commit()
+            return True, 'Stock reserved successfully', 200
+        inventory_app.reserve_items = reserve_read_modify_write
+
+    statuses = []
+    statuses_lock = threading.Lock()
+
+    def worker(thread_index):
+        client = app.test_client()
+        for offset in range(args.per_thread):
+            order_id = thread_index * args.per_thread + offset + 1
+            response = client.post('/api/reserve-stock', json={
+                'order_id': order_id,
+                'items': [{'item_code': item_code, 'quantity': 1} for item_code in HOT_ITEMS]
+            })
+            with statuses_lock:
+                statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        reserved = {item.item_code: item.reserved_quantity for item in Item.query.filter(Item.item_code.in_(HOT_ITEMS))}
+    accepted = statuses.count(200)
+    rejected = statuses.count(400)
+    print(f"{args.threads} threads x {args.per_thread} reservations of {' + '.join(HOT_ITEMS)}, stock {args.stock}"
+          + (', read-modify-write' if args.read_modify_write else ''))
+    print(f"accepted:          {accepted}")
+    print(f"rejected:          {rejected}")
+    print(f"other statuses:    {len(statuses) - accepted - rejected}")
+    print(f"reserved_quantity: {reserved}")
+    print(f"consistent:        {all(quantity == accepted for quantity in reserved.values())}"
+          f"  oversold: {any(quantity > args.stock for quantity in reserved.values())}")
+    print(f"throughput:        {accepted / elapsed:.1f} accepted reservations/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,432 @@
+"""Cache dokumen GraphQL yang sudah di-parse dan divalidasi, plus persisted query.
+
+Halaman frontend mengirim teks query yang sama berulang-ulang, sedangkan graphql-core 2
+mem-parse dan memvalidasi ulang di setiap request. DocumentCacheBackend menyimpan
+dokumen hasil parse + validasi di LRU dengan key sha256 teks query, sehingga request
+berikutnya langsung dieksekusi. Satu backend dipakai untuk satu schema.
+
+Persisted query mengikuti protokol Automatic Persisted Queries (Apollo): klien cukup
+mengirim hash
+
+    {"extensions": {"persistedQuery": {"version": 1, "sha256Hash": "<hex>"}}}
+
+Jika hash belum dikenal, server menjawab error PersistedQueryNotFound lalu klien
+mengirim ulang dengan query lengkap + hash, dan query itu didaftarkan. Query juga bisa
+didaftarkan saat startup dari file JSON {hash: query} yang tidak pernah dievict;
+file tersebut dibuat dengan `python graphql_cache.py query1.graphql query2.graphql`.
+File ini identik di setiap service yang memakainya.
+
+ResponseCache (opsional) menyimpan hasil operasi query, dengan key dokumen yang sudah
+dinormalisasi + operationName + variables. Hanya query yang semua root field-nya
+terdaftar di `query_tags` yang di-cache; setiap field membawa tag tipe data (mis. 'Item').
+Mutation meng-invalidate tag di `mutation_tags` setelah dieksekusi; mutation yang tidak
+terdaftar meng-invalidate semua tag. Invalidasi ini hanya berlaku di process sendiri,
+jadi setiap entry juga dibatasi TTL. Tag yang punya penanda versi di database
+(`tag_versions`, mis. versi katalog) ikut dicek di setiap hit sehingga perubahan dari
+process lain atau dari REST langsung terlihat. Field yang hasilnya bergantung pada user
+yang login tidak boleh didaftarkan.
+
+CachedGraphQLView menerima batch: body berupa array operasi dijalankan dalam satu request
+HTTP dan hasilnya dikembalikan sebagai array dengan urutan yang sama. Jika semua operasi
+dalam batch adalah query dan GRAPHQL_BATCH_WORKERS > 0, operasi dijalankan paralel di
+thread pool, masing-masing dengan app context (session database, flask.g) sendiri;
+batch yang berisi mutation selalu dijalankan berurutan.
+
+Konfigurasi lewat environment:
+    GRAPHQL_DOCUMENT_CACHE_SIZE      jumlah dokumen di LRU (default 500)
+    GRAPHQL_PERSISTED_QUERIES_FILE   file JSON query terdaftar (opsional)
+    GRAPHQL_RESPONSE_CACHE_MB        batas memori cache response; 0 = nonaktif (default 0)
+    GRAPHQL_RESPONSE_CACHE_TTL       umur maksimal hasil di cache dalam detik (default 10)
+    GRAPHQL_BATCH_MAX_OPERATIONS     jumlah operasi maksimal per batch (default 20)
+    GRAPHQL_BATCH_WORKERS            thread untuk query paralel dalam batch; 0 = berurutan (default 0)
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from flask import Response, copy_current_request_context, request
+from flask_graphql import GraphQLView
+from graphql import parse, validate
+from graphql.language import ast
+from graphql.language.printer import print_ast
+from graphql.utils.get_operation_ast import get_operation_ast
+from graphql.backend import GraphQLBackend, GraphQLDocument
+from graphql.execution import ExecutionResult, execute
+from graphql_server import HttpQueryError, encode_execution_results, run_http_query
+
+PERSISTED_QUERY_NOT_FOUND = 'PersistedQueryNotFound'
+
+
+def query_hash(query):
+    return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+
+def load_persisted_queries(path):
+    """Membaca file {hash: query}; hash yang tidak cocok dengan isinya ditolak"""
+    with open(path) as persisted_file:
+        queries = json.load(persisted_file)
+    for sha256_hash, query in queries.items():
+        if query_hash(query) != sha256_hash:
+            raise ValueError(f'Persisted query hash mismatch: {sha256_hash}')
+    return queries
+
+
+def _invalid_document(errors, *args, **kwargs):
+    return ExecutionResult(errors=errors, invalid=True)
+
+
+def _operation(document_ast, operation_name):
+    operations = [definition for definition in document_ast.definitions
+                  if isinstance(definition, ast.OperationDefinition)]
+    if operation_name:
+        return next((operation for operation in operations
+                     if operation.name and operation.name.value == operation_name), None)
+    return operations[0] if len(operations) == 1 else None
+
+
+def _root_field_names(operation):
+    """Nama root field operasi; None jika ada fragment di root (tidak bisa dipetakan ke tag)"""
+    names = []
+    for selection in operation.selection_set.selections:
+        if not isinstance(selection, ast.Field):
+            return None
+        names.append(selection.name.value)
+    return names
+
+
+class ResponseCache:
+    """Cache hasil operasi query dengan invalidasi per tag dan batas memori (LRU)"""
+
+    def __init__(self, query_tags, mutation_tags=None, tag_versions=None, max_bytes=0, ttl=10):
+        self.query_tags = query_tags  # root field query -> tag data yang dibaca
+        self.mutation_tags = mutation_tags or {}  # root field mutation -> tag data yang diubah
+        self.tag_versions = tag_versions or {}  # tag -> fungsi penanda versi di database
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (data, tag_state, expires_at, size)
+        self._generations = {}  # tag -> jumlah invalidasi di process ini
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls, query_tags, mutation_tags=None, tag_versions=None):
+        """ResponseCache sesuai environment; None jika GRAPHQL_RESPONSE_CACHE_MB tidak di-set"""
+        max_bytes = int(float(os.getenv('GRAPHQL_RESPONSE_CACHE_MB', 0)) * 1024 * 1024)
+        if max_bytes <= 0:
+            return None
+        return cls(query_tags, mutation_tags, tag_versions, max_bytes=max_bytes,
+                   ttl=float(os.getenv('GRAPHQL_RESPONSE_CACHE_TTL', 10)))
+
+    def _tag_state(self, tags):
+        # Versi database dibaca di luar lock (query ke database)
+        versions = {tag: self.tag_versions[tag]() for tag in tags if tag in self.tag_versions}
+        with self._lock:
+            return tuple((tag, self._generations.get(tag, 0), versions.get(tag)) for tag in tags)
+
+    def invalidate(self, tags=None):
+        """Tandai hasil yang membaca `tags` (None = semua tag) sebagai basi"""
+        with self._lock:
+            for tag in (self._all_tags() if tags is None else tags):
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            self.invalidations += 1
+
+    def _all_tags(self):
+        return {tag for tags in self.query_tags.values() for tag in tags}
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[3]
+
+    def _store(self, key, data, tag_state, expires_at):
+        size = len(json.dumps(data, default=str))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (data, tag_state, expires_at, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def execute(self, schema, document_ast, normalized_query, operation_name=None, variable_values=None, **kwargs):
+        """Pengganti graphql.execute untuk satu dokumen; dipasang oleh DocumentCacheBackend"""
+        operation = _operation(document_ast, operation_name)
+        field_names = _root_field_names(operation) if operation is not None else None
+        run = partial(execute, schema, document_ast, operation_name=operation_name,
+                      variable_values=variable_values, **kwargs)
+        if field_names is None or kwargs.get('return_promise'):
+            return run()
+
+        if operation.operation == 'mutation':
+            try:
+                return run()
+            finally:
+                if all(name in self.mutation_tags for name in field_names):
+                    self.invalidate({tag for name in field_names for tag in self.mutation_tags[name]})
+                else:
+                    self.invalidate()
+
+        if operation.operation != 'query' or not all(name in self.query_tags for name in field_names):
+            return run()
+
+        tags = sorted({tag for name in field_names for tag in self.query_tags[name]})
+        key = query_hash(json.dumps([normalized_query, operation_name, variable_values],
+                                    sort_keys=True, default=str))
+        tag_state = self._tag_state(tags)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == tag_state and entry[2] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return ExecutionResult(data=entry[0])
+            if entry is not None:
+                self._remove(key)
+                self.stale += 1
+            self.misses += 1
+
+        # tag_state diambil sebelum eksekusi: perubahan selama eksekusi membuat entry ini basi
+        result = run()
+        if isinstance(result, ExecutionResult) and not result.errors and not result.invalid:
+            self._store(key, result.data, tag_state, time.monotonic() + self.ttl)
+        return result
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'stale': self.stale,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+
+class DocumentCacheBackend(GraphQLBackend):
+    """Backend graphql-core yang meng-cache dokumen hasil parse + validasi (LRU)"""
+
+    def __init__(self, max_entries=500, persisted_queries=None, response_cache=None):
+        self.max_entries = max_entries
+        self.response_cache = response_cache
+        self._documents = OrderedDict()  # sha256 -> GraphQLDocument
+        self._persisted = dict(persisted_queries or {})  # sha256 -> query terdaftar
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.persisted_hits = 0
+        self.persisted_misses = 0
+
+    @classmethod
+    def from_env(cls, response_cache=None):
+        path = os.getenv('GRAPHQL_PERSISTED_QUERIES_FILE')
+        return cls(
+            max_entries=int(os.getenv('GRAPHQL_DOCUMENT_CACHE_SIZE', 500)),
+            persisted_queries=load_persisted_queries(path) if path else None,
+            response_cache=response_cache
+        )
+
+    def _build_document(self, schema, query):
+        # Error sintaks di-raise dan tidak di-cache; error validasi di-cache bersama dokumennya
+        document_ast = parse(query)
+        errors = validate(schema, document_ast)
+        if errors:
+            execute_document = partial(_invalid_document, errors)
+        elif self.response_cache is not None:
+            execute_document = partial(self.response_cache.execute, schema, document_ast, print_ast(document_ast))
+        else:
+            execute_document = partial(execute, schema, document_ast)
+        return GraphQLDocument(schema=schema, document_string=query, document_ast=document_ast,
+                               execute=execute_document)
+
+    def document_from_string(self, schema, request_string):
+        key = query_hash(request_string)
+        with self._lock:
+            document = self._documents.get(key)
+            if document is not None and document.schema is schema:
+                self._documents.move_to_end(key)
+                self.hits += 1
+                return document
+            self.misses += 1
+
+        document = self._build_document(schema, request_string)
+        with self._lock:
+            self._documents[key] = document
+            self._documents.move_to_end(key)
+            while len(self._documents) > self.max_entries:
+                self._documents.popitem(last=False)
+                self.evictions += 1
+        return document
+
+    def peek_document(self, schema, request_string):
+        """Dokumen yang sudah di-cache tanpa mengubah counter / urutan LRU; None jika belum ada"""
+        with self._lock:
+            document = self._documents.get(query_hash(request_string))
+        return document if document is not None and document.schema is schema else None
+
+    def lookup_persisted(self, sha256_hash):
+        """Teks query untuk hash persisted; None jika belum pernah didaftarkan / sudah dievict"""
+        with self._lock:
+            query = self._persisted.get(sha256_hash)
+            if query is None:
+                document = self._documents.get(sha256_hash)
+                query = document.document_string if document is not None else None
+            if query is None:
+                self.persisted_misses += 1
+            else:
+                self.persisted_hits += 1
+            return query
+
+    def stats(self):
+        response_stats = self.response_cache.stats() if self.response_cache is not None else None
+        with self._lock:
+            return {
+                'response_cache': response_stats,
+                'documents': len(self._documents),
+                'max_entries': self.max_entries,
+                'registered_persisted_queries': len(self._persisted),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'persisted_hits': self.persisted_hits,
+                'persisted_misses': self.persisted_misses
+            }
+
+
+def batch_pool_from_env():
+    """Thread pool untuk query paralel dalam batch; None jika GRAPHQL_BATCH_WORKERS tidak di-set"""
+    workers = int(os.getenv('GRAPHQL_BATCH_WORKERS', 0))
+    if workers <= 0:
+        return None
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='graphql-batch')
+
+
+class CachedGraphQLView(GraphQLView):
+    """GraphQLView yang memakai DocumentCacheBackend, menerima persisted query dan batch"""
+
+    batch_pool = None
+    max_batch_operations = int(os.getenv('GRAPHQL_BATCH_MAX_OPERATIONS', 20))
+    _body = None
+
+    def _resolve_persisted(self, params, query_args):
+        extensions = params.get('extensions') or query_args.get('extensions')
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpQueryError(400, 'Extensions are invalid JSON.')
+        persisted = (extensions or {}).get('persistedQuery')
+        if not persisted:
+            return params
+
+        sha256_hash = persisted.get('sha256Hash')
+        query = params.get('query') or query_args.get('query')
+        if query:
+            if query_hash(query) != sha256_hash:
+                raise HttpQueryError(400, 'provided sha does not match query')
+            # Dokumen terdaftar ke cache saat dieksekusi (key cache = hash yang sama)
+            return params
+
+        query = self.backend.lookup_persisted(sha256_hash)
+        if query is None:
+            raise HttpQueryError(400, PERSISTED_QUERY_NOT_FOUND)
+        return {**params, 'query': query}
+
+    def parse_body(self):
+        # View dibuat per request; body disimpan karena dispatch_request membacanya sebelum parent
+        if self._body is None:
+            data = super().parse_body()
+            if isinstance(data, list):
+                if len(data) > self.max_batch_operations:
+                    raise HttpQueryError(400, f'Batch is limited to {self.max_batch_operations} operations.')
+                self._body = [self._resolve_persisted(dict(entry), {}) for entry in data]
+            else:
+                self._body = self._resolve_persisted(dict(data), request.args)
+        return self._body
+
+    def _is_query(self, params):
+        # Hanya melihat jenis operasi: lookup tanpa counter, eksekusi nanti yang dihitung hit / miss
+        query = params.get('query')
+        if not isinstance(query, str):
+            return False
+        document = self.get_backend().peek_document(self.schema, query)
+        try:
+            document_ast = document.document_ast if document is not None else parse(query)
+        except Exception:
+            return False
+        operation = get_operation_ast(document_ast, params.get('operationName'))
+        return operation is not None and operation.operation == 'query'
+
+    def dispatch_request(self):
+        if self.batch_pool is not None and request.method == 'POST':
+            try:
+                data = self.parse_body()
+            except HttpQueryError:
+                data = None  # Error dijawab oleh parent
+            if isinstance(data, list) and len(data) > 1 and all(self._is_query(params) for params in data):
+                return self._dispatch_parallel(data)
+        return super().dispatch_request()
+
+    def _error_response(self, error):
+        return Response(
+            self.encode({'errors': [self.format_error(error)]}),
+            status=error.status_code,
+            headers=error.headers,
+            content_type='application/json'
+        )
+
+    def _dispatch_parallel(self, data):
+        execute_options = {
+            'backend': self.get_backend(),
+            'root': self.get_root_value(),
+            'context': self.get_context(),
+            'middleware': self.get_middleware()
+        }
+
+        def run(params):
+            execution_results, _ = run_http_query(self.schema, 'post', params, **execute_options)
+            return execution_results[0]
+
+        # Setiap operasi mendapat salinan request context, sehingga app context-nya terpisah
+        futures = [self.batch_pool.submit(copy_current_request_context(run), params) for params in data]
+        try:
+            execution_results = [future.result() for future in futures]
+        except HttpQueryError as error:
+            return self._error_response(error)
+
+        result, status_code = encode_execution_results(
+            execution_results,
+            is_batch=True,
+            format_error=self.format_error,
+            encode=partial(self.encode, pretty=self.pretty or request.args.get('pretty'))
+        )
+        return Response(result, status=status_code, content_type='application/json')
+
+
+if __name__ == '__main__':
+    # Membuat file persisted query dari file .graphql
+    manifest = {}
+    for path in sys.argv[1:]:
+        with open(path) as query_file:
+            query = query_file.read()
+        manifest[query_hash(query)] = query
+    print(json.dumps(manifest, indent=2))
@@ -0,0 +1,102 @@
+"""Connection GraphQL ala Relay dengan cursor keyset (first / after).
+
+Field list lama memuat seluruh tabel dengan .all(). Field connection hanya mengambil
+`first` + 1 baris setelah cursor, diurutkan kolom yang ber-index, sehingga halaman
+mana pun dimuat dengan biaya yang sama berapa pun besar tabelnya:
+
+    query { itemsConnection(first: 50, after: "<endCursor>") {
+        edges { cursor node { id name } }
+        pageInfo { hasNextPage endCursor }
+        totalCount
+    } }
+
+Cursor berisi nilai kolom urutan baris terakhir (base64 JSON) dan hanya berlaku untuk
+urutan field yang sama. totalCount menjalankan COUNT hanya jika field itu diminta.
+Kolom urutan harus NOT NULL dan diakhiri kolom unik (biasanya id). File ini identik
+di setiap service yang memakainya.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+import graphene
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class CountableConnection(graphene.relay.Connection):
+    """Connection dengan totalCount yang dihitung lazy dari query tanpa cursor/limit"""
+
+    class Meta:
+        abstract = True
+
+    total_count = graphene.Int()
+
+    def resolve_total_count(self, info):
+        return self.count_query.order_by(None).count()
+
+
+def connection_field(connection_type, **kwargs):
+    """Field connection dengan argumen first/after (+ argumen filter `kwargs`)"""
+    return graphene.Field(connection_type, first=graphene.Int(), after=graphene.String(), **kwargs)
+
+
+def encode_cursor(values):
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, columns):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        return [datetime.fromisoformat(value) if column.type.python_type is datetime else column.type.python_type(value)
+                for column, value in zip(columns, values)]
+    except (ValueError, TypeError, UnicodeError, binascii.Error):
+        raise Exception('Invalid cursor')
+
+
+def _after_condition(columns, values, descending):
+    # (c1, c2, ...) > (v1, v2, ...) ditulis c1 >= v1 AND (c1 > v1 OR ...) agar index c1 tetap dipakai
+    column, value = columns[0], values[0]
+    if len(columns) == 1:
+        return column < value if descending else column > value
+    strictly_after = column < value if descending else column > value
+    not_before = column <= value if descending else column >= value
+    return and_(not_before, or_(strictly_after, _after_condition(columns[1:], values[1:], descending)))
+
+
+def keyset_connection(connection_type, query, order_columns, first=None, after=None, descending=False):
+    """Satu halaman `query` sebagai `connection_type`, diurutkan `order_columns`"""
+    first = DEFAULT_PAGE_SIZE if first is None else first
+    if first < 0:
+        raise Exception('Argument "first" must be a non-negative integer')
+    first = min(first, MAX_PAGE_SIZE)
+
+    page_query = query
+    if after:
+        page_query = page_query.filter(_after_condition(order_columns, decode_cursor(after, order_columns), descending))
+    page_query = page_query.order_by(*[column.desc() if descending else column.asc() for column in order_columns])
+    rows = page_query.limit(first + 1).all()
+    has_next_page = len(rows) > first
+    rows = rows[:first]
+
+    edges = [
+        connection_type.Edge(node=row, cursor=encode_cursor([getattr(row, column.key) for column in order_columns]))
+        for row in rows
+    ]
+    connection = connection_type(
+        edges=edges,
+        page_info=graphene.relay.PageInfo(
+            has_next_page=has_next_page,
+            has_previous_page=bool(after),
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None
+        )
+    )
+    connection.count_query = query
+    return connection
@@ -0,0 +1,164 @@
+"""Runner migrasi skema berversi.
+
+Versi yang sudah diterapkan dicatat di tabel schema_migrations, sehingga startup hanya
+menjalankan migrasi yang belum diterapkan dan tidak pernah menghapus atau membuat ulang
+tabel yang berisi data. File ini identik di setiap service yang memakainya; daftar
+migrasi tiap service ada di migrations.py masing-masing.
+
+Aturan menulis migrasi:
+- version selalu naik; migrasi yang sudah dirilis tidak diubah lagi
+- upgrade(connection, metadata) harus idempoten: migrasi 1 membuat tabel dari model
+  terkini untuk database baru, jadi migrasi berikutnya bisa menemukan perubahannya
+  sudah ada (pakai create_index / add_column di bawah)
+- index untuk tabel besar dibuat dengan create_index(); di PostgreSQL ini berjalan
+  CONCURRENTLY tanpa mengunci tulis, dan migrasinya harus transactional=False
+
+run_migrations() dijalankan di bawah lock lintas process (advisory lock PostgreSQL,
+file lock untuk SQLite), sehingga worker gunicorn yang start bersamaan tidak
+menjalankan DDL yang sama secara paralel; worker berikutnya hanya melihat semua
+migrasi sudah tercatat.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: tanpa file lock, andalkan retry IntegrityError di bawah
+    fcntl = None
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+_runner_metadata = MetaData()
+schema_migrations = Table(
+    'schema_migrations', _runner_metadata,
+    Column('version', Integer, primary_key=True),
+    Column('name', String(200), nullable=False),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+
+class Migration:
+    def __init__(self, version, name, upgrade, transactional=True):
+        self.version = version
+        self.name = name
+        self.upgrade = upgrade
+        self.transactional = transactional
+
+
+def _check_versions(migrations):
+    versions = [migration.version for migration in migrations]
+    if len(set(versions)) != len(versions):
+        raise ValueError('Duplicate migration version')
+
+
+def applied_versions(engine):
+    _runner_metadata.create_all(engine)
+    with engine.connect() as connection:
+        return {row.version for row in connection.execute(select(schema_migrations.c.version))}
+
+
+def _record(connection, migration):
+    connection.execute(schema_migrations.insert().values(
+        version=migration.version, name=migration.name, applied_at=datetime.utcnow()
+    ))
+
+
+# Kunci pg_advisory_lock untuk run_migrations (berlaku per database)
+MIGRATION_LOCK_KEY = 727274
+
+
+@contextmanager
+def migration_lock(engine):
+    """Lock eksklusif lintas process selama migrasi dijalankan"""
+    if engine.dialect.name == 'postgresql':
+        with engine.connect() as connection:
+            connection = connection.execution_options(isolation_level='AUTOCOMMIT')
+            connection.execute(text('SELECT pg_advisory_lock(:key)'), {'key': MIGRATION_LOCK_KEY})
+            try:
+                yield
+            finally:
+                connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': MIGRATION_LOCK_KEY})
+    elif engine.dialect.name == 'sqlite' and fcntl is not None and engine.url.database not in (None, '', ':memory:'):
+        # File lock di direktori temp agar tidak ada file tambahan di samping database
+        database_path = os.path.abspath(engine.url.database)
+        lock_name = f"migrate-{hashlib.sha1(database_path.encode('utf-8')).hexdigest()[:16]}.lock"
+        with open(os.path.join(tempfile.gettempdir(), lock_name), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    else:
+        yield
+
+
+def run_migrations(engine, migrations, metadata):
+    """Terapkan migrasi yang belum tercatat, urut versi; mengembalikan versi yang diterapkan"""
+    _check_versions(migrations)
+    with migration_lock(engine):
+        return _apply_pending(engine, migrations, metadata)
+
+
+def _apply_pending(engine, migrations, metadata):
+    applied = applied_versions(engine)
+    newly_applied = []
+
+    for migration in sorted(migrations, key=lambda migration: migration.version):
+        if migration.version in applied:
+            continue
+        logger.info('Applying migration %s: %s', migration.version, migration.name)
+        try:
+            if migration.transactional:
+                with engine.begin() as connection:
+                    migration.upgrade(connection, metadata)
+                    _record(connection, migration)
+            else:
+                with engine.connect() as connection:
+                    migration.upgrade(connection.execution_options(isolation_level='AUTOCOMMIT'), metadata)
+                with engine.begin() as connection:
+                    _record(connection, migration)
+        except IntegrityError:
+            # Process lain tanpa lock yang sama (mis. di Windows) menerapkan migrasi ini lebih dulu
+            logger.info('Migration %s already applied by another process', migration.version)
+            continue
+        newly_applied.append(migration.version)
+
+    return newly_applied
+
+
+def migration_status(engine, migrations):
+    """List (version, name, sudah_diterapkan) untuk ditampilkan di CLI"""
+    applied = applied_versions(engine)
+    return [(migration.version, migration.name, migration.version in applied)
+            for migration in sorted(migrations, key=lambda migration: migration.version)]
+
+
+def create_tables(connection, metadata):
+    """Membuat tabel dan index dari model yang belum ada (tidak menyentuh tabel yang sudah ada)"""
+    metadata.create_all(bind=connection, checkfirst=True)
+
+
+def create_index(connection, name, table, columns, unique=False, using=None):
+    """CREATE INDEX IF NOT EXISTS; di PostgreSQL CONCURRENTLY (online, butuh transactional=False)
+
+    using: metode index PostgreSQL, mis. 'gin' dengan kolom 'name gin_trgm_ops'
+    """
+    concurrently = 'CONCURRENTLY ' if connection.dialect.name == 'postgresql' else ''
+    unique_sql = 'UNIQUE ' if unique else ''
+    using_sql = f'USING {using} ' if using else ''
+    connection.execute(text(
+        f"CREATE {unique_sql}INDEX {concurrently}IF NOT EXISTS {name} ON {table} {using_sql}({', '.join(columns)})"
+    ))
+
+
+def add_column(connection, table, column, ddl):
+    """ALTER TABLE ADD COLUMN jika kolom belum ada"""
+    if column not in {existing['name'] for existing in inspect(connection).get_columns(table)}:
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
@@ -0,0 +1,53 @@
+"""Daftar migrasi skema inventory-service (lihat migration_runner.py).
+
+Migrasi diterapkan saat app.py dijalankan langsung; untuk deploy dengan gunicorn
+jalankan upgrade sebelum worker dinyalakan:
+    python migrations.py            tampilkan status migrasi
+    python migrations.py upgrade    terapkan migrasi yang tertunda
+"""
+import sys
+
+from migration_runner import Migration, create_index, create_tables, migration_status, run_migrations
+
+
+def create_lookup_indexes(connection, metadata):
+    """Index untuk kolom filter/lookup yang ditambahkan setelah tabelnya sudah berisi data"""
+    create_index(connection, 'ix_items_category', 'items', ['category'])
+    create_index(connection, 'ix_items_updated_at', 'items', ['updated_at'])
+    create_index(connection, 'ix_qc_logs_order_id', 'qc_logs', ['order_id'])
+
+
+def create_qc_status_index(connection, metadata):
+    """Index qc_logs.qc_status untuk hitungan item yang masih menunggu QC"""
+    create_index(connection, 'ix_qc_logs_qc_status', 'qc_logs', ['qc_status'])
+
+
+def create_connection_indexes(connection, metadata):
+    """Index urutan keyset untuk field connection GraphQL (lihat graphql_pagination.py)"""
+    create_index(connection, 'ix_items_stock_quantity_id', 'items', ['stock_quantity', 'id'])
+    create_index(connection, 'ix_qc_logs_sent_to_qc_at_id', 'qc_logs', ['sent_to_qc_at', 'id'])
+    create_index(connection, 'ix_qc_logs_status_sent_to_qc_at_id', 'qc_logs', ['qc_status', 'sent_to_qc_at', 'id'])
+
+
+MIGRATIONS = [
+    Migration(1, 'initial schema', create_tables),
+    Migration(2, 'lookup indexes on items and qc_logs', create_lookup_indexes, transactional=False),
+    Migration(3, 'index qc_logs.qc_status', create_qc_status_index, transactional=False),
+    Migration(4, 'keyset indexes for GraphQL connections', create_connection_indexes, transactional=False),
+    Migration(5, 'approved_orders_changes table', create_tables),
+]
+
+
+def main(argv):
+    from app import app, db
+
+    with app.app_context():
+        if argv[1:] == ['upgrade']:
+            applied = run_migrations(db.engine, MIGRATIONS, db.metadata)
+            print(f"Applied migrations: {applied or 'none'}")
+        for version, name, applied in migration_status(db.engine, MIGRATIONS):
+            print(f"{version:4d}  {'applied' if applied else 'pending'}  {name}")
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,158 @@
+"""HTTP client untuk komunikasi antar service.
+
+Satu requests.Session (connection pool keep-alive) per host, timeout default yang
+konsisten, retry dengan jittered exponential backoff untuk request idempotent, dan
+histogram latency per endpoint. File ini identik di setiap service yang memakainya.
+
+Konfigurasi lewat environment:
+    SERVICE_CLIENT_POOL_SIZE   jumlah koneksi keep-alive per host (default 10)
+    SERVICE_CLIENT_TIMEOUT     timeout per request dalam detik (default 10)
+    SERVICE_CLIENT_RETRIES     jumlah retry untuk request idempotent (default 2)
+    SERVICE_CLIENT_BACKOFF     dasar backoff dalam detik (default 0.1)
+"""
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+RETRY_STATUS_CODES = frozenset([502, 503, 504])
+# Batas atas bucket histogram latency (milidetik)
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Histogram kumulatif sederhana (gaya Prometheus) untuk latency request"""
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.errors = 0
+
+    def observe(self, elapsed_ms, error=False):
+        for index, upper_bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= upper_bound:
+                self.bucket_counts[index] += 1
+                break
+        else:
+            self.bucket_counts[-1] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if error:
+            self.errors += 1
+
+    def to_dict(self):
+        buckets = {}
+        cumulative = 0
+        for upper_bound, bucket_count in zip(LATENCY_BUCKETS_MS + ('+Inf',), self.bucket_counts):
+            cumulative += bucket_count
+            buckets[str(upper_bound)] = cumulative
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'sum_ms': round(self.total_ms, 3),
+            'avg_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'buckets_ms': buckets
+        }
+
+
+class ServiceClient:
+    """Client HTTP dengan connection pool per host, retry dan histogram latency"""
+
+    def __init__(self, pool_size=10, timeout=10, retries=2, backoff=0.1, max_backoff=2.0):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._sessions = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            pool_size=int(os.getenv('SERVICE_CLIENT_POOL_SIZE', 10)),
+            timeout=float(os.getenv('SERVICE_CLIENT_TIMEOUT', 10)),
+            retries=int(os.getenv('SERVICE_CLIENT_RETRIES', 2)),
+            backoff=float(os.getenv('SERVICE_CLIENT_BACKOFF', 0.1))
+        )
+
+    def _session_for(self, url):
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                # Retry ditangani sendiri agar hanya request idempotent yang diulang
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount(host, adapter)
+                self._sessions[host] = session
+        return session, parts.netloc
+
+    def _observe(self, name, elapsed_ms, error):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            histogram.observe(elapsed_ms, error)
+
+    def _sleep_before_retry(self, attempt):
+        # Full jitter: hindari semua worker mengulang di saat yang sama
+        time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt))))
+
+    def request(self, method, url, idempotent=None, name=None, **kwargs):
+        """Kirim request; raise requests.RequestException seperti requests.request.
+
+        idempotent=True mengizinkan retry untuk method non-idempotent (mis. POST yang
+        aman diulang); default mengikuti method. name dipakai sebagai label histogram.
+        """
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        kwargs.setdefault('timeout', self.timeout)
+        session, netloc = self._session_for(url)
+        label = name or f"{method} {netloc}"
+        attempts = 1 + (self.retries if idempotent else 0)
+
+        for attempt in range(attempts):
+            start = time.perf_counter()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self._observe(label, (time.perf_counter() - start) * 1000, error=True)
+                if attempt + 1 >= attempts:
+                    raise
+            else:
+                retryable = response.status_code in RETRY_STATUS_CODES
+                self._observe(label, (time.perf_counter() - start) * 1000, error=response.status_code >= 500)
+                if not retryable or attempt + 1 >= attempts:
+                    return response
+                response.close()
+            self._sleep_before_retry(attempt)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pool_size': self.pool_size,
+                'timeout_seconds': self.timeout,
+                'retries': self.retries,
+                'hosts': sorted(self._sessions),
+                'latency': {name: histogram.to_dict() for name, histogram in sorted(self._histograms.items())}
+            }
+
+
+# Instance bersama untuk seluruh service
+client = ServiceClient.from_env()
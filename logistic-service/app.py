@@ -1,20 +1,25 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity
-import requests
 from datetime import datetime
 import uuid
-from flask_graphql import GraphQLView
 import graphene
 from graphene_sqlalchemy import SQLAlchemyObjectType
 
 from models import db, Shipment
 from config import Config
+from service_client import client as service_client
+from graphql_cache import CachedGraphQLView, DocumentCacheBackend, batch_pool_from_env
+from graphql_pagination import CountableConnection, connection_field, keyset_connection
+from db_engine import install_sqlite_pragmas
+from migration_runner import run_migrations
+from migrations import MIGRATIONS
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
-# Initialize extensions
+# Initialize extensions (WAL dan PRAGMA lain untuk setiap koneksi SQLite)
+install_sqlite_pragmas()
 db.init_app(app)
 jwt = JWTManager(app)
 CORS(app)
@@ -25,9 +30,15 @@ class ShipmentType(SQLAlchemyObjectType):
         model = Shipment
         interfaces = (graphene.relay.Node,)
 
+class ShipmentConnection(CountableConnection):
+    class Meta:
+        node = ShipmentType
+
 class Query(graphene.ObjectType):
     shipments = graphene.List(ShipmentType, status=graphene.String())
     shipment = graphene.Field(ShipmentType, id=graphene.Int(required=True))
+    # Versi berhalaman (first/after) dari `shipments`
+    shipments_connection = connection_field(ShipmentConnection, status=graphene.String())
 
     def resolve_shipments(self, info, status=None):
         query = Shipment.query
@@ -35,6 +46,12 @@ class Query(graphene.ObjectType):
             query = query.filter_by(status=status)
         return query.all()
 
+    def resolve_shipments_connection(self, info, status=None, first=None, after=None):
+        query = Shipment.query
+        if status:
+            query = query.filter_by(status=status)
+        return keyset_connection(ShipmentConnection, query, [Shipment.id], first, after)
+
     def resolve_shipment(self, info, id):
         return Shipment.query.get(id)
 
@@ -53,7 +70,7 @@ class CreateShipment(graphene.Mutation):
 
     def mutate(self, info, input):
         # Verify QC check exists and is approved
-        qc_response = requests.get(f"{app.config['QC_SERVICE_URL']}/api/qc/{input.qc_id}")
+        qc_response = service_client.get(f"{app.config['QC_SERVICE_URL']}/api/qc/{input.qc_id}", name='qc.get_check')
         if qc_response.status_code != 200:
             raise Exception('QC check not found or not approved')
 
@@ -117,19 +134,23 @@ class Mutation(graphene.ObjectType):
 
 schema = graphene.Schema(query=Query, mutation=Mutation)
 
-# Add GraphQL endpoint
+# Add GraphQL endpoint (dokumen hasil parse + validasi di-cache, mendukung persisted query dan batch)
+graphql_backend = DocumentCacheBackend.from_env()
 app.add_url_rule(
     '/graphql',
-    view_func=GraphQLView.as_view(
+    view_func=CachedGraphQLView.as_view(
         'graphql',
         schema=schema,
-        graphiql=True  # Enable GraphiQL interface
+        graphiql=True,  # Enable GraphiQL interface
+        backend=graphql_backend,
+        batch=True,
+        batch_pool=batch_pool_from_env()
     )
 )
 
-# Create database tables
+# Terapkan migrasi skema yang belum tercatat
 with app.app_context():
-    db.create_all()
+    run_migrations(db.engine, MIGRATIONS, db.metadata)
 
 def generate_tracking_number():
     return f"TRK-{uuid.uuid4().hex[:8].upper()}"
@@ -158,7 +179,7 @@ def create_shipment():
     data = request.get_json()
     print('Menerima data:', data)  # Debug log
 
-    qc_response = requests.get(f"{app.config['QC_SERVICE_URL']}/api/qc/{data['qc_id']}")
+    qc_response = service_client.get(f"{app.config['QC_SERVICE_URL']}/api/qc/{data['qc_id']}", name='qc.get_check')
     print('QC response:', qc_response.status_code, qc_response.text)  # Debug log
     if qc_response.status_code != 200:
         return jsonify({'error': 'QC check not found or not approved'}), 400
@@ -226,6 +247,15 @@ def get_shipping_receipt(shipment_id):
     
     return jsonify(receipt)
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Statistik runtime logistic-service (per worker process)"""
+    return jsonify({
+        'service': 'logistic-service',
+        'graphql_documents': graphql_backend.stats(),
+        'http_client': service_client.stats()
+    })
+
 @app.route('/')
 def index():
     return "Shipment Service is running! Use /graphql for GraphQL interface or /api/shipments for API endpoints."
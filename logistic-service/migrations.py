@@ -0,0 +1,35 @@
+"""Daftar migrasi skema logistic-service (lihat migration_runner.py).
+
+Migrasi diterapkan otomatis saat app.py di-import; dari command line:
+    python migrations.py            tampilkan status migrasi
+    python migrations.py upgrade    terapkan migrasi yang tertunda
+"""
+import sys
+
+from migration_runner import Migration, create_index, create_tables, migration_status, run_migrations
+
+
+def create_connection_indexes(connection, metadata):
+    """Index urutan keyset untuk shipmentsConnection GraphQL (lihat graphql_pagination.py)"""
+    create_index(connection, 'ix_shipments_status_id', 'shipments', ['status', 'id'])
+
+
+MIGRATIONS = [
+    Migration(1, 'initial schema', create_tables),
+    Migration(2, 'keyset index for GraphQL connections', create_connection_indexes, transactional=False),
+]
+
+
+def main(argv):
+    from app import app, db
+
+    with app.app_context():
+        if argv[1:] == ['upgrade']:
+            applied = run_migrations(db.engine, MIGRATIONS, db.metadata)
+            print(f"Applied migrations: {applied or 'none'}")
+        for version, name, applied in migration_status(db.engine, MIGRATIONS):
+            print(f"{version:4d}  {'applied' if applied else 'pending'}  {name}")
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -5,6 +5,10 @@ db = SQLAlchemy()
 
 class Shipment(db.Model):
     __tablename__ = 'shipments'
+    # Urutan keyset shipmentsConnection per status
+    __table_args__ = (
+        db.Index('ix_shipments_status_id', 'status', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     qc_id = db.Column(db.Integer, nullable=False)  # Reference to QC check
@@ -4,20 +4,34 @@ collections.Mapping = collections.abc.Mapping
 collections.Iterable = collections.abc.Iterable
 from flask import Flask, request, jsonify
 from flask_sqlalchemy import SQLAlchemy
-from flask_graphql import GraphQLView
+from sqlalchemy.exc import IntegrityError
 from flask_cors import CORS
 import graphene
 from graphene_sqlalchemy import SQLAlchemyObjectType
-from datetime import datetime
+from graphql.language import ast as graphql_ast
+from datetime import datetime, timedelta
 import requests
 import os
 from enum import Enum
 import json
+from inventory_cache import InventoryCatalogCache
+from service_client import client as service_client
+from circuit_breaker import CircuitBreaker, Bulkhead, Downstream
+from outbox import OutboxDispatcher
+from sse import ChangeStream, requested_last_event_id
+from graphql_loaders import get_loader
+from graphql_cache import CachedGraphQLView, DocumentCacheBackend, ResponseCache, batch_pool_from_env
+from graphql_pagination import CountableConnection, connection_field, keyset_connection
+from db_engine import database_uri, engine_options, install_sqlite_pragmas
+from migration_runner import run_migrations
+from migrations import MIGRATIONS
 
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///order_service.db')
+app.config['SQLALCHEMY_DATABASE_URI'] = database_uri('sqlite:///order_service.db')
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
+install_sqlite_pragmas()
 db = SQLAlchemy(app)
 CORS(app)
 
@@ -34,14 +48,27 @@ class OrderStatus(Enum):
     REJECTED = "REJECTED"
     CANCELLED = "CANCELLED"
 
+# Satu instance tipe kolom untuk semua kolom status, agar GraphQL memetakan ke satu enum OrderStatus
+order_status_type = db.Enum(OrderStatus)
+
 class Order(db.Model):
     __tablename__ = 'orders'
+    # Urutan keyset ordersConnection (created_at desc, id desc), dengan dan tanpa filter
+    __table_args__ = (
+        db.Index('ix_orders_created_at_id', 'created_at', 'id'),
+        db.Index('ix_orders_restaurant_created_at_id', 'restaurant_id', 'created_at', 'id'),
+        db.Index('ix_orders_status_created_at_id', 'status', 'created_at', 'id'),
+        # Keyset feed /api/orders/approved (approved_date terbaru dulu)
+        db.Index('ix_orders_status_approved_date_id', 'status', 'approved_date', 'id'),
+        # MAX(updated_at) untuk versi cache response GraphQL (get_order_version)
+        db.Index('ix_orders_updated_at', 'updated_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     order_number = db.Column(db.String(50), unique=True, nullable=False)
     restaurant_id = db.Column(db.String(100), nullable=False)
     restaurant_name = db.Column(db.String(200), nullable=False)
-    status = db.Column(db.Enum(OrderStatus), default=OrderStatus.PENDING, nullable=False)
+    status = db.Column(order_status_type, default=OrderStatus.PENDING, nullable=False)
     total_items = db.Column(db.Integer, default=0)
     notes = db.Column(db.Text)
     requested_date = db.Column(db.DateTime, nullable=False)
@@ -53,12 +80,14 @@ class Order(db.Model):
     
     # Relationship
     items = db.relationship('OrderItem', backref='order', lazy=True, cascade='all, delete-orphan')
+    status_history = db.relationship('OrderStatusHistory', backref='order', lazy=True, cascade='all, delete-orphan',
+                                     order_by='OrderStatusHistory.id')
 
 class OrderItem(db.Model):
     __tablename__ = 'order_items'
     
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False, index=True)
     item_code = db.Column(db.String(50), nullable=False)
     item_name = db.Column(db.String(200), nullable=False)
     requested_quantity = db.Column(db.Integer, nullable=False)
@@ -67,17 +96,244 @@ class OrderItem(db.Model):
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+class OrderStatusHistory(db.Model):
+    __tablename__ = 'order_status_history'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False, index=True)
+    previous_status = db.Column(order_status_type)
+    new_status = db.Column(order_status_type, nullable=False)
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    changed_by = db.Column(db.String(100))
+    reason = db.Column(db.Text)
+    notes = db.Column(db.Text)
+
+class OutboxEvent(db.Model):
+    """Event yang menunggu dikirim ke service lain (transactional outbox)"""
+    __tablename__ = 'outbox_events'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(50), nullable=False)
+    aggregate_id = db.Column(db.Integer, nullable=False)  # order id
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'event_type': self.event_type,
+            'aggregate_id': self.aggregate_id,
+            'created_at': self.created_at.isoformat(),
+            'payload': json.loads(self.payload)
+        }
+
+class OutboxSubscriberOffset(db.Model):
+    """Posisi pengiriman outbox per subscriber beserta lease dispatcher"""
+    __tablename__ = 'outbox_subscriber_offsets'
+    
+    subscriber = db.Column(db.String(50), primary_key=True)
+    last_event_id = db.Column(db.Integer, nullable=False, default=0)
+    locked_by = db.Column(db.String(100))
+    locked_until = db.Column(db.DateTime)
+
+def record_status_change(order, previous_status, changed_by=None, reason=None):
+    """Mencatat perubahan status ke order_status_history dan outbox dalam transaksi yang sedang berjalan"""
+    now = datetime.utcnow()
+    db.session.add(OrderStatusHistory(
+        order_id=order.id,
+        previous_status=previous_status,
+        new_status=order.status,
+        changed_at=now,
+        changed_by=changed_by,
+        reason=reason
+    ))
+    db.session.add(OutboxEvent(
+        event_type='order.status_changed',
+        aggregate_id=order.id,
+        created_at=now,
+        payload=json.dumps({
+            'order_id': order.id,
+            'order_number': order.order_number,
+            'restaurant_id': order.restaurant_id,
+            'previous_status': previous_status.value if previous_status else None,
+            'status': order.status.value,
+            'changed_at': now.isoformat()
+        })
+    ))
+
+class OrderNumberSequence(db.Model):
+    """Counter nomor order per hari (ORD-YYYYMMDD-NNNN)"""
+    __tablename__ = 'order_number_sequences'
+    
+    day = db.Column(db.String(8), primary_key=True)  # YYYYMMDD
+    last_value = db.Column(db.Integer, nullable=False, default=0)
+
+def allocate_order_numbers(count=1):
+    """Mengalokasikan `count` nomor order berurutan untuk hari ini.
+    
+    Counter dinaikkan dengan UPDATE atomik di transaksi yang sama dengan insert order,
+    sehingga tidak ada nomor ganda saat order dibuat bersamaan dan rollback tidak
+    meninggalkan celah. Tidak ada lagi COUNT(*) atas seluruh tabel orders.
+    """
+    day = datetime.now().strftime('%Y%m%d')
+    sequences = OrderNumberSequence.__table__
+    
+    while True:
+        result = db.session.execute(
+            sequences.update()
+            .where(sequences.c.day == day)
+            .values(last_value=sequences.c.last_value + count)
+        )
+        if result.rowcount == 1:
+            break
+        
+        # Counter hari ini belum ada: mulai dari nomor terbesar yang sudah terpakai hari ini
+        # (order lama dibuat dengan skema COUNT(*) + 1), memakai index unik order_number.
+        # Nomor dibandingkan sebagai angka: setelah 9999 nomor jadi 5 digit dan
+        # "...-9999" > "...-10000" secara string
+        prefix = f"ORD-{day}-"
+        number = db.cast(db.func.substr(Order.order_number, len(prefix) + 1), db.Integer)
+        last_number = db.session.query(db.func.max(number)).filter(
+            Order.order_number.like(f"{prefix}%")
+        ).scalar()
+        start = last_number or 0
+        try:
+            with db.session.begin_nested():
+                db.session.execute(sequences.insert().values(day=day, last_value=start + count))
+            break
+        except IntegrityError:
+            # Transaksi lain membuat counter lebih dulu, ulangi lewat UPDATE
+            continue
+    
+    last_value = db.session.query(OrderNumberSequence.last_value).filter(OrderNumberSequence.day == day).scalar()
+    return [f"ORD-{day}-{value:04d}" for value in range(last_value - count + 1, last_value + 1)]
+
+def parse_requested_date(requested_date):
+    """Parse requested_date dalam format ISO (dengan 'T') atau 'YYYY-MM-DD HH:MM:SS'"""
+    try:
+        if 'T' in requested_date:
+            return datetime.fromisoformat(requested_date.replace('Z', ''))
+        return datetime.strptime(requested_date, '%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        # Try alternative format
+        return datetime.fromisoformat(requested_date.replace('T', ' ').replace('Z', ''))
+
+# Circuit breaker + bulkhead untuk panggilan ke inventory service
+INVENTORY_BREAKER_FAILURE_THRESHOLD = int(os.getenv('INVENTORY_BREAKER_FAILURE_THRESHOLD', 5))
+INVENTORY_BREAKER_RECOVERY_TIMEOUT = float(os.getenv('INVENTORY_BREAKER_RECOVERY_TIMEOUT', 30))
+INVENTORY_MAX_CONCURRENT_CALLS = int(os.getenv('INVENTORY_MAX_CONCURRENT_CALLS', 10))
+INVENTORY_BULKHEAD_MAX_WAIT = float(os.getenv('INVENTORY_BULKHEAD_MAX_WAIT', 0.5))
+# Perilaku cek ketersediaan saat inventory service tidak bisa dihubungi (atau circuit terbuka):
+# 'assume_available' (perilaku lama, untuk development) atau 'reject'
+INVENTORY_UNAVAILABLE_POLICY = os.getenv('INVENTORY_UNAVAILABLE_POLICY', 'assume_available')
+
+inventory_downstream = Downstream(
+    'inventory-service',
+    breaker=CircuitBreaker(
+        failure_threshold=INVENTORY_BREAKER_FAILURE_THRESHOLD,
+        recovery_timeout=INVENTORY_BREAKER_RECOVERY_TIMEOUT
+    ),
+    bulkhead=Bulkhead(
+        max_concurrent=INVENTORY_MAX_CONCURRENT_CALLS,
+        max_wait=INVENTORY_BULKHEAD_MAX_WAIT
+    )
+)
+
+def inventory_request(method, url, **kwargs):
+    """Panggilan ke inventory service lewat circuit breaker dan bulkhead"""
+    return inventory_downstream.call(service_client.request, method, url, **kwargs)
+
+def inventory_unavailable_result(error):
+    """Hasil cek ketersediaan ketika inventory service tidak tersedia, sesuai INVENTORY_UNAVAILABLE_POLICY"""
+    assume_available = INVENTORY_UNAVAILABLE_POLICY == 'assume_available'
+    return {
+        'available': assume_available,
+        'message': f"Inventory service unavailable: {str(error)}" + (
+            ", assuming items are available" if assume_available else ""),
+        'details': []
+    }
+
+# Jumlah item per halaman saat membaca katalog inventory service
+INVENTORY_PAGE_SIZE = 500
+
+# Cache katalog inventory (lihat inventory_cache.InventoryCatalogCache)
+INVENTORY_CACHE_SYNC_INTERVAL = float(os.getenv('INVENTORY_CACHE_SYNC_INTERVAL', 5))
+
 # Helper Functions
-def get_inventory_items():
-    """Helper function untuk mengambil list item dari inventory service"""
+def get_inventory_page(params):
+    """Helper function untuk mengambil satu halaman /api/items; None jika gagal"""
     try:
-        response = requests.get(f"{INVENTORY_SERVICE_URL}/api/items", timeout=10)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return []
-    except requests.RequestException:
-        return []
+        response = inventory_request('GET', f"{INVENTORY_SERVICE_URL}/api/items", params=params, name='inventory.items')
+        if response.status_code != 200:
+            return None
+        return response.json()
+    except (requests.RequestException, ValueError):
+        return None
+
+class InventoryUnavailableError(requests.RequestException):
+    """Katalog inventory tidak bisa dibaca sampai halaman terakhir"""
+
+def iter_inventory_items(fields=None, page_size=INVENTORY_PAGE_SIZE):
+    """Generator yang mengambil item dari inventory service halaman per halaman (keyset cursor).
+    
+    Jika satu halaman gagal diambil, InventoryUnavailableError dilempar agar pemanggil tidak
+    memakai katalog yang terpotong sebagai katalog lengkap.
+    """
+    params = {'limit': page_size}
+    if fields:
+        params['fields'] = ','.join(fields)
+    
+    while True:
+        page = get_inventory_page(params)
+        if page is None:
+            raise InventoryUnavailableError('Failed to fetch inventory items page')
+        
+        for item in page.get('items', []):
+            yield item
+        
+        if not page.get('next_cursor'):
+            return
+        params['cursor'] = page['next_cursor']
+
+def load_inventory_catalog():
+    """Memuat seluruh katalog beserta versinya untuk cache; None jika gagal"""
+    params = {'limit': INVENTORY_PAGE_SIZE}
+    version = None
+    items = []
+    while True:
+        page = get_inventory_page(params)
+        if page is None:
+            return None
+        if version is None:
+            # Versi halaman pertama: perubahan selama paging akan diulang oleh delta sync berikutnya
+            version = page.get('version', 0)
+        items.extend(page.get('items', []))
+        if not page.get('next_cursor'):
+            return version, items
+        params['cursor'] = page['next_cursor']
+
+def get_inventory_changes(since):
+    """Helper function untuk mengambil delta katalog setelah versi `since`; None jika gagal"""
+    try:
+        response = inventory_request('GET', f"{INVENTORY_SERVICE_URL}/api/items/changes", params={'since': since}, name='inventory.item_changes')
+        if response.status_code != 200:
+            return None
+        return response.json()
+    except (requests.RequestException, ValueError):
+        return None
+
+inventory_catalog_cache = InventoryCatalogCache(
+    load_catalog=load_inventory_catalog,
+    fetch_changes=get_inventory_changes,
+    sync_interval=INVENTORY_CACHE_SYNC_INTERVAL
+)
+
+def get_inventory_items(fields=None):
+    """Helper function untuk mengambil list item dari inventory service; None jika gagal"""
+    try:
+        return list(iter_inventory_items(fields))
+    except InventoryUnavailableError:
+        return None
 
 def check_inventory_availability_helper(items):
     """Helper function untuk mengecek ketersediaan inventory"""
@@ -94,10 +350,13 @@ def check_inventory_availability_helper(items):
                 'requested_quantity': item_data['requested_quantity']
             })
         
-        response = requests.post(
+        # Cek ketersediaan hanya membaca data, aman diulang
+        response = inventory_request(
+            'POST',
             f"{INVENTORY_SERVICE_URL}/api/check-availability",
             json={'items': check_items},
-            timeout=10
+            idempotent=True,
+            name='inventory.check_availability'
         )
         
         if response.status_code == 200:
@@ -111,16 +370,12 @@ def check_inventory_availability_helper(items):
             
     except requests.RequestException as e:
         # Fallback ketika inventory service tidak tersedia
-        return {
-            'available': True,  # Asumsikan tersedia untuk development
-            'message': f"Inventory service unavailable: {str(e)}",
-            'details': []
-        }
+        return inventory_unavailable_result(e)
 
 def get_inventory_stock(item_code):
     """Helper function untuk mengambil stok item dari inventory service"""
     try:
-        response = requests.get(f"{INVENTORY_SERVICE_URL}/api/items/{item_code}/stock", timeout=10)
+        response = inventory_request('GET', f"{INVENTORY_SERVICE_URL}/api/items/{item_code}/stock", name='inventory.item_stock')
         if response.status_code == 200:
             return response.json()
         else:
@@ -138,13 +393,16 @@ def reserve_inventory_stock(order_id, items):
                 'quantity': item.approved_quantity if item.approved_quantity > 0 else item.requested_quantity
             })
         
-        response = requests.post(
+        # Reservasi idempotent per order_id (ledger inventory), jadi aman diulang
+        response = inventory_request(
+            'POST',
             f"{INVENTORY_SERVICE_URL}/api/reserve-stock",
             json={
                 'order_id': order_id,
                 'items': reserve_items
             },
-            timeout=10
+            idempotent=True,
+            name='inventory.reserve_stock'
         )
         
         return response.status_code == 200, response.json() if response.status_code == 200 else {}
@@ -152,17 +410,44 @@ def reserve_inventory_stock(order_id, items):
     except requests.RequestException:
         return False, {'message': 'Failed to reserve stock'}
 
+def release_inventory_stock(order_id):
+    """Helper function untuk melepas reservasi stock di inventory"""
+    try:
+        response = inventory_request(
+            'POST',
+            f"{INVENTORY_SERVICE_URL}/api/reservations/{order_id}/release",
+            idempotent=True,
+            name='inventory.release_reservation'
+        )
+        
+        return response.status_code == 200, response.json()
+        
+    except (requests.RequestException, ValueError):
+        return False, {'message': 'Failed to release stock'}
+
 # GraphQL Schema
 class OrderType(SQLAlchemyObjectType):
     class Meta:
         model = Order
         load_instance = True
+    
+    # Relasi dimuat lewat DataLoader: satu query IN untuk semua order dalam satu response
+    def resolve_items(self, info):
+        return get_loader(Order, 'items').load_for(self)
+    
+    def resolve_status_history(self, info):
+        return get_loader(Order, 'status_history').load_for(self)
 
 class OrderItemType(SQLAlchemyObjectType):
     class Meta:
         model = OrderItem
         load_instance = True
 
+class OrderStatusHistoryType(SQLAlchemyObjectType):
+    class Meta:
+        model = OrderStatusHistory
+        load_instance = True
+
 class InventoryItemType(graphene.ObjectType):
     """Type untuk item dari inventory service"""
     id = graphene.Int()
@@ -174,10 +459,29 @@ class InventoryItemType(graphene.ObjectType):
     unit_price = graphene.Float()
     stock_quantity = graphene.Int()
 
+def requested_field_names(info):
+    """Nama sub-field yang diminta query GraphQL; None jika memakai fragment (tidak bisa dipastikan)"""
+    names = set()
+    for field_ast in info.field_asts:
+        for selection in field_ast.selection_set.selections:
+            if not isinstance(selection, graphql_ast.Field):
+                return None
+            names.add(selection.name.value)
+    return names
+
+# Kolom inventory yang dibutuhkan InventoryItemType
+INVENTORY_ITEM_FIELDS = ('id', 'item_code', 'name', 'description', 'category', 'unit', 'unit_price', 'stock_quantity')
+
+class OrderConnection(CountableConnection):
+    class Meta:
+        node = OrderType
+
 class Query(graphene.ObjectType):
     orders = graphene.List(OrderType, 
                           restaurant_id=graphene.String(),
                           status=graphene.String())
+    # Versi berhalaman (first/after) dari `orders`
+    orders_connection = connection_field(OrderConnection, restaurant_id=graphene.String(), status=graphene.String())
     order = graphene.Field(OrderType, id=graphene.Int())
     order_by_number = graphene.Field(OrderType, order_number=graphene.String())
     
@@ -201,6 +505,20 @@ class Query(graphene.ObjectType):
         
         return query.order_by(Order.created_at.desc()).all()
     
+    def resolve_orders_connection(self, info, restaurant_id=None, status=None, first=None, after=None):
+        query = Order.query
+        
+        if restaurant_id:
+            query = query.filter(Order.restaurant_id == restaurant_id)
+        
+        if status:
+            try:
+                query = query.filter(Order.status == OrderStatus(status.upper()))
+            except ValueError:
+                query = query.filter(db.false())
+        
+        return keyset_connection(OrderConnection, query, [Order.created_at, Order.id], first, after, descending=True)
+    
     def resolve_order(self, info, id):
         return Order.query.get(id)
     
@@ -208,8 +526,17 @@ class Query(graphene.ObjectType):
         return Order.query.filter(Order.order_number == order_number).first()
     
     def resolve_inventory_items(self, info):
-        """Mengambil list item dari inventory service"""
-        items_data = get_inventory_items()
+        """Mengambil list item dari cache katalog inventory service"""
+        # Stock hanya perlu disinkronkan saat itu juga jika field stockQuantity diminta
+        requested = requested_field_names(info)
+        needs_fresh_stock = requested is None or 'stockQuantity' in requested
+        items_data = inventory_catalog_cache.get_all(fresh=needs_fresh_stock)
+        if items_data is None:
+            # Inventory service tidak bisa disinkronkan: ambil langsung
+            items_data = get_inventory_items(fields=INVENTORY_ITEM_FIELDS)
+        if items_data is None:
+            raise Exception('Inventory service unavailable')
+        
         inventory_items = []
         for item_data in items_data:
             inventory_items.append(InventoryItemType(
@@ -262,19 +589,11 @@ class CreateOrder(graphene.Mutation):
                         inventory_check=json.dumps(inventory_result)
                     )
             
-            # Generate order number
-            order_count = Order.query.count() + 1
-            order_number = f"ORD-{datetime.now().strftime('%Y%m%d')}-{order_count:04d}"
-            
             # Parse requested date - handle both formats
-            try:
-                if 'T' in requested_date:
-                    req_date = datetime.fromisoformat(requested_date.replace('Z', ''))
-                else:
-                    req_date = datetime.strptime(requested_date, '%Y-%m-%d %H:%M:%S')
-            except ValueError:
-                # Try alternative format
-                req_date = datetime.fromisoformat(requested_date.replace('T', ' ').replace('Z', ''))
+            req_date = parse_requested_date(requested_date)
+            
+            # Generate order number
+            order_number = allocate_order_numbers()[0]
             
             # Create order
             order = Order(
@@ -356,6 +675,7 @@ class UpdateOrderStatus(graphene.Mutation):
                 )
             
             # Update status
+            previous_status = order.status
             try:
                 new_status = OrderStatus(status.upper())
                 order.status = new_status
@@ -399,13 +719,22 @@ class UpdateOrderStatus(graphene.Mutation):
                             stock_reservation=json.dumps(reservation_result)
                         )
                         
+            elif new_status in (OrderStatus.REJECTED, OrderStatus.CANCELLED):
+                # Lepas reservasi stock (jika ada) agar bisa dipakai order lain
+                if reserve_stock:
+                    _, stock_reservation_result = release_inventory_stock(order_id)
+                    
             elif new_status == OrderStatus.SHIPPED:
                 order.shipped_date = now
             elif new_status == OrderStatus.DELIVERED:
                 order.delivered_date = now
             
             order.updated_at = now
+            if new_status != previous_status:
+                record_status_change(order, previous_status)
             db.session.commit()
+            if new_status != previous_status:
+                outbox_dispatcher.notify()
             
             return UpdateOrderStatus(
                 order=order, 
@@ -444,10 +773,12 @@ class CheckInventoryAvailability(graphene.Mutation):
             
             # Mock API call to inventory service
             try:
-                response = requests.post(
+                response = inventory_request(
+                    'POST',
                     f"{INVENTORY_SERVICE_URL}/api/check-availability",
                     json={'items': check_items},
-                    timeout=10
+                    idempotent=True,
+                    name='inventory.check_availability'
                 )
                 
                 if response.status_code == 200:
@@ -463,11 +794,12 @@ class CheckInventoryAvailability(graphene.Mutation):
                         message="Failed to check inventory availability",
                         availability_details=[]
                     )
-            except requests.RequestException:
+            except requests.RequestException as e:
                 # Fallback when inventory service is not available
+                result = inventory_unavailable_result(e)
                 return CheckInventoryAvailability(
-                    available=True,  # Assume available for development
-                    message="Inventory service unavailable, assuming items are available",
+                    available=result['available'],
+                    message=result['message'],
                     availability_details=[]
                 )
                 
@@ -486,10 +818,42 @@ class Mutation(graphene.ObjectType):
 # Create GraphQL schema
 schema = graphene.Schema(query=Query, mutation=Mutation)
 
-# Add GraphQL endpoint
+def get_order_version():
+    """Penanda versi data order: order baru menaikkan id order, perubahan status menambah history.
+    
+    updateOrderStatus selalu mengisi updated_at, sehingga perubahan approved_quantity tanpa
+    perubahan status juga mengganti versi lewat max(updated_at).
+    """
+    # Satu MAX per query agar masing-masing dijawab dari index (PK dan ix_orders_updated_at)
+    last_updated_at = db.session.query(db.func.max(Order.updated_at)).scalar()
+    return (db.session.query(db.func.max(Order.id)).scalar() or 0,
+            last_updated_at.isoformat() if last_updated_at else None,
+            db.session.query(db.func.max(OrderStatusHistory.id)).scalar() or 0)
+
+# Cache hasil query order (aktif jika GRAPHQL_RESPONSE_CACHE_MB di-set); tag Order dicek terhadap
+# get_order_version sehingga order dari REST / worker lain langsung terlihat
+graphql_response_cache = ResponseCache.from_env(
+    query_tags={
+        'orders': ['Order'],
+        'ordersConnection': ['Order'],
+        'order': ['Order'],
+        'orderByNumber': ['Order'],
+        'approvedOrders': ['Order'],
+    },
+    mutation_tags={
+        'createOrder': ['Order'],
+        'updateOrderStatus': ['Order'],
+        'checkInventoryAvailability': [],
+    },
+    tag_versions={'Order': get_order_version}
+)
+
+# Add GraphQL endpoint (dokumen hasil parse + validasi di-cache, mendukung persisted query dan batch)
+graphql_backend = DocumentCacheBackend.from_env(response_cache=graphql_response_cache)
 app.add_url_rule(
     '/graphql',
-    view_func=GraphQLView.as_view('graphql', schema=schema, graphiql=True)
+    view_func=CachedGraphQLView.as_view('graphql', schema=schema, graphiql=True, backend=graphql_backend,
+                                        batch=True, batch_pool=batch_pool_from_env())
 )
 
 # REST API endpoints for external service integration
@@ -500,8 +864,7 @@ def create_order_rest():
         data = request.get_json()
         
         # Generate order number
-        order_count = Order.query.count() + 1
-        order_number = f"ORD-{datetime.now().strftime('%Y%m%d')}-{order_count:04d}"
+        order_number = allocate_order_numbers()[0]
         
         # Create order
         order = Order(
@@ -544,6 +907,172 @@ def create_order_rest():
         db.session.rollback()
         return jsonify({'success': False, 'message': str(e)}), 400
 
+# Batas jumlah order dalam satu request bulk
+BULK_ORDER_MAX = int(os.getenv('BULK_ORDER_MAX', 1000))
+
+def validate_bulk_order(data):
+    """Validasi satu order dari request bulk; mengembalikan (order_values, items) atau raise ValueError"""
+    if not isinstance(data, dict):
+        raise ValueError('Order must be a JSON object')
+    for field in ('restaurant_id', 'restaurant_name', 'requested_date', 'items'):
+        if not data.get(field):
+            raise ValueError(f"Missing required field: {field}")
+    if not isinstance(data['items'], list):
+        raise ValueError('items must be a list')
+    
+    items = []
+    for item_data in data['items']:
+        if not isinstance(item_data, dict):
+            raise ValueError('Each item must be a JSON object')
+        for field in ('item_code', 'item_name', 'requested_quantity', 'unit'):
+            if item_data.get(field) in (None, ''):
+                raise ValueError(f"Missing required item field: {field}")
+        quantity = item_data['requested_quantity']
+        if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+            raise ValueError(f"Invalid requested_quantity for {item_data['item_code']}")
+        items.append({
+            'item_code': item_data['item_code'],
+            'item_name': item_data['item_name'],
+            'requested_quantity': quantity,
+            'unit': item_data['unit'],
+            'notes': item_data.get('notes', '')
+        })
+    
+    order_values = {
+        'restaurant_id': data['restaurant_id'],
+        'restaurant_name': data['restaurant_name'],
+        'requested_date': parse_requested_date(data['requested_date']),
+        'notes': data.get('notes', ''),
+        'status': OrderStatus.PENDING,
+        'total_items': sum(item['requested_quantity'] for item in items)
+    }
+    return order_values, items
+
+def read_bulk_orders():
+    """Membaca body request bulk: JSON array atau NDJSON (satu order per baris).
+    Baris NDJSON yang tidak valid dikembalikan sebagai ValueError di posisinya."""
+    content_type = request.mimetype or ''
+    if content_type in ('application/x-ndjson', 'application/jsonl', 'application/x-jsonlines'):
+        orders = []
+        for raw_line in request.stream:
+            line = raw_line.strip()
+            if not line:
+                continue
+            try:
+                orders.append(json.loads(line))
+            except ValueError as e:
+                orders.append(ValueError(f"Invalid JSON line: {str(e)}"))
+        return orders
+    
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        raise ValueError('Request body must be a JSON array of orders or NDJSON')
+    return data
+
+@app.route('/api/orders/bulk', methods=['POST'])
+def create_orders_bulk():
+    """REST endpoint untuk membuat banyak order sekaligus (integrasi restaurant chain).
+    
+    Semua order divalidasi dulu, lalu ketersediaan inventory dicek sekali untuk gabungan
+    item_code semua order, nomor order dialokasikan dalam satu batch, dan order beserta
+    item-nya di-insert dengan bulk insert dalam satu transaksi. Hasil dikembalikan per order.
+    Query param check_inventory=false melewati cek inventory.
+    """
+    try:
+        raw_orders = read_bulk_orders()
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    if len(raw_orders) > BULK_ORDER_MAX:
+        return jsonify({'success': False, 'message': f'Too many orders, maximum is {BULK_ORDER_MAX}'}), 400
+    
+    results = [None] * len(raw_orders)
+    valid_orders = []  # (index, order_values, items)
+    for index, data in enumerate(raw_orders):
+        try:
+            if isinstance(data, ValueError):
+                raise data
+            order_values, items = validate_bulk_order(data)
+            valid_orders.append((index, order_values, items))
+        except (ValueError, TypeError, AttributeError) as e:
+            results[index] = {'index': index, 'success': False, 'message': str(e)}
+    
+    # Satu cek inventory untuk gabungan item_code semua order
+    check_inventory = request.args.get('check_inventory', 'true').lower() != 'false'
+    if check_inventory and valid_orders:
+        item_codes = sorted({item['item_code'] for _, _, items in valid_orders for item in items})
+        inventory_result = check_inventory_availability_helper(
+            [{'item_code': item_code, 'requested_quantity': 0} for item_code in item_codes]
+        )
+        if inventory_result['details']:
+            available_by_code = {
+                detail['item_code']: detail['stock_quantity'] if detail['available'] else 0
+                for detail in inventory_result['details']
+            }
+        elif inventory_result['available']:
+            available_by_code = None  # Inventory tidak bisa dicek dan policy mengizinkan
+        else:
+            available_by_code = {}
+        
+        if available_by_code is not None:
+            accepted_orders = []
+            for index, order_values, items in valid_orders:
+                shortages = [
+                    item['item_code'] for item in items
+                    if available_by_code.get(item['item_code'], 0) < item['requested_quantity']
+                ]
+                if shortages:
+                    results[index] = {
+                        'index': index,
+                        'success': False,
+                        'message': 'Some items are not available in sufficient quantity',
+                        'unavailable_items': shortages
+                    }
+                else:
+                    accepted_orders.append((index, order_values, items))
+            valid_orders = accepted_orders
+    
+    if valid_orders:
+        try:
+            order_numbers = allocate_order_numbers(len(valid_orders))
+            orders_table = Order.__table__
+            db.session.execute(orders_table.insert(), [
+                {**order_values, 'order_number': order_number}
+                for order_number, (_, order_values, _) in zip(order_numbers, valid_orders)
+            ])
+            ids_by_number = dict(db.session.query(Order.order_number, Order.id).filter(
+                Order.order_number.in_(order_numbers)
+            ).all())
+            
+            item_rows = [
+                {**item, 'order_id': ids_by_number[order_number]}
+                for order_number, (_, _, items) in zip(order_numbers, valid_orders)
+                for item in items
+            ]
+            if item_rows:
+                db.session.execute(OrderItem.__table__.insert(), item_rows)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            for index, _, _ in valid_orders:
+                results[index] = {'index': index, 'success': False, 'message': str(e)}
+        else:
+            for order_number, (index, _, _) in zip(order_numbers, valid_orders):
+                results[index] = {
+                    'index': index,
+                    'success': True,
+                    'order_id': ids_by_number[order_number],
+                    'order_number': order_number,
+                    'message': 'Order created successfully'
+                }
+    
+    created = sum(1 for result in results if result['success'])
+    return jsonify({
+        'success': created == len(results),
+        'created': created,
+        'failed': len(results) - created,
+        'results': results
+    })
+
 @app.route('/api/orders/<order_number>/status', methods=['GET'])
 def get_order_status(order_number):
     """REST endpoint for checking order status"""
@@ -569,30 +1098,152 @@ def get_order_status(order_number):
         } for item in order.items]
     })
 
+# Pagination feed approved orders
+APPROVED_ORDERS_DEFAULT_LIMIT = 100
+APPROVED_ORDERS_MAX_LIMIT = 500
+
+def approved_order_to_dict(order):
+    """Format order approved untuk inventory service"""
+    return {
+        'id': order.id,
+        'order_number': order.order_number,
+        'restaurant_name': order.restaurant_name,
+        'approved_date': order.approved_date.isoformat() if order.approved_date else None,
+        'items': [{
+            'item_code': item.item_code,
+            'item_name': item.item_name,
+            'approved_quantity': item.approved_quantity
+        } for item in order.items]
+    }
+
+def parse_approved_orders_cursor(cursor):
+    """Cursor feed approved orders berbentuk '<approved_date ISO>|<id>' (tanggal kosong jika NULL)"""
+    approved_date, order_id = cursor.rsplit('|', 1)
+    return (datetime.fromisoformat(approved_date) if approved_date else None), int(order_id)
+
+def approved_orders_cursor(order):
+    approved_date = order.approved_date.isoformat() if order.approved_date else ''
+    return f"{approved_date}|{order.id}"
+
 @app.route('/api/orders/approved', methods=['GET'])
 def get_approved_orders():
-    """REST endpoint untuk mengambil orders yang sudah approved (untuk inventory service)"""
-    approved_orders = Order.query.filter(Order.status == OrderStatus.APPROVED).order_by(Order.approved_date.desc()).all()
+    """REST endpoint untuk mengambil orders yang sudah approved (untuk inventory service).
     
-    orders_data = []
-    for order in approved_orders:
-        orders_data.append({
-            'id': order.id,
-            'order_number': order.order_number,
-            'restaurant_name': order.restaurant_name,
-            'approved_date': order.approved_date.isoformat() if order.approved_date else None,
-            'items': [{
-                'item_code': item.item_code,
-                'item_name': item.item_name,
-                'approved_quantity': item.approved_quantity
-            } for item in order.items]
-        })
+    Urutan approved_date terbaru dulu (id sebagai tie-breaker), approved_date NULL paling akhir.
+    Tanpa limit/cursor response berupa array semua order seperti sebelumnya. Dengan limit
+    atau cursor: keyset pagination pada (approved_date, id), response
+    {orders, next_cursor, has_more}. Filter opsional approved_since (ISO datetime). Items
+    dimuat dengan selectin loading, jadi satu halaman selalu dua query berapa pun jumlah order-nya.
+    """
+    try:
+        limit = request.args.get('limit')
+        cursor = request.args.get('cursor')
+        approved_since = request.args.get('approved_since')
+        paged = bool(limit or cursor)
+        if paged:
+            limit = min(max(int(limit or APPROVED_ORDERS_DEFAULT_LIMIT), 1), APPROVED_ORDERS_MAX_LIMIT)
+        
+        query = Order.query.options(db.selectinload(Order.items)).filter(Order.status == OrderStatus.APPROVED)
+        if cursor:
+            cursor_approved_date, cursor_id = parse_approved_orders_cursor(cursor)
+            if cursor_approved_date is None:
+                query = query.filter(Order.approved_date.is_(None), Order.id < cursor_id)
+            else:
+                query = query.filter(db.or_(
+                    Order.approved_date < cursor_approved_date,
+                    db.and_(Order.approved_date == cursor_approved_date, Order.id < cursor_id),
+                    Order.approved_date.is_(None)
+                ))
+        if approved_since:
+            query = query.filter(Order.approved_date >= datetime.fromisoformat(approved_since.replace('Z', '')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    query = query.order_by(Order.approved_date.desc().nullslast(), Order.id.desc())
+    if not paged:
+        return jsonify([approved_order_to_dict(order) for order in query.all()])
+    
+    # Ambil satu baris lebih untuk mengetahui apakah masih ada halaman berikutnya
+    approved_orders = query.limit(limit + 1).all()
+    has_more = len(approved_orders) > limit
+    approved_orders = approved_orders[:limit]
+    
+    return jsonify({
+        'orders': [approved_order_to_dict(order) for order in approved_orders],
+        'next_cursor': approved_orders_cursor(approved_orders[-1]) if has_more else None,
+        'has_more': has_more
+    })
+
+@app.route('/api/orders/approved/<int:order_id>', methods=['GET'])
+def get_approved_order(order_id):
+    """REST endpoint untuk satu order approved beserta items-nya (lookup langsung by id)"""
+    order = Order.query.options(db.selectinload(Order.items)).filter(
+        Order.id == order_id,
+        Order.status == OrderStatus.APPROVED
+    ).first()
     
-    return jsonify(orders_data)
+    if not order:
+        return jsonify({'error': 'Order not found or not approved'}), 404
+    
+    return jsonify(approved_order_to_dict(order))
+
+# Stream SSE perubahan status order, dibaca dari tabel outbox (id event = id outbox)
+ORDER_STREAM_BATCH_SIZE = 200
+
+def _outbox_settle_cutoff():
+    # Aturan settle yang sama dengan outbox dispatcher: di PostgreSQL id sequence bisa commit
+    # tidak berurutan, jadi hanya event yang lebih tua dari jendela settle yang dianggap final
+    return datetime.utcnow() - timedelta(seconds=outbox_dispatcher.settle_seconds)
+
+def _outbox_head():
+    """Id outbox terbaru yang aman dipakai sebagai posisi stream"""
+    return (db.session.query(OutboxEvent.id)
+            .filter(OutboxEvent.created_at <= _outbox_settle_cutoff())
+            .order_by(OutboxEvent.id.desc())
+            .limit(1)
+            .scalar()) or 0
+
+def _order_stream_events(after):
+    head = _outbox_head()
+    events = (OutboxEvent.query.filter(OutboxEvent.id > after, OutboxEvent.id <= head)
+              .order_by(OutboxEvent.id).limit(ORDER_STREAM_BATCH_SIZE).all())
+    return [(event.id, {'event_type': event.event_type, **json.loads(event.payload)}) for event in events]
+
+order_stream = ChangeStream.from_env(app, 'order', _outbox_head, _order_stream_events)
+
+@app.route('/api/orders/stream', methods=['GET'])
+def stream_orders():
+    """SSE perubahan status order; resume lewat Last-Event-ID"""
+    try:
+        last_event_id = requested_last_event_id()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return order_stream.response(last_event_id)
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'healthy', 'service': 'order-service'})
+    inventory_state = inventory_downstream.to_dict()
+    # Service tetap berjalan walau dependency bermasalah, jadi status cukup "degraded"
+    degraded = inventory_state['circuit_breaker']['state'] != 'CLOSED'
+    return jsonify({
+        'status': 'degraded' if degraded else 'healthy',
+        'service': 'order-service',
+        'dependencies': {
+            'inventory-service': inventory_state
+        }
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Statistik runtime order-service (per worker process)"""
+    return jsonify({
+        'service': 'order-service',
+        'inventory_cache': inventory_catalog_cache.stats(),
+        'outbox': outbox_dispatcher.stats(),
+        'order_stream': order_stream.stats(),
+        'graphql_documents': graphql_backend.stats(),
+        'http_client': service_client.stats()
+    })
 
 @app.after_request
 def after_request(response):
@@ -601,10 +1252,25 @@ def after_request(response):
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
     return response
 
-with app.app_context():
-    db.create_all()
+# Pengiriman event status order ke service lain (default: webhook inventory service)
+outbox_dispatcher = OutboxDispatcher.from_env(
+    app, db, OutboxEvent, OutboxSubscriberOffset, service_client,
+    default_subscribers=f"inventory={INVENTORY_SERVICE_URL}/api/events/orders"
+)
+
+def start_outbox_dispatcher():
+    """Jalankan outbox dispatcher di process ini kecuali OUTBOX_DISPATCHER_ENABLED=false.
+    
+    Dipanggil dari entrypoint (__main__ dan hook gunicorn di gunicorn.conf.py), bukan saat
+    import, agar test, shell dan script migrasi tidak ikut mengirim webhook. Di gunicorn
+    tiap worker menjalankan dispatcher; lease mencegah kirim ganda.
+    """
+    if os.getenv('OUTBOX_DISPATCHER_ENABLED', 'true').lower() == 'true':
+        outbox_dispatcher.start()
 
 if __name__ == '__main__':
+    # Migrasi tidak dijalankan saat import; untuk gunicorn jalankan `python migrations.py upgrade` dulu
     with app.app_context():
-        db.create_all()
+        run_migrations(db.engine, MIGRATIONS, db.metadata)  # Hanya migrasi yang belum diterapkan
+    start_outbox_dispatcher()
     app.run(host='0.0.0.0', port=5002, debug=True)
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""Circuit breaker dan bulkhead untuk panggilan ke service lain.
+
+Error yang dilempar adalah turunan requests.RequestException, sehingga fallback yang
+sudah menangkap requests.RequestException otomatis ikut menangani circuit yang terbuka.
+"""
+import threading
+import time
+
+import requests
+
+CLOSED = 'CLOSED'
+OPEN = 'OPEN'
+HALF_OPEN = 'HALF_OPEN'
+
+
+class CircuitOpenError(requests.RequestException):
+    """Circuit sedang terbuka, panggilan ditolak tanpa menyentuh downstream"""
+
+
+class BulkheadFullError(requests.RequestException):
+    """Semua slot konkurensi ke downstream sedang terpakai"""
+
+
+class CircuitBreaker:
+    """Circuit breaker closed / open / half-open.
+
+    Setelah failure_threshold kegagalan berturut-turut circuit terbuka selama
+    recovery_timeout detik; setelah itu maksimal half_open_max_calls panggilan
+    percobaan diizinkan. Percobaan sukses menutup circuit, gagal membukanya lagi.
+    """
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30, half_open_max_calls=1):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+        self.rejected_calls = 0
+
+    def before_call(self):
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    self.rejected_calls += 1
+                    raise CircuitOpenError('Circuit is open')
+                self._state = HALF_OPEN
+                self._half_open_calls = 0
+            if self._state == HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    self.rejected_calls += 1
+                    raise CircuitOpenError('Circuit is half-open, trial call in progress')
+                self._half_open_calls += 1
+
+    def cancel_call(self):
+        """Batalkan izin dari before_call() untuk panggilan yang tidak jadi dijalankan"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def to_dict(self):
+        state = self.state
+        with self._lock:
+            return {
+                'state': state,
+                'consecutive_failures': self._consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'recovery_timeout_seconds': self.recovery_timeout,
+                'rejected_calls': self.rejected_calls
+            }
+
+
+class Bulkhead:
+    """Membatasi jumlah panggilan bersamaan ke satu downstream"""
+
+    def __init__(self, max_concurrent=10, max_wait=0.5):
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected_calls = 0
+
+    def acquire(self):
+        if not self._semaphore.acquire(timeout=self.max_wait):
+            with self._lock:
+                self.rejected_calls += 1
+            raise BulkheadFullError('Too many concurrent calls')
+        with self._lock:
+            self.in_flight += 1
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._semaphore.release()
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'in_flight': self.in_flight,
+                'rejected_calls': self.rejected_calls
+            }
+
+
+class Downstream:
+    """Satu downstream service yang dilindungi circuit breaker dan bulkhead"""
+
+    def __init__(self, name, breaker, bulkhead):
+        self.name = name
+        self.breaker = breaker
+        self.bulkhead = bulkhead
+
+    def call(self, func, *args, **kwargs):
+        """Jalankan func (mis. service_client.request); response 5xx dihitung sebagai kegagalan"""
+        # Circuit dicek sebelum bulkhead: saat open panggilan langsung ditolak tanpa
+        # menunggu slot bulkhead (max_wait) yang sedang dipakai panggilan lambat
+        self.breaker.before_call()
+        try:
+            self.bulkhead.acquire()
+        except BulkheadFullError:
+            self.breaker.cancel_call()
+            raise
+        try:
+            response = func(*args, **kwargs)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        finally:
+            self.bulkhead.release()
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def to_dict(self):
+        return {
+            'circuit_breaker': self.breaker.to_dict(),
+            'bulkhead': self.bulkhead.to_dict()
+        }
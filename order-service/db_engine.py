@@ -0,0 +1,82 @@
+"""Konfigurasi engine database dari environment.
+
+DATABASE_URL menentukan backend (default: SQLite milik service). Untuk database
+server seperti PostgreSQL, pool koneksi diatur lewat:
+    DB_POOL_SIZE      koneksi tetap per process (default 5)
+    DB_MAX_OVERFLOW   koneksi tambahan saat beban puncak (default 10)
+    DB_POOL_TIMEOUT   detik menunggu koneksi kosong dari pool (default 10)
+    DB_POOL_RECYCLE   umur maksimal koneksi dalam detik (default 1800)
+pool_pre_ping selalu aktif agar koneksi yang sudah diputus server tidak dipakai ulang.
+
+Setiap koneksi SQLite diberi PRAGMA (lihat install_sqlite_pragmas) agar pembaca tidak
+terblokir penulis dan penulis menunggu lock alih-alih langsung "database is locked":
+    SQLITE_TUNING            'off' untuk memakai setting bawaan SQLite (default on)
+    SQLITE_JOURNAL_MODE      default WAL
+    SQLITE_SYNCHRONOUS       default NORMAL (aman untuk WAL, fsync hanya saat checkpoint)
+    SQLITE_BUSY_TIMEOUT_MS   default 5000
+    SQLITE_CACHE_SIZE_KB     page cache per koneksi (default 20000)
+    SQLITE_MMAP_SIZE         byte database yang di-memory-map (default 268435456)
+File ini identik di setiap service yang memakainya.
+"""
+import os
+import sqlite3
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def database_uri(default):
+    """DATABASE_URL jika di-set, selain itu `default`"""
+    uri = os.getenv('DATABASE_URL') or default
+    # SQLAlchemy 1.4 tidak lagi menerima skema lama postgres://
+    if uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+
+def engine_options(uri):
+    """Nilai SQLALCHEMY_ENGINE_OPTIONS untuk database `uri`"""
+    if uri.startswith('sqlite'):
+        return {}
+
+    options = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True
+    }
+    if uri.startswith('postgresql'):
+        # CURRENT_TIMESTAMP di SQLite selalu UTC; samakan zona waktu sesi PostgreSQL
+        options['connect_args'] = {'options': '-c timezone=UTC'}
+    return options
+
+
+def sqlite_pragmas():
+    """Daftar PRAGMA yang dijalankan di setiap koneksi SQLite baru"""
+    if os.getenv('SQLITE_TUNING', 'on').lower() == 'off':
+        return []
+    return [
+        f"PRAGMA journal_mode={os.getenv('SQLITE_JOURNAL_MODE', 'WAL')}",
+        f"PRAGMA synchronous={os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')}",
+        f"PRAGMA busy_timeout={int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))}",
+        f"PRAGMA cache_size=-{int(os.getenv('SQLITE_CACHE_SIZE_KB', 20000))}",
+        f"PRAGMA mmap_size={int(os.getenv('SQLITE_MMAP_SIZE', 268435456))}",
+    ]
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in sqlite_pragmas():
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def install_sqlite_pragmas():
+    """Pasang hook PRAGMA untuk semua engine SQLite di process ini (aman dipanggil berulang)"""
+    if not event.contains(Engine, 'connect', _apply_sqlite_pragmas):
+        event.listen(Engine, 'connect', _apply_sqlite_pragmas)
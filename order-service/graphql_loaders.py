@@ -0,0 +1,60 @@
+"""DataLoader untuk field relasi GraphQL (graphene 2 / promise).
+
+Tanpa loader, setiap OrderType memuat `items` dan `statusHistory` sendiri-sendiri
+(lazy load), sehingga query 500 order menjadi 501+ query SQL. Loader mengumpulkan
+semua id parent yang diminta dalam satu eksekusi lalu memuat anaknya dengan satu
+query IN per field. Loader disimpan di flask.g, jadi cache-nya hanya berlaku
+selama satu request.
+"""
+from flask import g
+from promise import Promise
+from promise.dataloader import DataLoader
+from sqlalchemy import inspect
+from sqlalchemy.orm.attributes import set_committed_value
+
+# Batas jumlah parameter per query IN
+IN_CLAUSE_CHUNK_SIZE = 500
+
+
+class RelationshipLoader(DataLoader):
+    """Memuat koleksi relasi one-to-many untuk banyak parent sekaligus"""
+
+    def __init__(self, parent_model, relationship_name):
+        super().__init__()
+        self.parent_model = parent_model
+        self.relationship_name = relationship_name
+        relationship = inspect(parent_model).relationships[relationship_name]
+        self.child_model = relationship.mapper.class_
+        (self.foreign_key,) = relationship.remote_side
+        self.order_by = relationship.order_by or ()
+
+    def batch_load_fn(self, parent_ids):
+        children = {parent_id: [] for parent_id in parent_ids}
+        unique_ids = list(children)
+        for start in range(0, len(unique_ids), IN_CLAUSE_CHUNK_SIZE):
+            chunk = unique_ids[start:start + IN_CLAUSE_CHUNK_SIZE]
+            query = self.child_model.query.filter(self.foreign_key.in_(chunk)).order_by(*self.order_by)
+            for child in query:
+                children[getattr(child, self.foreign_key.key)].append(child)
+        return Promise.resolve([children[parent_id] for parent_id in parent_ids])
+
+    def load_for(self, parent):
+        """Koleksi relasi milik `parent`; langsung dari objek jika sudah dimuat (mis. selectinload)"""
+        if self.relationship_name not in inspect(parent).unloaded:
+            return getattr(parent, self.relationship_name)
+
+        def remember(children):
+            # Isi relasi di objek agar akses berikutnya (mis. di resolver lain) tidak query lagi
+            set_committed_value(parent, self.relationship_name, children)
+            return children
+
+        return self.load(parent.id).then(remember)
+
+
+def get_loader(parent_model, relationship_name):
+    """Loader untuk relasi `relationship_name` milik `parent_model`, satu per request"""
+    loaders = g.setdefault('graphql_loaders', {})
+    key = (parent_model, relationship_name)
+    if key not in loaders:
+        loaders[key] = RelationshipLoader(parent_model, relationship_name)
+    return loaders[key]
@@ -0,0 +1,10 @@
+"""Konfigurasi gunicorn order-service (Procfile / DockerFile memakai --config gunicorn.conf.py).
+
+Outbox dispatcher tidak lagi dijalankan saat app.py di-import; setiap worker
+menjalankannya sendiri setelah app dimuat di worker tersebut.
+"""
+
+
+def post_worker_init(worker):
+    from app import start_outbox_dispatcher
+    start_outbox_dispatcher()
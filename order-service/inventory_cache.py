@@ -0,0 +1,132 @@
+import threading
+import time
+
+
+class InventoryCatalogCache:
+    """Salinan lokal katalog inventory service yang disinkronkan lewat versi katalog.
+
+    Katalog dimuat penuh sekali (load_catalog), lalu diperbarui secara inkremental
+    dari delta feed /api/items/changes (fetch_changes). Karena setiap perubahan stock
+    juga menaikkan versi katalog, sinkronisasi delta cukup untuk menjaga stock tetap
+    segar tanpa mengambil ulang seluruh katalog. Karena itu entry tidak punya TTL dan
+    tidak di-evict: selama sinkronisasi versi berhasil seluruh katalog tetap valid.
+
+    Request ke inventory service dijalankan di luar self._lock dan hanya satu
+    sinkronisasi berjalan pada satu waktu; pemanggil lain menunggu hasilnya tanpa
+    mengirim request sendiri.
+
+    load_catalog() -> (version, items) atau None jika gagal
+    fetch_changes(since) -> dict delta feed atau None jika gagal
+    """
+
+    def __init__(self, load_catalog, fetch_changes, sync_interval=5):
+        self.sync_interval = sync_interval
+        self._load_catalog = load_catalog
+        self._fetch_changes = fetch_changes
+        self._items = None  # id -> item; None jika katalog belum dimuat
+        self._version = None
+        self._last_sync = None  # waktu mulai sinkronisasi terakhir yang berhasil
+        self._lock = threading.Lock()  # melindungi state di atas
+        self._sync_lock = threading.Lock()  # single-flight untuk request ke inventory service
+        self.hits = 0
+        self.misses = 0
+        self.full_loads = 0
+        self.delta_syncs = 0
+        self.failed_syncs = 0
+
+    def _reload(self):
+        loaded = self._load_catalog()
+        if loaded is None:
+            return False
+        version, items = loaded
+        with self._lock:
+            self._items = {item['id']: item for item in items}
+            self._version = version
+            self.full_loads += 1
+        return True
+
+    def _apply_changes(self, version):
+        while True:
+            delta = self._fetch_changes(version)
+            if delta is None:
+                return False
+            with self._lock:
+                if self._version != version:
+                    # invalidate() dipanggil selama request berjalan
+                    return False
+                # Hapus dulu baru terapkan perubahan: item yang dihapus lalu dibuat ulang dengan
+                # item_code sama ada di deleted (id lama) dan changed (id baru) dalam satu delta
+                deleted_ids = delta.get('deleted_ids')
+                if deleted_ids is None:
+                    deleted_codes = set(delta['deleted'])
+                    deleted_ids = [item_id for item_id, item in self._items.items() if item['item_code'] in deleted_codes]
+                for item_id in deleted_ids:
+                    self._items.pop(item_id, None)
+                for item in delta['changed']:
+                    self._items[item['id']] = item
+                self._version = version = delta['version']
+                self.delta_syncs += 1
+            if not delta.get('has_more'):
+                return True
+
+    def sync(self, force=False):
+        """Sinkronkan dengan inventory service; tanpa force paling sering sekali per sync_interval"""
+        return self._sync(force) is not None
+
+    def _sync(self, force):
+        # None jika gagal, False jika katalog resident sudah cukup baru (tanpa request), True jika load / delta dijalankan
+        requested_at = time.monotonic()
+        with self._sync_lock:
+            with self._lock:
+                version = self._version
+                last_sync = self._last_sync
+            if version is not None and last_sync is not None:
+                # Sinkronisasi yang dimulai setelah pemanggilan ini sudah selesai saat menunggu _sync_lock
+                if last_sync >= requested_at or (not force and requested_at - last_sync < self.sync_interval):
+                    return False
+
+            started_at = time.monotonic()
+            synced = self._reload() if version is None else self._apply_changes(version)
+            with self._lock:
+                if synced:
+                    self._last_sync = started_at
+                else:
+                    self.failed_syncs += 1
+            return True if synced else None
+
+    def get_all(self, fresh=False):
+        """Semua item katalog (urut id); fresh=True memaksa sinkronisasi delta sebelum membaca.
+
+        Hit: dilayani dari katalog resident tanpa request. Miss: perlu load penuh atau sync delta.
+        """
+        synced = self._sync(fresh)
+        with self._lock:
+            if synced is False:
+                self.hits += 1
+            else:
+                self.misses += 1
+            if synced is None or self._items is None:
+                return None
+            items = list(self._items.values())
+        return sorted(items, key=lambda item: item['id'])
+
+    def invalidate(self):
+        with self._lock:
+            self._items = None
+            self._version = None
+            self._last_sync = None
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._items) if self._items is not None else 0,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'catalog_version': self._version,
+                'sync_interval_seconds': self.sync_interval,
+                'full_loads': self.full_loads,
+                'delta_syncs': self.delta_syncs,
+                'failed_syncs': self.failed_syncs
+            }
@@ -0,0 +1,138 @@
+"""Stub inventory-service lokal dengan fault injection.
+
+Dipakai untuk mencoba circuit breaker / bulkhead order-service tanpa menjalankan
+inventory-service asli:
+
+    python inventory_stub.py --port 5000 --latency-ms 2000 --error-rate 0.5
+
+Fault juga bisa diubah saat berjalan:
+
+    curl -X POST localhost:5000/__faults -H 'Content-Type: application/json' \\
+         -d '{"latency_ms": 0, "error_rate": 1.0, "error_status": 503}'
+"""
+import argparse
+import random
+import threading
+import time
+
+from flask import Flask, request, jsonify
+
+app = Flask(__name__)
+
+faults = {
+    'latency_ms': 0,      # delay sebelum setiap response
+    'error_rate': 0.0,    # peluang (0..1) response error
+    'error_status': 503,  # status code untuk response error
+}
+faults_lock = threading.Lock()
+call_count = 0
+
+items = {
+    'BRG-001': {'id': 1, 'item_code': 'BRG-001', 'name': 'Beras', 'description': None, 'category': 'Bahan Pokok',
+                'unit': 'kg', 'unit_price': 12000.0, 'stock_quantity': 100, 'reserved_quantity': 0},
+    'BRG-002': {'id': 2, 'item_code': 'BRG-002', 'name': 'Minyak Goreng', 'description': None, 'category': 'Bahan Pokok',
+                'unit': 'liter', 'unit_price': 18000.0, 'stock_quantity': 50, 'reserved_quantity': 0},
+}
+
+
+@app.before_request
+def inject_faults():
+    global call_count
+    if request.path == '/__faults':
+        return None
+    with faults_lock:
+        call_count += 1
+        latency_ms = faults['latency_ms']
+        error_rate = faults['error_rate']
+        error_status = faults['error_status']
+    if latency_ms:
+        time.sleep(latency_ms / 1000)
+    if random.random() < error_rate:
+        return jsonify({'error': 'Injected fault'}), error_status
+    return None
+
+
+@app.route('/__faults', methods=['GET', 'POST'])
+def configure_faults():
+    with faults_lock:
+        if request.method == 'POST':
+            data = request.get_json() or {}
+            for key in faults:
+                if key in data:
+                    faults[key] = type(faults[key])(data[key])
+        return jsonify({**faults, 'call_count': call_count})
+
+
+@app.route('/api/items', methods=['GET'])
+def list_items():
+    rows = [{**item, 'available_quantity': item['stock_quantity'] - item['reserved_quantity']}
+            for item in sorted(items.values(), key=lambda item: item['id'])]
+    return jsonify({'items': rows, 'next_cursor': None, 'has_more': False, 'version': 0})
+
+
+@app.route('/api/items/changes', methods=['GET'])
+def item_changes():
+    since = int(request.args.get('since', 0))
+    return jsonify({'version': since, 'has_more': False, 'changed': [], 'deleted': [], 'deleted_ids': []})
+
+
+@app.route('/api/items/<item_code>/stock', methods=['GET'])
+def item_stock(item_code):
+    item = items.get(item_code)
+    if not item:
+        return jsonify({'error': 'Item not found'}), 404
+    return jsonify({
+        'item_code': item_code,
+        'stock_quantity': item['stock_quantity'],
+        'reserved_quantity': item['reserved_quantity'],
+        'available_quantity': item['stock_quantity'] - item['reserved_quantity']
+    })
+
+
+@app.route('/api/check-availability', methods=['POST'])
+def check_availability():
+    details = []
+    for line in request.get_json().get('items', []):
+        item = items.get(line['item_code'])
+        available_quantity = item['stock_quantity'] - item['reserved_quantity'] if item else 0
+        available = item is not None and available_quantity >= line['requested_quantity']
+        details.append({
+            'item_code': line['item_code'],
+            'available': available,
+            'message': 'Available' if available else ('Insufficient stock' if item else 'Item not found'),
+            'stock_quantity': available_quantity,
+            'requested_quantity': line['requested_quantity']
+        })
+    all_available = all(detail['available'] for detail in details)
+    return jsonify({
+        'available': all_available,
+        'message': 'All items available' if all_available else 'Some items unavailable',
+        'details': details
+    })
+
+
+@app.route('/api/reserve-stock', methods=['POST'])
+def reserve_stock():
+    data = request.get_json()
+    return jsonify({'success': True, 'message': 'Stock reserved successfully', 'order_id': data.get('order_id')})
+
+
+@app.route('/api/reservations/<int:order_id>/release', methods=['POST'])
+def release_reservation(order_id):
+    return jsonify({'success': True, 'message': f'Reservation for order {order_id} released', 'order_id': order_id})
+
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    return jsonify({'status': 'healthy', 'service': 'inventory-service-stub'})
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Stub inventory-service dengan fault injection')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--latency-ms', type=int, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=503)
+    args = parser.parse_args()
+    faults.update(latency_ms=args.latency_ms, error_rate=args.error_rate, error_status=args.error_status)
+    app.run(host='0.0.0.0', port=args.port, threaded=True)
@@ -0,0 +1,56 @@
+"""Daftar migrasi skema order-service (lihat migration_runner.py).
+
+Migrasi diterapkan saat app.py dijalankan langsung; untuk deploy dengan gunicorn
+jalankan upgrade sebelum worker dinyalakan (release di Procfile, CMD di DockerFile):
+    python migrations.py            tampilkan status migrasi
+    python migrations.py upgrade    terapkan migrasi yang tertunda
+"""
+import sys
+
+from migration_runner import Migration, create_index, create_tables, migration_status, run_migrations
+
+
+def create_order_items_index(connection, metadata):
+    """Index order_items.order_id untuk memuat item banyak order sekaligus (selectinload)"""
+    create_index(connection, 'ix_order_items_order_id', 'order_items', ['order_id'])
+
+
+def create_connection_indexes(connection, metadata):
+    """Index urutan keyset untuk ordersConnection GraphQL (lihat graphql_pagination.py)"""
+    create_index(connection, 'ix_orders_created_at_id', 'orders', ['created_at', 'id'])
+    create_index(connection, 'ix_orders_restaurant_created_at_id', 'orders', ['restaurant_id', 'created_at', 'id'])
+    create_index(connection, 'ix_orders_status_created_at_id', 'orders', ['status', 'created_at', 'id'])
+
+
+def create_updated_at_index(connection, metadata):
+    """Index orders.updated_at untuk MAX(updated_at) di versi cache response GraphQL"""
+    create_index(connection, 'ix_orders_updated_at', 'orders', ['updated_at'])
+
+
+def create_approved_date_index(connection, metadata):
+    """Index keyset untuk feed /api/orders/approved (status, approved_date, id)"""
+    create_index(connection, 'ix_orders_status_approved_date_id', 'orders', ['status', 'approved_date', 'id'])
+
+
+MIGRATIONS = [
+    Migration(1, 'initial schema', create_tables),
+    Migration(2, 'index order_items.order_id', create_order_items_index, transactional=False),
+    Migration(3, 'keyset indexes for GraphQL connections', create_connection_indexes, transactional=False),
+    Migration(4, 'index orders.updated_at', create_updated_at_index, transactional=False),
+    Migration(5, 'keyset index for the approved orders feed', create_approved_date_index, transactional=False),
+]
+
+
+def main(argv):
+    from app import app, db
+
+    with app.app_context():
+        if argv[1:] == ['upgrade']:
+            applied = run_migrations(db.engine, MIGRATIONS, db.metadata)
+            print(f"Applied migrations: {applied or 'none'}")
+        for version, name, applied in migration_status(db.engine, MIGRATIONS):
+            print(f"{version:4d}  {'applied' if applied else 'pending'}  {name}")
+
+
+if __name__ == '__main__':
+    main(sys.argv)
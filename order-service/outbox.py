@@ -0,0 +1,272 @@
+"""Dispatcher transactional outbox untuk event order.
+
+Event ditulis ke tabel outbox di transaksi yang sama dengan perubahan status order,
+lalu thread dispatcher mengirimkannya ke setiap subscriber sebagai webhook HTTP POST
+berisi batch event ({"subscriber": ..., "events": [...]}), berurutan menurut id event.
+
+Posisi tiap subscriber (last_event_id) disimpan di tabel offset. Sebelum mengirim,
+dispatcher mengambil lease atas subscriber dengan UPDATE bersyarat, sehingga beberapa
+worker gunicorn tidak mengirim batch yang sama bersamaan. Pengiriman at-least-once:
+subscriber harus idempoten terhadap id event.
+
+Konfigurasi lewat environment:
+    OUTBOX_SUBSCRIBERS      daftar name=url dipisah koma
+    OUTBOX_BATCH_SIZE       jumlah event maksimal per request (default 100)
+    OUTBOX_POLL_INTERVAL    jeda polling tabel outbox dalam detik (default 1)
+    OUTBOX_BACKOFF          dasar backoff retry per subscriber dalam detik (default 1)
+    OUTBOX_MAX_BACKOFF      batas backoff retry dalam detik (default 60)
+    OUTBOX_SETTLE_SECONDS   umur minimal event sebelum dikirim, agar transaksi yang
+                            commit tidak berurutan id tidak terlewat (default 0.5)
+    OUTBOX_RETENTION_HOURS  event yang sudah terkirim ke semua subscriber dihapus
+                            setelah sekian jam (default 24)
+"""
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+import requests
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+PURGE_INTERVAL_SECONDS = 60
+
+
+def parse_subscribers(value):
+    """'inventory=http://host/api/events/orders,qc=http://...' -> {'inventory': url, ...}"""
+    subscribers = {}
+    for entry in (value or '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, sep, url = entry.partition('=')
+        if not sep or not name.strip() or not url.strip():
+            raise ValueError(f"Invalid outbox subscriber {entry!r}, expected name=url")
+        subscribers[name.strip()] = url.strip()
+    return subscribers
+
+
+class SubscriberState:
+    """Status pengiriman in-process untuk satu subscriber"""
+
+    def __init__(self, name, url):
+        self.name = name
+        self.url = url
+        self.consecutive_failures = 0
+        self.next_attempt_at = 0.0
+        self.delivered_events = 0
+        self.failed_deliveries = 0
+        self.last_error = None
+
+    def to_dict(self):
+        return {
+            'url': self.url,
+            'delivered_events': self.delivered_events,
+            'failed_deliveries': self.failed_deliveries,
+            'consecutive_failures': self.consecutive_failures,
+            'last_error': self.last_error
+        }
+
+
+class OutboxDispatcher:
+    """Thread latar yang mengirim event outbox ke subscriber webhook.
+
+    event_model harus punya kolom id, created_at dan method to_dict(); offset_model
+    punya kolom subscriber, last_event_id, locked_by dan locked_until.
+    """
+
+    def __init__(self, app, db, event_model, offset_model, subscribers, http_client,
+                 batch_size=100, poll_interval=1.0, backoff=1.0, max_backoff=60.0,
+                 settle_seconds=0.5, retention_hours=24, lease_seconds=30):
+        self.app = app
+        self.db = db
+        self.event_model = event_model
+        self.offset_model = offset_model
+        self.http_client = http_client
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.settle_seconds = settle_seconds
+        self.retention_hours = retention_hours
+        self.lease_seconds = lease_seconds
+        self.subscribers = {name: SubscriberState(name, url) for name, url in subscribers.items()}
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._last_purge = 0.0
+
+    @classmethod
+    def from_env(cls, app, db, event_model, offset_model, http_client, default_subscribers=''):
+        return cls(
+            app, db, event_model, offset_model,
+            subscribers=parse_subscribers(os.getenv('OUTBOX_SUBSCRIBERS', default_subscribers)),
+            http_client=http_client,
+            batch_size=int(os.getenv('OUTBOX_BATCH_SIZE', 100)),
+            poll_interval=float(os.getenv('OUTBOX_POLL_INTERVAL', 1)),
+            backoff=float(os.getenv('OUTBOX_BACKOFF', 1)),
+            max_backoff=float(os.getenv('OUTBOX_MAX_BACKOFF', 60)),
+            settle_seconds=float(os.getenv('OUTBOX_SETTLE_SECONDS', 0.5)),
+            retention_hours=float(os.getenv('OUTBOX_RETENTION_HOURS', 24))
+        )
+
+    def start(self):
+        if self._thread is not None or not self.subscribers:
+            return
+        self._thread = threading.Thread(target=self._run, name='outbox-dispatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def notify(self):
+        """Dipanggil setelah commit yang menulis event agar pengiriman tidak menunggu poll berikutnya"""
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            busy = False
+            try:
+                with self.app.app_context():
+                    busy = self.dispatch_once()
+                    self._purge_if_due()
+            except Exception:
+                logger.exception('Outbox dispatch failed')
+            finally:
+                with self.app.app_context():
+                    self.db.session.remove()
+            if not busy:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def dispatch_once(self):
+        """Kirim satu batch ke setiap subscriber yang siap; True jika masih ada event tersisa"""
+        busy = False
+        for state in self.subscribers.values():
+            if time.monotonic() < state.next_attempt_at:
+                continue
+            last_event_id = self._acquire_lease(state.name)
+            if last_event_id is None:
+                continue  # dipegang worker lain
+            try:
+                busy = self._deliver_batch(state, last_event_id) or busy
+            finally:
+                self._release_lease(state.name)
+        return busy
+
+    def _acquire_lease(self, subscriber):
+        offsets = self.offset_model.__table__
+        now = datetime.utcnow()
+        exists = self.db.session.query(offsets.c.subscriber).filter(offsets.c.subscriber == subscriber).first()
+        if exists is None:
+            try:
+                with self.db.session.begin_nested():
+                    self.db.session.execute(offsets.insert().values(subscriber=subscriber, last_event_id=0))
+            except IntegrityError:
+                pass  # worker lain membuat baris offset lebih dulu
+        result = self.db.session.execute(
+            offsets.update()
+            .where(offsets.c.subscriber == subscriber)
+            .where((offsets.c.locked_until.is_(None)) | (offsets.c.locked_until < now)
+                   | (offsets.c.locked_by == self.worker_id))
+            .values(locked_by=self.worker_id, locked_until=now + timedelta(seconds=self.lease_seconds))
+        )
+        self.db.session.commit()
+        if result.rowcount != 1:
+            return None
+        return self.db.session.query(offsets.c.last_event_id).filter(offsets.c.subscriber == subscriber).scalar()
+
+    def _release_lease(self, subscriber):
+        offsets = self.offset_model.__table__
+        self.db.session.rollback()
+        self.db.session.execute(
+            offsets.update()
+            .where(offsets.c.subscriber == subscriber)
+            .where(offsets.c.locked_by == self.worker_id)
+            .values(locked_by=None, locked_until=None)
+        )
+        self.db.session.commit()
+
+    def _deliver_batch(self, state, last_event_id):
+        events = self.event_model.query.filter(
+            self.event_model.id > last_event_id,
+            self.event_model.created_at <= datetime.utcnow() - timedelta(seconds=self.settle_seconds)
+        ).order_by(self.event_model.id).limit(self.batch_size).all()
+        if not events:
+            return False
+
+        error = None
+        try:
+            response = self.http_client.post(
+                state.url,
+                json={'subscriber': state.name, 'events': [event.to_dict() for event in events]},
+                idempotent=True,
+                name=f'outbox.{state.name}'
+            )
+            if not 200 <= response.status_code < 300:
+                error = f"HTTP {response.status_code}"
+        except requests.RequestException as e:
+            error = str(e)
+
+        if error:
+            state.consecutive_failures += 1
+            state.failed_deliveries += 1
+            state.last_error = error
+            delay = min(self.max_backoff, self.backoff * (2 ** (state.consecutive_failures - 1)))
+            state.next_attempt_at = time.monotonic() + random.uniform(delay / 2, delay)
+            return False
+
+        offsets = self.offset_model.__table__
+        self.db.session.execute(
+            offsets.update()
+            .where(offsets.c.subscriber == state.name)
+            .where(offsets.c.locked_by == self.worker_id)
+            .values(last_event_id=events[-1].id)
+        )
+        self.db.session.commit()
+        state.consecutive_failures = 0
+        state.next_attempt_at = 0.0
+        state.last_error = None
+        state.delivered_events += len(events)
+        return len(events) == self.batch_size
+
+    def _purge_if_due(self):
+        if time.monotonic() - self._last_purge < PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = time.monotonic()
+        cutoff = datetime.utcnow() - timedelta(hours=self.retention_hours)
+        query = self.event_model.query.filter(self.event_model.created_at < cutoff)
+        if self.subscribers:
+            # Hanya hapus event yang sudah terkirim ke semua subscriber
+            offsets = self.offset_model.__table__
+            positions = dict(self.db.session.query(offsets.c.subscriber, offsets.c.last_event_id).filter(
+                offsets.c.subscriber.in_(list(self.subscribers))
+            ).all())
+            if len(positions) < len(self.subscribers):
+                return
+            query = query.filter(self.event_model.id <= min(positions.values()))
+        query.delete(synchronize_session=False)
+        self.db.session.commit()
+
+    def stats(self):
+        offsets = {}
+        if self.subscribers:
+            with self.app.app_context():
+                table = self.offset_model.__table__
+                offsets = dict(self.db.session.query(table.c.subscriber, table.c.last_event_id).all())
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'batch_size': self.batch_size,
+            'subscribers': {
+                name: {**state.to_dict(), 'last_event_id': offsets.get(name, 0)}
+                for name, state in self.subscribers.items()
+            }
+        }
@@ -0,0 +1,164 @@
+"""Server-Sent Events untuk mendorong perubahan data ke dashboard staff.
+
+Satu thread per process memantau posisi terbaru sebuah log perubahan (mis. versi
+katalog atau id outbox) dan membangunkan semua koneksi SSE saat posisi bergeser.
+Hasil fetch untuk posisi yang sama dipakai bersama, jadi banyak layar yang terbuka
+tidak berarti banyak query. Klien bisa melanjutkan dari event terakhir lewat header
+Last-Event-ID (otomatis oleh EventSource) atau query parameter last_event_id.
+File ini identik di setiap service yang memakainya.
+
+Konfigurasi lewat environment:
+    SSE_POLL_INTERVAL        jeda pengecekan posisi log dalam detik (default 1)
+    SSE_HEARTBEAT_INTERVAL   jeda komentar heartbeat saat tidak ada event (default 15)
+    SSE_MAX_STREAM_SECONDS   koneksi ditutup setelah sekian detik lalu EventSource
+                             tersambung ulang dengan Last-Event-ID (default 300)
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+from flask import Response, request
+
+logger = logging.getLogger(__name__)
+
+RETRY_MILLISECONDS = 3000
+
+
+def format_event(event_id, event_name, data):
+    return f"id: {event_id}\nevent: {event_name}\ndata: {json.dumps(data)}\n\n"
+
+
+def requested_last_event_id():
+    """Last-Event-ID dari header (reconnect EventSource) atau query parameter; None jika tidak ada"""
+    value = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError('last_event_id must be an integer')
+
+
+class ChangeStream:
+    """Fan-out log perubahan ke banyak koneksi SSE.
+
+    head() -> posisi terbaru log (int)
+    fetch(after) -> list (event_id, data) setelah posisi `after`, urut naik
+    Keduanya dipanggil di dalam app context tersendiri.
+    """
+
+    def __init__(self, app, event_name, head, fetch, poll_interval=1.0, heartbeat_interval=15,
+                 max_stream_seconds=300):
+        self.app = app
+        self.event_name = event_name
+        self._head_func = head
+        self._fetch_func = fetch
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.max_stream_seconds = max_stream_seconds
+        self._head = None
+        self._condition = threading.Condition()
+        self._fetch_cache = {}  # after -> events, berlaku selama head belum bergeser
+        self._thread = None
+        self.connections = 0
+        self.events_sent = 0
+
+    @classmethod
+    def from_env(cls, app, event_name, head, fetch):
+        return cls(
+            app, event_name, head, fetch,
+            poll_interval=float(os.getenv('SSE_POLL_INTERVAL', 1)),
+            heartbeat_interval=float(os.getenv('SSE_HEARTBEAT_INTERVAL', 15)),
+            max_stream_seconds=float(os.getenv('SSE_MAX_STREAM_SECONDS', 300))
+        )
+
+    def _read_head(self):
+        with self.app.app_context():
+            return self._head_func()
+
+    def _ensure_started(self):
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._head = self._read_head()
+            self._thread = threading.Thread(target=self._run, name=f'sse-{self.event_name}', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                head = self._read_head()
+            except Exception:
+                logger.exception('Reading change log head failed')
+                continue
+            with self._condition:
+                if head != self._head:
+                    self._head = head
+                    self._fetch_cache.clear()
+                    self._condition.notify_all()
+
+    def _fetch(self, after):
+        with self._condition:
+            events = self._fetch_cache.get(after)
+        if events is None:
+            with self.app.app_context():
+                events = self._fetch_func(after)
+            with self._condition:
+                self._fetch_cache[after] = events
+        return events
+
+    def _events(self, last_event_id):
+        self._ensure_started()
+        deadline = time.monotonic() + self.max_stream_seconds
+        with self._condition:
+            position = self._head if last_event_id is None else last_event_id
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+
+        while time.monotonic() < deadline:
+            with self._condition:
+                head = self._head
+            if position < head:
+                events = self._fetch(position)
+                if not events:
+                    position = head  # celah pada log (mis. event sudah dihapus)
+                for event_id, data in events:
+                    yield format_event(event_id, self.event_name, data)
+                    position = event_id
+                with self._condition:
+                    self.events_sent += len(events)
+                continue
+
+            with self._condition:
+                changed = self._condition.wait_for(
+                    lambda: self._head != head,
+                    timeout=min(self.heartbeat_interval, max(deadline - time.monotonic(), 0))
+                )
+            if not changed:
+                yield ': heartbeat\n\n'
+
+    def response(self, last_event_id):
+        def generate():
+            with self._condition:
+                self.connections += 1
+            try:
+                yield from self._events(last_event_id)
+            finally:
+                with self._condition:
+                    self.connections -= 1
+
+        return Response(generate(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # jangan di-buffer oleh reverse proxy
+        })
+
+    def stats(self):
+        with self._condition:
+            return {
+                'event': self.event_name,
+                'head': self._head,
+                'open_connections': self.connections,
+                'events_sent': self.events_sent
+            }
@@ -0,0 +1,83 @@
+"""Fixture bersama test order-service.
+
+app.py membaca konfigurasi saat di-import, jadi environment di-set sebelum import:
+database SQLite sementara dan tanpa outbox dispatcher / inventory service sungguhan.
+"""
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'order-test.db')}"
+os.environ['OUTBOX_DISPATCHER_ENABLED'] = 'false'
+os.environ.setdefault('INVENTORY_SERVICE_URL', 'http://127.0.0.1:9')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import event
+
+from app import app as flask_app, db, run_migrations, MIGRATIONS, Order, OrderItem, OrderStatus, OrderStatusHistory
+
+
+@pytest.fixture
+def app():
+    with flask_app.app_context():
+        run_migrations(db.engine, MIGRATIONS, db.metadata)
+    yield flask_app
+    with flask_app.app_context():
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def count_statements(app):
+    """Context manager yang menghitung statement SQL yang dijalankan di dalamnya"""
+    @contextmanager
+    def counter():
+        statements = []
+
+        def record(connection, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+
+    return counter
+
+
+@pytest.fixture
+def make_orders(app):
+    """Membuat `count` order approved, masing-masing dengan `items_per_order` item dan satu history"""
+    def make(count, items_per_order=3):
+        with app.app_context():
+            for index in range(count):
+                order = Order(
+                    order_number=f'TEST-{index:04d}', restaurant_id='resto', restaurant_name='Resto',
+                    status=OrderStatus.APPROVED, requested_date=datetime.utcnow(), approved_date=datetime.utcnow(),
+                    items=[OrderItem(item_code=f'ITEM-{line}', item_name=f'Item {line}', requested_quantity=1,
+                                     approved_quantity=1, unit='pcs')
+                           for line in range(items_per_order)]
+                )
+                db.session.add(order)
+                db.session.flush()
+                db.session.add(OrderStatusHistory(order_id=order.id, previous_status=OrderStatus.PENDING,
+                                                  new_status=OrderStatus.APPROVED))
+            db.session.commit()
+
+    return make
+
+
+def select_statements(statements):
+    return [statement for statement in statements if statement.lstrip().upper().startswith('SELECT')]
@@ -0,0 +1,61 @@
+"""Feed /api/orders/approved: jumlah statement per halaman tidak bergantung pada ukuran halaman"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db, Order
+from conftest import select_statements
+
+
+def shuffle_approved_dates(app):
+    """approved_date tidak searah id (beberapa sama persis, satu NULL) seperti order yang di-approve tidak berurutan"""
+    base = datetime(2024, 1, 1)
+    with app.app_context():
+        for order in Order.query.all():
+            order.approved_date = None if order.id == 3 else base + timedelta(hours=(order.id * 7) % 5)
+        db.session.commit()
+        return [order.id for order in Order.query.order_by(Order.approved_date.desc().nullslast(), Order.id.desc())]
+
+
+@pytest.mark.parametrize('limit', [1, 10, 100])
+def test_approved_orders_page_uses_constant_statements(client, count_statements, make_orders, limit):
+    make_orders(120)
+
+    with count_statements() as statements:
+        response = client.get(f'/api/orders/approved?limit={limit}')
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert len(body['orders']) == limit
+    assert all(len(order['items']) == 3 for order in body['orders'])
+    # Satu query untuk halaman order + satu selectin untuk items-nya
+    assert len(select_statements(statements)) == 2, statements
+
+
+def test_approved_orders_pages_keep_approved_date_order(app, client, make_orders):
+    make_orders(25)
+    expected = shuffle_approved_dates(app)
+
+    seen, cursor = [], None
+    while True:
+        response = client.get('/api/orders/approved', query_string={'limit': 4, **({'cursor': cursor} if cursor else {})})
+        body = response.get_json()
+        seen.extend(order['id'] for order in body['orders'])
+        cursor = body['next_cursor']
+        if not body['has_more']:
+            break
+
+    assert seen == expected
+    assert seen[-1] == 3
+
+
+def test_approved_orders_without_paging_returns_array(app, client, make_orders):
+    make_orders(5)
+    expected = shuffle_approved_dates(app)
+
+    body = client.get('/api/orders/approved').get_json()
+    assert [order['id'] for order in body] == expected
+
+
+def test_approved_orders_rejects_invalid_cursor(client):
+    assert client.get('/api/orders/approved?cursor=abc').status_code == 400
@@ -0,0 +1,140 @@
+"""Circuit breaker / bulkhead (circuit_breaker.py) terhadap inventory_stub.py lewat HTTP sungguhan"""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from werkzeug.serving import make_server
+
+import inventory_stub
+from circuit_breaker import (BulkheadFullError, Bulkhead, CircuitBreaker, CircuitOpenError, Downstream,
+                             CLOSED, HALF_OPEN, OPEN)
+from service_client import ServiceClient
+
+
+@pytest.fixture(scope='module')
+def stub_server():
+    server = make_server('127.0.0.1', 0, inventory_stub.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    thread.join()
+
+
+@pytest.fixture
+def stub(stub_server):
+    """URL stub dengan fault direset; set_faults(...) mengubah fault injection"""
+    client = ServiceClient(retries=0, timeout=5)
+
+    def set_faults(**faults):
+        return client.post(f'{stub_server}/__faults', json=faults).json()
+
+    set_faults(latency_ms=0, error_rate=0.0, error_status=503)
+    return SimpleNamespace(
+        url=stub_server,
+        set_faults=set_faults,
+        call_count=lambda: client.get(f'{stub_server}/__faults').json()['call_count']
+    )
+
+
+def make_downstream(failure_threshold=3, recovery_timeout=30, max_concurrent=10, max_wait=0.5):
+    return Downstream(
+        'inventory',
+        CircuitBreaker(failure_threshold=failure_threshold, recovery_timeout=recovery_timeout),
+        Bulkhead(max_concurrent=max_concurrent, max_wait=max_wait)
+    )
+
+
+def get_stock(downstream, stub):
+    return downstream.call(ServiceClient(retries=0, timeout=5).request, 'GET', f'{stub.url}/api/items/BRG-001/stock')
+
+
+def start_slow_call(downstream, stub):
+    """Jalankan satu panggilan lambat di thread lain; kembali setelah slot bulkhead terpakai"""
+    thread = threading.Thread(target=get_stock, args=(downstream, stub))
+    thread.start()
+    deadline = time.monotonic() + 5
+    while downstream.bulkhead.in_flight == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return thread
+
+
+def test_circuit_opens_after_consecutive_failures(stub):
+    downstream = make_downstream(failure_threshold=3)
+    stub.set_faults(error_rate=1.0)
+    for _ in range(3):
+        assert get_stock(downstream, stub).status_code == 503
+    assert downstream.breaker.state == OPEN
+
+    calls_before = stub.call_count()
+    with pytest.raises(CircuitOpenError):
+        get_stock(downstream, stub)
+    assert stub.call_count() == calls_before
+
+
+def test_open_circuit_fails_fast_while_bulkhead_is_full(stub):
+    downstream = make_downstream(max_concurrent=1, max_wait=2)
+    stub.set_faults(latency_ms=1000)
+    slow_call = start_slow_call(downstream, stub)
+    for _ in range(downstream.breaker.failure_threshold):
+        downstream.breaker.record_failure()
+
+    start = time.monotonic()
+    with pytest.raises(CircuitOpenError):
+        get_stock(downstream, stub)
+    assert time.monotonic() - start < 0.5
+    slow_call.join()
+
+
+def test_half_open_trial_success_closes_circuit(stub):
+    downstream = make_downstream(failure_threshold=1, recovery_timeout=0.2)
+    stub.set_faults(error_rate=1.0)
+    get_stock(downstream, stub)
+    assert downstream.breaker.state == OPEN
+
+    time.sleep(0.25)
+    assert downstream.breaker.state == HALF_OPEN
+    stub.set_faults(error_rate=0.0)
+    assert get_stock(downstream, stub).status_code == 200
+    assert downstream.breaker.state == CLOSED
+
+
+def test_half_open_trial_failure_reopens_circuit(stub):
+    downstream = make_downstream(failure_threshold=1, recovery_timeout=0.2)
+    stub.set_faults(error_rate=1.0)
+    get_stock(downstream, stub)
+
+    time.sleep(0.25)
+    assert get_stock(downstream, stub).status_code == 503
+    assert downstream.breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        get_stock(downstream, stub)
+
+
+def test_bulkhead_rejects_when_slots_are_busy(stub):
+    downstream = make_downstream(max_concurrent=1, max_wait=0.1)
+    stub.set_faults(latency_ms=500)
+    slow_call = start_slow_call(downstream, stub)
+
+    with pytest.raises(BulkheadFullError):
+        get_stock(downstream, stub)
+    slow_call.join()
+    assert downstream.bulkhead.rejected_calls == 1
+    # Penolakan bulkhead bukan kegagalan downstream
+    assert downstream.breaker.state == CLOSED
+
+
+def test_bulkhead_rejection_does_not_use_half_open_trial(stub):
+    downstream = make_downstream(failure_threshold=1, recovery_timeout=0.2, max_concurrent=1, max_wait=0.1)
+    stub.set_faults(latency_ms=1000)
+    slow_call = start_slow_call(downstream, stub)
+    downstream.breaker.record_failure()
+    time.sleep(0.25)
+
+    with pytest.raises(BulkheadFullError):
+        get_stock(downstream, stub)
+    # Slot percobaan half-open dikembalikan, jadi percobaan berikutnya tetap diizinkan
+    assert downstream.breaker.state == HALF_OPEN
+    downstream.breaker.before_call()
+    slow_call.join()
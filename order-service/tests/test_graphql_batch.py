@@ -0,0 +1,39 @@
+"""Batch GraphQL paralel (CachedGraphQLView + batch_pool) dan counter cache dokumen"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app import schema
+from graphql_cache import CachedGraphQLView, DocumentCacheBackend
+
+BATCH = [
+    {'query': 'query Orders { orders { id orderNumber } }'},
+    {'query': 'query Page { ordersConnection(first: 5) { totalCount } }'},
+]
+
+
+@pytest.fixture
+def parallel_backend(app, monkeypatch):
+    """Endpoint /graphql dengan batch_pool dan backend cache baru; mengembalikan backend-nya"""
+    pool = ThreadPoolExecutor(max_workers=2)
+    backend = DocumentCacheBackend()
+    monkeypatch.setitem(app.view_functions, 'graphql', CachedGraphQLView.as_view(
+        'graphql', schema=schema, backend=backend, batch=True, batch_pool=pool))
+    yield backend
+    pool.shutdown()
+
+
+def test_parallel_batch_counts_each_document_lookup_once(client, make_orders, parallel_backend):
+    make_orders(3)
+
+    response = client.post('/graphql', json=BATCH)
+    assert response.status_code == 200
+    results = response.get_json()
+    assert len(results[0]['data']['orders']) == 3
+    assert results[1]['data']['ordersConnection']['totalCount'] == 3
+    stats = parallel_backend.stats()
+    assert (stats['hits'], stats['misses']) == (0, 2)
+
+    client.post('/graphql', json=BATCH)
+    stats = parallel_backend.stats()
+    assert (stats['hits'], stats['misses']) == (2, 2)
@@ -0,0 +1,29 @@
+"""Regression N+1: relasi items / statusHistory dimuat lewat DataLoader (graphql_loaders.py)"""
+import pytest
+
+from conftest import select_statements
+
+DEEP_ORDERS_QUERY = """
+    query {
+        orders {
+            id
+            items { itemCode requestedQuantity }
+            statusHistory { newStatus changedAt }
+        }
+    }
+"""
+
+
+@pytest.mark.parametrize('order_count', [5, 60])
+def test_deep_orders_query_uses_constant_statements(client, count_statements, make_orders, order_count):
+    make_orders(order_count)
+
+    with count_statements() as statements:
+        response = client.post('/graphql', json={'query': DEEP_ORDERS_QUERY})
+
+    orders = response.get_json()['data']['orders']
+    assert len(orders) == order_count
+    assert all(len(order['items']) == 3 and len(order['statusHistory']) == 1 for order in orders)
+    # orders + satu query IN untuk items + satu untuk status_history, berapa pun jumlah order
+    selects = select_statements(statements)
+    assert len(selects) == 3, selects
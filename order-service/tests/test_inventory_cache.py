@@ -0,0 +1,97 @@
+"""InventoryCatalogCache: katalog tidak dimuat ulang selama sinkronisasi versi berjalan"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from inventory_cache import InventoryCatalogCache
+
+
+def catalog(count):
+    return [{'id': index, 'item_code': f'ITEM-{index:04d}', 'stock_quantity': 10} for index in range(1, count + 1)]
+
+
+def test_current_catalog_is_never_reloaded():
+    changes = []
+
+    def fetch_changes(since):
+        changes.append(since)
+        changed = [{'id': 1, 'item_code': 'ITEM-0001', 'stock_quantity': len(changes)}]
+        return {'version': since + 1, 'has_more': False, 'changed': changed, 'deleted': ['ITEM-0002']}
+
+    loads = []
+    cache = InventoryCatalogCache(lambda: loads.append(1) or (1, catalog(3)), fetch_changes, sync_interval=0)
+    for _ in range(20):
+        items = cache.get_all(fresh=True)
+
+    assert len(loads) == 1
+    assert changes == list(range(1, 20))
+    # Setiap baca fresh butuh load / delta sync
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (0, 20)
+    assert [item['item_code'] for item in items] == ['ITEM-0001', 'ITEM-0003']
+    assert items[0]['stock_quantity'] == 19
+
+
+def test_load_runs_once_and_outside_lock():
+    release_load = threading.Event()
+    loads = []
+
+    def load_catalog():
+        loads.append(1)
+        release_load.wait(5)
+        return 1, catalog(10)
+
+    cache = InventoryCatalogCache(load_catalog, lambda since: None, sync_interval=60)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        readers = [pool.submit(cache.get_all) for _ in range(8)]
+        while not loads:
+            time.sleep(0.01)
+        # Lock state tidak dipegang selama request ke inventory service
+        start = time.monotonic()
+        assert cache.stats()['size'] == 0
+        assert time.monotonic() - start < 0.5
+        release_load.set()
+        results = [reader.result() for reader in readers]
+
+    assert len(loads) == 1
+    assert all(len(items) == 10 for items in results)
+    # Pembaca yang menunggu load berjalan dilayani dari katalog resident
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (7, 1)
+
+
+def test_reads_within_sync_interval_are_hits():
+    cache = InventoryCatalogCache(lambda: (1, catalog(3)), lambda since: None, sync_interval=60)
+    for _ in range(5):
+        assert len(cache.get_all()) == 3
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (4, 1, 0.8)
+
+
+def test_metrics_expose_cache_hits_and_misses(client):
+    inventory_cache = client.get('/metrics').get_json()['inventory_cache']
+    assert {'hits', 'misses', 'hit_rate'} <= set(inventory_cache)
+
+
+def test_failed_sync_returns_none():
+    cache = InventoryCatalogCache(lambda: (1, catalog(2)), lambda since: None, sync_interval=0)
+    assert len(cache.get_all()) == 2
+    assert cache.get_all(fresh=True) is None
+    assert cache.stats()['failed_syncs'] == 1
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (0, 2)
+
+
+@pytest.mark.parametrize('with_deleted_ids', [True, False])
+def test_delete_and_recreate_in_one_delta_keeps_new_item(with_deleted_ids):
+    # ITEM-0002 (id 2) dihapus lalu dibuat ulang sebagai id 4 di jendela delta yang sama
+    recreated = {'id': 4, 'item_code': 'ITEM-0002', 'stock_quantity': 7}
+    delta = {'version': 2, 'has_more': False, 'changed': [recreated], 'deleted': ['ITEM-0002']}
+    if with_deleted_ids:
+        delta['deleted_ids'] = [2]
+
+    cache = InventoryCatalogCache(lambda: (1, catalog(3)), lambda since: delta, sync_interval=0)
+    cache.get_all()
+    items = cache.get_all(fresh=True)
+
+    assert [(item['id'], item['item_code']) for item in items] == [(1, 'ITEM-0001'), (3, 'ITEM-0003'), (4, 'ITEM-0002')]
@@ -0,0 +1,40 @@
+"""run_migrations berjalan di bawah lock lintas process (migration_runner.migration_lock)"""
+import os
+import subprocess
+import sys
+import time
+
+from sqlalchemy import create_engine, inspect
+
+from migration_runner import migration_lock
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_concurrent_startup_waits_for_migration_lock(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'order-migrate.db'}"
+    engine = create_engine(database_url)
+    env = {**os.environ, 'DATABASE_URL': database_url}
+
+    with migration_lock(engine):
+        # Release command yang dijalankan sebelum worker gunicorn start
+        worker = subprocess.Popen([sys.executable, 'migrations.py', 'upgrade'], cwd=SERVICE_DIR, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        time.sleep(3)
+        assert worker.poll() is None
+    _, stderr = worker.communicate(timeout=60)
+    assert worker.returncode == 0, stderr.decode()
+
+    workers = [subprocess.Popen([sys.executable, 'migrations.py', 'upgrade'], cwd=SERVICE_DIR, env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE) for _ in range(4)]
+    for worker in workers:
+        _, stderr = worker.communicate(timeout=60)
+        assert worker.returncode == 0, stderr.decode()
+
+
+def test_import_does_not_migrate(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'order-import.db'}"
+    # Worker gunicorn hanya meng-import app; skema diurus release command
+    subprocess.run([sys.executable, '-c', 'import app'], cwd=SERVICE_DIR, check=True,
+                   env={**os.environ, 'DATABASE_URL': database_url}, stdout=subprocess.DEVNULL)
+    assert inspect(create_engine(database_url)).get_table_names() == []
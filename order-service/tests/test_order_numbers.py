@@ -0,0 +1,41 @@
+"""Nomor order (allocate_order_numbers): unik saat dibuat paralel dan seed counter numerik"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from app import allocate_order_numbers, db, Order, OrderNumberSequence, OrderStatus
+
+
+def order_payload(index):
+    return {
+        'restaurant_id': f'resto-{index % 10}',
+        'restaurant_name': 'Resto',
+        'requested_date': '2024-01-01 08:00:00',
+        'items': [{'item_code': 'ITEM-1', 'item_name': 'Item 1', 'requested_quantity': 1, 'unit': 'pcs'}]
+    }
+
+
+def test_parallel_creates_get_unique_order_numbers(app):
+    def create(index):
+        response = app.test_client().post('/api/orders', json=order_payload(index))
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()['order_number']
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        numbers = list(pool.map(create, range(1000)))
+
+    assert len(set(numbers)) == 1000
+    day = datetime.now().strftime('%Y%m%d')
+    assert sorted(numbers) == [f'ORD-{day}-{value:04d}' for value in range(1, 1001)]
+
+
+def test_new_counter_seeds_from_numeric_max(app):
+    day = datetime.now().strftime('%Y%m%d')
+    with app.app_context():
+        for value in (9998, 9999, 10000):
+            db.session.add(Order(order_number=f'ORD-{day}-{value:04d}', restaurant_id='resto', restaurant_name='Resto',
+                                 requested_date=datetime.utcnow(), status=OrderStatus.PENDING))
+        db.session.commit()
+        assert db.session.get(OrderNumberSequence, day) is None
+
+        assert allocate_order_numbers(2) == [f'ORD-{day}-10001', f'ORD-{day}-10002']
+        db.session.commit()
@@ -0,0 +1,30 @@
+"""Posisi stream SSE order (/api/orders/stream) hanya maju sampai event outbox yang sudah settle"""
+import json
+from datetime import datetime, timedelta
+
+from app import _order_stream_events, _outbox_head, db, outbox_dispatcher, OutboxEvent
+
+
+def add_event(event_id, created_at):
+    db.session.add(OutboxEvent(id=event_id, event_type='order.status_changed', aggregate_id=event_id,
+                               created_at=created_at, payload=json.dumps({'order_id': event_id})))
+    db.session.commit()
+
+
+def test_lower_id_committing_after_higher_id_is_still_delivered(app):
+    settled = datetime.utcnow() - timedelta(seconds=outbox_dispatcher.settle_seconds + 60)
+    with app.app_context():
+        add_event(1, settled)
+        assert _outbox_head() == 1
+
+        # Id 3 commit lebih dulu daripada id 2 yang sequence-nya diambil sebelumnya
+        add_event(3, datetime.utcnow())
+        assert _outbox_head() == 1
+        assert _order_stream_events(1) == []
+
+        add_event(2, datetime.utcnow())
+        db.session.query(OutboxEvent).filter(OutboxEvent.id > 1).update({'created_at': settled})
+        db.session.commit()
+
+        assert _outbox_head() == 3
+        assert [event_id for event_id, _ in _order_stream_events(1)] == [2, 3]
@@ -0,0 +1,39 @@
+"""get_order_version: penanda versi cache response GraphQL untuk tag Order"""
+import json
+
+from app import db, get_order_version, Order
+
+UPDATE_QUANTITIES = """
+    mutation Update($orderId: Int!, $quantities: [String]) {
+        updateOrderStatus(orderId: $orderId, status: "APPROVED", approvedQuantities: $quantities, reserveStock: false) {
+            success message
+        }
+    }
+"""
+
+
+def test_approved_quantity_edit_without_status_change_bumps_version(app, client, make_orders):
+    make_orders(1)
+    with app.app_context():
+        order_id = db.session.query(Order.id).scalar()
+        before = get_order_version()
+
+    response = client.post('/graphql', json={'query': UPDATE_QUANTITIES, 'variables': {
+        'orderId': order_id,
+        'quantities': [json.dumps({'item_code': 'ITEM-0', 'approved_quantity': 5})]
+    }})
+    assert response.get_json()['data']['updateOrderStatus']['success'] is True
+
+    with app.app_context():
+        assert get_order_version() != before
+
+
+def test_order_version_queries_use_indexes(app, count_statements, make_orders):
+    make_orders(5)
+    with app.app_context():
+        with count_statements() as statements:
+            get_order_version()
+        for statement in statements:
+            plan = ' '.join(row[-1] for row in db.session.execute(db.text(f'EXPLAIN QUERY PLAN {statement}')))
+            # MAX dari index/PK tampil sebagai SEARCH; SCAN berarti membaca seluruh tabel atau index
+            assert 'SCAN' not in plan, f'{statement}: {plan}'
@@ -2,21 +2,49 @@ from flask import Flask, request, jsonify
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from datetime import datetime
-from config import Config
-from models import db, QualityControl
+import os
+import threading
+import time
 import requests
+from config import Config
+from sqlalchemy.exc import IntegrityError
+from models import db, QualityControl, QCDailyStat
+from service_client import client as service_client
+from db_engine import install_sqlite_pragmas
+from migration_runner import run_migrations
+from migrations import MIGRATIONS, QC_SEARCH_TABLE
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
-# Initialize extensions
+# Initialize extensions (WAL dan PRAGMA lain untuk setiap koneksi SQLite)
+install_sqlite_pragmas()
 db.init_app(app)
 jwt = JWTManager(app)
-CORS(app)
+CORS(app, expose_headers=['X-Next-Cursor'])
 
-# Create tables
+# Terapkan migrasi skema yang belum tercatat (tidak drop/recreate tabel)
 with app.app_context():
-    db.create_all()
+    run_migrations(db.engine, MIGRATIONS, db.metadata)
+
+def record_daily_stat(day, status):
+    """Menambah rekap harian dashboard di transaksi yang sama dengan hasil QC"""
+    daily_stats = QCDailyStat.__table__
+    while True:
+        result = db.session.execute(
+            daily_stats.update()
+            .where(daily_stats.c.day == day, daily_stats.c.status == status)
+            .values(count=daily_stats.c.count + 1)
+        )
+        if result.rowcount == 1:
+            return
+        try:
+            with db.session.begin_nested():
+                db.session.execute(daily_stats.insert().values(day=day, status=status, count=1))
+            return
+        except IntegrityError:
+            # Transaksi lain membuat baris hari ini lebih dulu, ulangi lewat UPDATE
+            continue
 
 @app.route('/api/qc/submit', methods=['POST'])
 def submit_qc():
@@ -53,17 +81,19 @@ def submit_qc():
         )
         
         db.session.add(qc_result)
+        record_daily_stat(qc_result.checked_at.date(), status)
         db.session.commit()
         
         # Notify inventory service
         try:
-            response = requests.post(
-                f'http://localhost:5000/api/items/{data["item_code"]}/qc-result',
+            response = service_client.post(
+                f'{app.config["INVENTORY_SERVICE_URL"]}/api/items/{data["item_code"]}/qc-result',
                 json={
                     'status': status,
                     'notes': data.get('notes'),
                     'checked_at': qc_result.checked_at.isoformat()
-                }
+                },
+                name='inventory.qc_result'
             )
             if response.status_code != 200:
                 print(f"Warning: Failed to notify inventory service: {response.text}")
@@ -82,53 +112,144 @@ def submit_qc():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+QC_LIST_MAX_LIMIT = 500
+QC_SEARCH_MIN_TRIGRAM = 3  # index trigram hanya bisa mencari kata minimal 3 karakter
+QC_SEARCH_SCAN_WINDOW = 5000  # baris terbaru yang dicek langsung sebelum memakai index FTS
+QC_SEARCH_MAX_ID_LIST = 5000  # hasil FTS sebanyak ini dikirim sebagai daftar id eksplisit
+
+_qc_search_index = None
+
+def qc_search_index_available():
+    """True jika tabel FTS5 trigram untuk qc_results ada (SQLite); dicek sekali per process"""
+    global _qc_search_index
+    if _qc_search_index is None:
+        _qc_search_index = (db.engine.dialect.name == 'sqlite'
+                            and db.inspect(db.engine).has_table(QC_SEARCH_TABLE))
+    return _qc_search_index
+
+def qc_search_uses_index(search):
+    return len(search) >= QC_SEARCH_MIN_TRIGRAM and qc_search_index_available()
+
+def qc_search_filter(search, use_index=True, model=QualityControl):
+    """Filter substring item_code/name; memakai index FTS5 trigram jika tersedia.
+
+    Di PostgreSQL ILIKE sudah memakai index trigram GIN dari migrasi 3."""
+    if use_index and qc_search_uses_index(search):
+        phrase = '"' + search.replace('"', '""') + '"'
+        matches = (db.select(db.literal_column('rowid'))
+                   .select_from(db.table(QC_SEARCH_TABLE))
+                   .where(db.text(f'{QC_SEARCH_TABLE} MATCH :phrase').bindparams(phrase=phrase)))
+        ids = db.session.execute(matches.limit(QC_SEARCH_MAX_ID_LIST + 1)).scalars().all()
+        if len(ids) <= QC_SEARCH_MAX_ID_LIST:
+            # Daftar id eksplisit membuat SQLite mulai dari hasil FTS (lookup per id), bukan
+            # memindai seluruh index status/tanggal sambil mencocokkan subquery
+            return model.id.in_(ids)
+        return model.id.in_(matches)
+
+    search_term = f"%{search}%"
+    return db.or_(
+        model.item_code.ilike(search_term),
+        model.name.ilike(search_term)
+    )
+
+def parse_qc_cursor(cursor):
+    """Cursor listing berbentuk '<checked_at ISO>|<id>' dari item terakhir halaman sebelumnya"""
+    checked_at, item_id = cursor.rsplit('|', 1)
+    return datetime.fromisoformat(checked_at), int(item_id)
+
+# Jumlah item yang menunggu QC dibaca dari inventory service dengan timeout pendek dan
+# di-cache, agar dashboard tidak ikut lambat/gagal saat inventory service bermasalah
+PENDING_QC_CACHE_TTL = float(os.getenv('PENDING_QC_CACHE_TTL', 30))
+PENDING_QC_TIMEOUT = float(os.getenv('PENDING_QC_TIMEOUT', 1))
+pending_qc_cache = {'count': None, 'expires_at': 0.0, 'refreshing': False, 'hits': 0, 'misses': 0, 'errors': 0}
+pending_qc_cache_lock = threading.Lock()
+
+def get_pending_qc_count():
+    """(jumlah pending QC atau None, stale) dari cache atau inventory service"""
+    with pending_qc_cache_lock:
+        fresh = pending_qc_cache['expires_at'] > time.monotonic()
+        if pending_qc_cache['count'] is not None and (fresh or pending_qc_cache['refreshing']):
+            # Saat request lain sedang refresh, pakai nilai lama daripada ikut menunggu
+            pending_qc_cache['hits'] += 1
+            return pending_qc_cache['count'], not fresh
+        pending_qc_cache['misses'] += 1
+        pending_qc_cache['refreshing'] = True
+
+    count = None
+    try:
+        response = service_client.get(
+            f'{app.config["INVENTORY_SERVICE_URL"]}/api/qc-logs/pending-count',
+            timeout=PENDING_QC_TIMEOUT, idempotent=False, name='inventory.pending_qc_count'
+        )
+        if response.status_code == 200:
+            count = response.json()['pending_qc']
+    except (requests.RequestException, ValueError, KeyError):
+        pass
+
+    with pending_qc_cache_lock:
+        pending_qc_cache['refreshing'] = False
+        if count is None:
+            pending_qc_cache['errors'] += 1
+            return pending_qc_cache['count'], True
+        pending_qc_cache['count'] = count
+        pending_qc_cache['expires_at'] = time.monotonic() + PENDING_QC_CACHE_TTL
+        return count, False
+
 @app.route('/api/qc/dashboard/stats', methods=['GET'])
 def get_dashboard_stats():
-    """Get dashboard statistics including total, passed, failed and pending items"""
+    """Get dashboard statistics including total, passed, failed and pending items
+
+    Semua angka dan bucket harian (untuk grafik) dibaca dengan satu query dari rekap
+    qc_daily_stats, jadi biayanya sebanding dengan jumlah hari, bukan jumlah hasil QC.
+    start_date inklusif, end_date eksklusif (tanggal).
+    """
     try:
         # Get date range from query params for filtering
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         
-        # Base query
-        query = QualityControl.query
+        query = QCDailyStat.query
         
         # Apply date filters if provided
         if start_date:
             try:
                 start = datetime.strptime(start_date, '%Y-%m-%d')
-                query = query.filter(QualityControl.checked_at >= start)
+                query = query.filter(QCDailyStat.day >= start.date())
             except ValueError:
                 return jsonify({'error': 'Invalid start date format'}), 400
         if end_date:
             try:
                 end = datetime.strptime(end_date, '%Y-%m-%d')
-                query = query.filter(QualityControl.checked_at <= end)
+                query = query.filter(QCDailyStat.day < end.date())
             except ValueError:
                 return jsonify({'error': 'Invalid end date format'}), 400
 
         # Get counts for different statuses
-        total = query.count()
-        passed = query.filter_by(status='approved').count()
-        failed = query.filter_by(status='rejected').count()
+        total = passed = failed = 0
+        daily = {}
+        for stat in query.order_by(QCDailyStat.day):
+            day = stat.day.isoformat()
+            bucket = daily.setdefault(day, {'date': day, 'total': 0, 'passed': 0, 'failed': 0})
+            bucket['total'] += stat.count
+            total += stat.count
+            if stat.status == 'approved':
+                bucket['passed'] += stat.count
+                passed += stat.count
+            elif stat.status == 'rejected':
+                bucket['failed'] += stat.count
+                failed += stat.count
         
-        # Get pending items count from inventory service
-        try:
-            response = requests.get('http://localhost:5000/api/items/pending-qc')
-            if response.status_code == 200:
-                pending_items = len(response.json())
-            else:
-                pending_items = 0
-        except:
-            pending_items = 0
+        pending_items, pending_stale = get_pending_qc_count()
         
         return jsonify({
             'total_items': total,
             'passed_qc': passed,
             'failed_qc': failed,
-            'pending_qc': pending_items,
+            'pending_qc': pending_items or 0,
+            'pending_qc_stale': pending_stale,
             'pass_rate': round((passed / total * 100) if total > 0 else 0, 2),
-            'fail_rate': round((failed / total * 100) if total > 0 else 0, 2)
+            'fail_rate': round((failed / total * 100) if total > 0 else 0, 2),
+            'daily': list(daily.values())
         }), 200
         
     except Exception as e:
@@ -136,13 +257,24 @@ def get_dashboard_stats():
 
 @app.route('/api/qc/items', methods=['GET'])
 def list_qc_items():
-    """Get all QC items with filters"""
+    """Get all QC items with filters
+
+    Opsional: limit dan cursor untuk keyset pagination (checked_at, id) terbaru dulu;
+    cursor halaman berikutnya dikirim di header X-Next-Cursor.
+    """
     try:
         # Get filter parameters
         status = request.args.get('status')
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         search = request.args.get('search')
+        limit = request.args.get('limit')
+        cursor = request.args.get('cursor')
+        try:
+            limit = min(max(int(limit), 1), QC_LIST_MAX_LIMIT) if limit else None
+            cursor = parse_qc_cursor(cursor) if cursor else None
+        except ValueError:
+            return jsonify({'error': 'Invalid limit or cursor'}), 400
         
         # Base query
         query = QualityControl.query
@@ -170,25 +302,60 @@ def list_qc_items():
             except ValueError:
                 return jsonify({'error': 'Invalid end date format'}), 400
                 
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                db.or_(
-                    QualityControl.item_code.ilike(search_term),
-                    QualityControl.name.ilike(search_term)
-                )
-            )
+        if cursor:
+            cursor_checked_at, cursor_id = cursor
+            query = query.filter(db.or_(
+                QualityControl.checked_at < cursor_checked_at,
+                db.and_(QualityControl.checked_at == cursor_checked_at, QualityControl.id < cursor_id)
+            ))
             
         # Execute query
-        items = query.order_by(QualityControl.checked_at.desc()).all()
-        return jsonify([{
+        ordering = (QualityControl.checked_at.desc(), QualityControl.id.desc())
+        items = None
+        if search and limit and qc_search_uses_index(search):
+            # Kata yang umum biasanya sudah memenuhi satu halaman di beberapa ribu baris terbaru;
+            # itu jauh lebih murah daripada mengambil semua hasil FTS lalu mengurutkannya
+            recent = db.aliased(QualityControl, query.order_by(*ordering).limit(QC_SEARCH_SCAN_WINDOW).subquery())
+            items = db.session.query(recent) \
+                .filter(qc_search_filter(search, use_index=False, model=recent)) \
+                .order_by(recent.checked_at.desc(), recent.id.desc()).limit(limit + 1).all()
+            if len(items) <= limit:
+                items = None  # halaman belum penuh: cari di seluruh tabel lewat index
+        if search and items is None:
+            query = query.filter(qc_search_filter(search))
+        query = query.order_by(*ordering)
+
+        next_cursor = None
+        if limit:
+            if items is None:
+                items = query.limit(limit + 1).all()
+            if len(items) > limit:
+                items = items[:limit]
+                next_cursor = f"{items[-1].checked_at.isoformat()}|{items[-1].id}"
+        else:
+            items = query.all()
+        response = jsonify([{
             **item.to_dict(),
             'tanggal_masuk': item.checked_at.strftime('%Y-%m-%d %H:%M:%S') if item.checked_at else None,
             'status_text': 'Lulus' if item.status == 'approved' else 'Gagal' if item.status == 'rejected' else 'Pending'
-        } for item in items]), 200
+        } for item in items])
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response, 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Statistik runtime qc-service (per worker process)"""
+    return jsonify({
+        'service': 'qc-service',
+        'pending_qc_cache': {
+            key: value for key, value in pending_qc_cache.items() if key in ('hits', 'misses', 'errors')
+        },
+        'http_client': service_client.stats()
+    })
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5004, debug=True)
@@ -0,0 +1,93 @@
+"""Benchmark listing QC (filter status/tanggal dan pencarian) pada tabel qc_results besar.
+
+Mengisi database SQLite sementara (atau --database-url kosong) dengan N hasil QC lewat
+migrasi terbaru, lalu mengukur latency GET /api/qc/items in-process (tanpa HTTP):
+
+    python bench_qc_listing.py --rows 1000000 --repeat 20
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+WORDS = ['beras', 'gula', 'minyak', 'tepung', 'telur', 'susu', 'kopi', 'teh', 'garam', 'kecap',
+         'saus', 'mentega', 'keju', 'daging', 'ayam', 'ikan', 'udang', 'bawang', 'cabai', 'tomat']
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def populate(db, QualityControl, rows, chunk_size=50000):
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+    table = QualityControl.__table__
+    with db.engine.begin() as connection:
+        for offset in range(0, rows, chunk_size):
+            connection.execute(table.insert(), [
+                {
+                    'inventory_log_id': index,
+                    'item_code': f'ITM-{rng.randrange(100000):05d}',
+                    'name': f'{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.randrange(1000)}',
+                    'status': 'approved' if rng.random() < 0.8 else 'rejected',
+                    'checked_at': start + timedelta(seconds=index * 30),
+                    'sent_to_logistics': False,
+                    'returned_to_inventory': False
+                }
+                for index in range(offset, min(offset + chunk_size, rows))
+            ])
+    return start, start + timedelta(seconds=rows * 30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark QC listing filters')
+    parser.add_argument('--database-url')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from app import app, db, QualityControl
+
+    with app.app_context():
+        if QualityControl.query.first() is not None:
+            sys.exit('Database is not empty; use a dedicated benchmark database')
+        started = time.perf_counter()
+        first_day, last_day = populate(db, QualityControl, args.rows)
+        print(f"inserted {args.rows} rows in {time.perf_counter() - started:.1f} s")
+
+    middle = first_day + (last_day - first_day) / 2
+    date_range = f"start_date={middle:%Y-%m-%d}&end_date={middle + timedelta(days=7):%Y-%m-%d}"
+    cases = {
+        'status': 'status=lulus',
+        'status + date range': f'status=gagal&{date_range}',
+        'date range': date_range,
+        'search item_code': 'search=ITM-0420',
+        'search name': 'search=mentega',
+        'status + search': 'status=gagal&search=kopi teh',
+    }
+
+    client = app.test_client()
+    for label, params in cases.items():
+        url = f'/api/qc/items?{params}&limit={args.limit}'
+        latencies = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            response = client.get(url)
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200, response.get_data(as_text=True)
+        next_page = client.get(f"{url}&cursor={response.headers['X-Next-Cursor']}") \
+            if 'X-Next-Cursor' in response.headers else None
+        print(f"{label:20s} rows {len(response.get_json()):4d}  "
+              f"p50 {percentile(latencies, 0.5):6.1f} ms  p99 {percentile(latencies, 0.99):6.1f} ms"
+              + (f"  next page {len(next_page.get_json())} rows" if next_page else ''))
+
+
+if __name__ == '__main__':
+    main()
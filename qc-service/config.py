@@ -1,11 +1,13 @@
 import os
+from db_engine import database_uri, engine_options
 
 class Config:
     # Get the directory containing this file
     basedir = os.path.abspath(os.path.dirname(__file__))
     
     # Database configuration
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(basedir, 'instance', 'qc_items.db')
+    SQLALCHEMY_DATABASE_URI = database_uri('sqlite:///' + os.path.join(basedir, 'instance', 'qc_items.db'))
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # Flask configuration
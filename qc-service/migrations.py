@@ -1,125 +1,105 @@
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import text
-from config import Config
-import sqlite3
-import os
-from models import db, QualityControl
-
-app = Flask(__name__)
-app.config.from_object(Config)
-db.init_app(app)
-
-def run_migrations():
-    """Run database migrations"""
-    try:
-        # Get database path from config
-        db_path = Config.SQLALCHEMY_DATABASE_URI.replace('sqlite:///', '')
-        
-        # Create new database if it doesn't exist
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Drop existing tables if they exist
-        cursor.execute('DROP TABLE IF EXISTS qc_results')
-        
-        # Create qc_results table with new structure
-        cursor.execute('''
-        CREATE TABLE qc_results (
-            id INTEGER PRIMARY KEY,
-            inventory_log_id INTEGER NOT NULL,
-            item_code TEXT NOT NULL,
-            name TEXT NOT NULL,
-            status TEXT NOT NULL,
-            notes TEXT,
-            checked_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-            sent_to_logistics BOOLEAN DEFAULT 0,
-            sent_to_logistics_at TIMESTAMP,
-            returned_to_inventory BOOLEAN DEFAULT 0,
-            returned_to_inventory_at TIMESTAMP
-        )
-        ''')
-        
-        # Hide ROWID
-        cursor.execute('SELECT * FROM qc_results WHERE 0')
-        
-        # Commit changes and close connection
-        conn.commit()
-        conn.close()
-        
-        print("Successfully migrated database")
-        
-    except Exception as e:
-        print(f"Error during migration: {str(e)}")
-        if 'conn' in locals():
-            conn.rollback()
-            conn.close()
-
-def remove_sqlite_sequence():
-    """Remove sqlite_sequence table from the database"""
-    try:
-        # Get database path from config
-        db_path = Config.SQLALCHEMY_DATABASE_URI.replace('sqlite:///', '')
-        
-        # Only proceed if database exists
-        if os.path.exists(db_path):
-            # Connect to database
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # Drop sqlite_sequence table
-            cursor.execute('DROP TABLE IF EXISTS sqlite_sequence')
-            
-            # Commit changes and close connection
-            conn.commit()
-            conn.close()
-            
-            print("Successfully removed sqlite_sequence table")
-            
-    except Exception as e:
-        print(f"Error removing sqlite_sequence table: {str(e)}")
-
-def add_new_columns():
-    """Add new columns for logistics and inventory tracking"""
+"""Daftar migrasi skema qc-service (lihat migration_runner.py).
+
+Migrasi diterapkan otomatis saat app.py di-import; dari command line:
+    python migrations.py            tampilkan status migrasi
+    python migrations.py upgrade    terapkan migrasi yang tertunda
+"""
+import sys
+
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import OperationalError
+
+from migration_runner import Migration, add_column, create_index, create_tables, migration_status, run_migrations
+
+# Index pencarian substring item_code/name (SQLite FTS5 trigram), dipakai list_qc_items
+QC_SEARCH_TABLE = 'qc_results_fts'
+
+
+def add_logistics_columns(connection, metadata):
+    """Kolom tracking logistics/inventory untuk database yang dibuat sebelum kolom ini ada"""
+    add_column(connection, 'qc_results', 'sent_to_logistics', 'BOOLEAN DEFAULT FALSE')
+    add_column(connection, 'qc_results', 'sent_to_logistics_at', 'TIMESTAMP')
+    add_column(connection, 'qc_results', 'returned_to_inventory', 'BOOLEAN DEFAULT FALSE')
+    add_column(connection, 'qc_results', 'returned_to_inventory_at', 'TIMESTAMP')
+
+
+
+def _sqlite_trigram_available(connection):
+    """FTS5 dengan tokenizer trigram butuh SQLite >= 3.34 yang dikompilasi dengan FTS5"""
     try:
-        with app.app_context():
-            # Add sent_to_logistics column
-            db.session.execute(text('ALTER TABLE qc_results ADD COLUMN sent_to_logistics BOOLEAN DEFAULT 0'))
-            # Add sent_to_logistics_at column
-            db.session.execute(text('ALTER TABLE qc_results ADD COLUMN sent_to_logistics_at TIMESTAMP'))
-            # Add returned_to_inventory column
-            db.session.execute(text('ALTER TABLE qc_results ADD COLUMN returned_to_inventory BOOLEAN DEFAULT 0'))
-            # Add returned_to_inventory_at column
-            db.session.execute(text('ALTER TABLE qc_results ADD COLUMN returned_to_inventory_at TIMESTAMP'))
-            
-            db.session.commit()
-            print("Successfully added new columns")
-    except Exception as e:
-        print(f"Error adding new columns: {str(e)}")
-        db.session.rollback()
-
-def create_app():
-    app = Flask(__name__)
-    app.config.from_object(Config)
-    db.init_app(app)
-    return app
-
-def upgrade():
-    app = create_app()
+        connection.execute(text("CREATE VIRTUAL TABLE temp.fts_probe USING fts5(value, tokenize='trigram')"))
+        connection.execute(text("DROP TABLE temp.fts_probe"))
+        return True
+    except OperationalError:
+        return False
+
+
+def create_listing_indexes(connection, metadata):
+    """Index filter status/tanggal dan index pencarian substring untuk qc_results"""
+    create_index(connection, 'ix_qc_results_status_checked_at', 'qc_results', ['status', 'checked_at'])
+    create_index(connection, 'ix_qc_results_checked_at', 'qc_results', ['checked_at'])
+
+    if connection.dialect.name == 'postgresql':
+        # ILIKE '%term%' memakai index trigram GIN secara otomatis
+        connection.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+        create_index(connection, 'ix_qc_results_item_code_trgm', 'qc_results', ['item_code gin_trgm_ops'], using='gin')
+        create_index(connection, 'ix_qc_results_name_trgm', 'qc_results', ['name gin_trgm_ops'], using='gin')
+    elif connection.dialect.name == 'sqlite' and _sqlite_trigram_available(connection):
+        # Tabel FTS external-content: hanya menyimpan index, isi dibaca dari qc_results
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {QC_SEARCH_TABLE} USING fts5("
+            "item_code, name, content='qc_results', content_rowid='id', tokenize='trigram')"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {QC_SEARCH_TABLE}_ai AFTER INSERT ON qc_results BEGIN "
+            f"INSERT INTO {QC_SEARCH_TABLE}(rowid, item_code, name) VALUES (new.id, new.item_code, new.name); END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {QC_SEARCH_TABLE}_ad AFTER DELETE ON qc_results BEGIN "
+            f"INSERT INTO {QC_SEARCH_TABLE}({QC_SEARCH_TABLE}, rowid, item_code, name) "
+            "VALUES ('delete', old.id, old.item_code, old.name); END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {QC_SEARCH_TABLE}_au AFTER UPDATE OF item_code, name ON qc_results BEGIN "
+            f"INSERT INTO {QC_SEARCH_TABLE}({QC_SEARCH_TABLE}, rowid, item_code, name) "
+            "VALUES ('delete', old.id, old.item_code, old.name); "
+            f"INSERT INTO {QC_SEARCH_TABLE}(rowid, item_code, name) VALUES (new.id, new.item_code, new.name); END"
+        ))
+        connection.execute(text(f"INSERT INTO {QC_SEARCH_TABLE}({QC_SEARCH_TABLE}) VALUES ('rebuild')"))
+
+
+
+def create_daily_stats(connection, metadata):
+    """Tabel rekap harian untuk dashboard, diisi dari hasil QC yang sudah ada"""
+    daily_stats = metadata.tables['qc_daily_stats']
+    qc_results = metadata.tables['qc_results']
+    daily_stats.create(bind=connection, checkfirst=True)
+    if connection.execute(select(daily_stats.c.day).limit(1)).first() is None:
+        day = func.date(qc_results.c.checked_at)
+        connection.execute(daily_stats.insert().from_select(
+            ['day', 'status', 'count'],
+            select(day, qc_results.c.status, func.count()).group_by(day, qc_results.c.status)
+        ))
+
+
+MIGRATIONS = [
+    Migration(1, 'initial schema', create_tables),
+    Migration(2, 'logistics tracking columns on qc_results', add_logistics_columns),
+    Migration(3, 'listing and search indexes on qc_results', create_listing_indexes, transactional=False),
+    Migration(4, 'daily QC statistics rollup', create_daily_stats),
+]
+
+
+def main(argv):
+    from app import app, db
+
     with app.app_context():
-        # Add new columns
-        with db.engine.connect() as conn:
-            conn.execute("""
-                ALTER TABLE qc_results 
-                ADD COLUMN sent_to_logistics BOOLEAN DEFAULT FALSE,
-                ADD COLUMN sent_to_logistics_at TIMESTAMP,
-                ADD COLUMN returned_to_inventory BOOLEAN DEFAULT FALSE,
-                ADD COLUMN returned_to_inventory_at TIMESTAMP;
-            """)
-            conn.commit()
+        if argv[1:] == ['upgrade']:
+            applied = run_migrations(db.engine, MIGRATIONS, db.metadata)
+            print(f"Applied migrations: {applied or 'none'}")
+        for version, name, applied in migration_status(db.engine, MIGRATIONS):
+            print(f"{version:4d}  {'applied' if applied else 'pending'}  {name}")
+
 
 if __name__ == '__main__':
-    run_migrations()
-    remove_sqlite_sequence()
-    add_new_columns()
-    upgrade() 
\ No newline at end of file
+    main(sys.argv)
@@ -6,6 +6,10 @@ db = SQLAlchemy()
 class QualityControl(db.Model):
     """Model untuk menyimpan hasil quality control"""
     __tablename__ = 'qc_results'
+    __table_args__ = (
+        # Filter status + rentang tanggal, urut checked_at (listing dan dashboard)
+        db.Index('ix_qc_results_status_checked_at', 'status', 'checked_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     inventory_log_id = db.Column(db.Integer, nullable=False)  # Reference to inventory qc_logs.id
@@ -13,7 +17,7 @@ class QualityControl(db.Model):
     name = db.Column(db.String(100), nullable=False)  # Renamed from item_name
     status = db.Column(db.String(20), nullable=False)  # 'approved', 'rejected'
     notes = db.Column(db.Text, nullable=True)
-    checked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    checked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
     sent_to_logistics = db.Column(db.Boolean, default=False)  # Track if sent to logistics
     sent_to_logistics_at = db.Column(db.DateTime, nullable=True)  # When it was sent to logistics
     returned_to_inventory = db.Column(db.Boolean, default=False)  # Track if returned to inventory
@@ -32,4 +36,12 @@ class QualityControl(db.Model):
             'sent_to_logistics_at': self.sent_to_logistics_at.isoformat() if self.sent_to_logistics_at else None,
             'returned_to_inventory': self.returned_to_inventory,
             'returned_to_inventory_at': self.returned_to_inventory_at.isoformat() if self.returned_to_inventory_at else None
-        } 
\ No newline at end of file
+        } 
+
+class QCDailyStat(db.Model):
+    """Rekap jumlah hasil QC per hari dan status, dipakai dashboard"""
+    __tablename__ = 'qc_daily_stats'
+
+    day = db.Column(db.Date, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
@@ -4,10 +4,13 @@ collections.Mapping = collections.abc.Mapping
 collections.Iterable = collections.abc.Iterable
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from flask_graphql import GraphQLView
 from graphene import ObjectType, String, Schema, Int, Field, List, Mutation, Boolean, Enum as GrapheneEnum
 from models import db, User, UserRole
-from seeders import seed_staff
+from db_engine import engine_options, install_sqlite_pragmas
+from graphql_cache import CachedGraphQLView, DocumentCacheBackend, batch_pool_from_env
+from graphql_pagination import CountableConnection, connection_field, keyset_connection
+from migration_runner import run_migrations
+from migrations import MIGRATIONS
 import jwt
 import datetime
 import logging
@@ -26,10 +29,13 @@ instance_folder = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'inst
 os.makedirs(instance_folder, exist_ok=True)
 db_path = os.path.join(instance_folder, 'user-service.db')
 app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = 'your-secret-key'
 app.config['JWT_SECRET_KEY'] = 'jwt-secret-key'
 
+# WAL dan PRAGMA lain untuk setiap koneksi SQLite
+install_sqlite_pragmas()
 db.init_app(app)
 
 # GraphQL Schema
@@ -63,11 +69,19 @@ class LoginResponse(ObjectType):
     user = Field(UserType)
     token = String()
 
+class UserConnection(CountableConnection):
+    class Meta:
+        node = UserType
+
 class Query(ObjectType):
     all_users = List(UserType)
     user = Field(UserType, id=Int(required=True))
     staff_users = List(UserType)
     client_users = List(UserType)
+    # Versi berhalaman (first/after) dari field list di atas
+    all_users_connection = connection_field(UserConnection)
+    staff_users_connection = connection_field(UserConnection)
+    client_users_connection = connection_field(UserConnection)
 
     def resolve_all_users(self, info):
         return User.query.all()
@@ -81,6 +95,17 @@ class Query(ObjectType):
     def resolve_client_users(self, info):
         return User.query.filter_by(role=UserRole.CLIENT.value).all()
 
+    def resolve_all_users_connection(self, info, first=None, after=None):
+        return keyset_connection(UserConnection, User.query, [User.id], first, after)
+
+    def resolve_staff_users_connection(self, info, first=None, after=None):
+        query = User.query.filter_by(role=UserRole.STAFF.value)
+        return keyset_connection(UserConnection, query, [User.id], first, after)
+
+    def resolve_client_users_connection(self, info, first=None, after=None):
+        query = User.query.filter_by(role=UserRole.CLIENT.value)
+        return keyset_connection(UserConnection, query, [User.id], first, after)
+
 class CreateUser(Mutation):
     class Arguments:
         nama = String()
@@ -272,16 +297,28 @@ class Mutation(ObjectType):
 
 schema = Schema(query=Query, mutation=Mutation)
 
-# GraphQL endpoint
+# GraphQL endpoint (dokumen hasil parse + validasi di-cache, mendukung persisted query dan batch)
+graphql_backend = DocumentCacheBackend.from_env()
 app.add_url_rule(
     '/graphql',
-    view_func=GraphQLView.as_view(
+    view_func=CachedGraphQLView.as_view(
         'graphql',
         schema=schema,
-        graphiql=True
+        graphiql=True,
+        backend=graphql_backend,
+        batch=True,
+        batch_pool=batch_pool_from_env()
     )
 )
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Statistik runtime user-service (per worker process)"""
+    return jsonify({
+        'service': 'user-service',
+        'graphql_documents': graphql_backend.stats()
+    })
+
 @app.route('/test')
 def test():
     return jsonify({"message": "Server is running!"})
@@ -293,10 +330,8 @@ def is_port_in_use(port):
 if __name__ == '__main__':
     try:
         with app.app_context():
-            # Hapus semua tabel dan buat ulang
-            db.drop_all()
-            db.create_all()
-            seed_staff()  # Seed staff data
+            # Hanya migrasi yang belum tercatat (termasuk seed staff), data lama tetap ada
+            run_migrations(db.engine, MIGRATIONS, db.metadata)
         
         if is_port_in_use(5003):
             logger.error("Port 5003 is already in use. Please close any other applications using this port.")
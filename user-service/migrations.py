@@ -0,0 +1,48 @@
+"""Daftar migrasi skema user-service (lihat migration_runner.py).
+
+Migrasi diterapkan saat app.py dijalankan langsung; dari command line:
+    python migrations.py            tampilkan status migrasi
+    python migrations.py upgrade    terapkan migrasi yang tertunda
+"""
+import sys
+
+from sqlalchemy import select
+
+from migration_runner import Migration, create_index, create_tables, migration_status, run_migrations
+from seeders import STAFF_ACCOUNTS
+
+
+def seed_staff_accounts(connection, metadata):
+    """Akun staff awal; akun yang namanya sudah ada tidak disentuh"""
+    users = metadata.tables['users']
+    existing = {row.nama for row in connection.execute(select(users.c.nama))}
+    missing = [staff for staff in STAFF_ACCOUNTS if staff['nama'] not in existing]
+    if missing:
+        connection.execute(users.insert(), missing)
+
+
+def create_connection_indexes(connection, metadata):
+    """Index urutan keyset untuk field connection user GraphQL (lihat graphql_pagination.py)"""
+    create_index(connection, 'ix_users_role_id', 'users', ['role', 'id'])
+
+
+MIGRATIONS = [
+    Migration(1, 'initial schema', create_tables),
+    Migration(2, 'seed staff accounts', seed_staff_accounts),
+    Migration(3, 'keyset index for GraphQL connections', create_connection_indexes, transactional=False),
+]
+
+
+def main(argv):
+    from app import app, db
+
+    with app.app_context():
+        if argv[1:] == ['upgrade']:
+            applied = run_migrations(db.engine, MIGRATIONS, db.metadata)
+            print(f"Applied migrations: {applied or 'none'}")
+        for version, name, applied in migration_status(db.engine, MIGRATIONS):
+            print(f"{version:4d}  {'applied' if applied else 'pending'}  {name}")
+
+
+if __name__ == '__main__':
+    main(sys.argv)
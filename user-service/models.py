@@ -9,6 +9,10 @@ class UserRole(Enum):
 
 class User(db.Model):
     __tablename__ = 'users'
+    # Urutan keyset staffUsersConnection / clientUsersConnection
+    __table_args__ = (
+        db.Index('ix_users_role_id', 'role', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     nama = db.Column(db.String(100), nullable=True)  # Tetap ada untuk kompatibilitas dengan staff
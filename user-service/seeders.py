@@ -1,30 +1,30 @@
 from models import db, User, UserRole
 
-def seed_staff():
-    # Daftar staff yang akan di-seed
-    staff_list = [
-        {
-            'nama': 'admin',
-            'username' : 'admin.gacor',
-            'password': 'admin123',
-            'email': 'admin@example.com',
-            'role': UserRole.STAFF.value
-        },
-        {
-            'nama': 'sheila',
-            'username' : 'sheila.gacor',
-            'password': 'sheila123',
-            'email': 'sheila@example.com',
-            'role': UserRole.STAFF.value
-        }
-    ]
+# Daftar staff yang akan di-seed (dipakai juga oleh migrasi 'seed staff accounts')
+STAFF_ACCOUNTS = [
+    {
+        'nama': 'admin',
+        'username' : 'admin.gacor',
+        'password': 'admin123',
+        'email': 'admin@example.com',
+        'role': UserRole.STAFF.value
+    },
+    {
+        'nama': 'sheila',
+        'username' : 'sheila.gacor',
+        'password': 'sheila123',
+        'email': 'sheila@example.com',
+        'role': UserRole.STAFF.value
+    }
+]
 
+def seed_staff():
     # Cek dan tambahkan staff jika belum ada
-    for staff_data in staff_list:
+    for staff_data in STAFF_ACCOUNTS:
         existing_staff = User.query.filter_by(nama=staff_data['nama']).first()
         if not existing_staff:
             staff = User(**staff_data)
             db.session.add(staff)
     
     db.session.commit()
-    print("Staff data has been seeded successfully!") 
\ No newline at end of file
+    print("Staff data has been seeded successfully!")